@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the WBGT Kiosk data parsers
+Times parsing of downloaded data files and prints per-run statistics
+
+Usage:
+    python3 scripts/benchmark.py alert [--file alert_YYYYMMDD_HH.csv] [--repeat N]
+    python3 scripts/benchmark.py json [--fetch [--area CODE]] [--file JSON ...] [--backend NAME ...] [--repeat N]
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(SCRIPT_DIR, '..', 'data', 'csv')
+CACHE_DIR = os.path.join(SCRIPT_DIR, '..', 'data', 'cache')
+
+# Default JSON fixtures: JMA endpoint responses saved by download_jma_data.sh, the kiosk and --fetch
+JSON_FIXTURES = (
+    ('forecast', DATA_DIR, 'jma_forecast_*.json'),
+    ('overview_forecast', CACHE_DIR, 'jma_overview_forecast_*.json'),
+    ('amedastable', DATA_DIR, 'jma_amedas_table.json'),
+    ('amedastable', CACHE_DIR, 'amedastable.json'),
+    ('amedas_map', CACHE_DIR, 'jma_amedas_map_*.json'),
+)
+
+OVERVIEW_FORECAST_URL = "https://www.jma.go.jp/bosai/forecast/data/overview_forecast/{area_code}.json"
+
+sys.path.insert(0, os.path.join(SCRIPT_DIR, '..', 'src'))
+
+
+def find_latest_file(pattern):
+    """Return the most recently modified file in data/csv matching the pattern"""
+    files = glob.glob(os.path.join(DATA_DIR, pattern))
+    if not files:
+        return None
+    return max(files, key=os.path.getmtime)
+
+
+def time_runs(func, repeat):
+    """Call func repeat times and return the elapsed time of each call in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def measure_peak_memory(func):
+    """Call func once under tracemalloc and return the peak traced allocation in KiB"""
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def print_timings(label, timings):
+    """Print mean / median / min / max of the timings"""
+    print(f"{label}: {len(timings)} runs")
+    print(f"  mean   {statistics.mean(timings):.4f} ms")
+    print(f"  median {statistics.median(timings):.4f} ms")
+    print(f"  min    {min(timings):.4f} ms")
+    print(f"  max    {max(timings):.4f} ms")
+
+
+def benchmark_alert(args):
+    """Benchmark parsing of a national heat stroke alert CSV"""
+    from env_wbgt_data import WBGTAlertIndex
+
+    csv_file = args.file or find_latest_file('alert_*.csv')
+    if not csv_file or not os.path.exists(csv_file):
+        print("Alert CSV not found. Run scripts/download_wbgt_data.sh or pass --file.", file=sys.stderr)
+        return 1
+
+    with open(csv_file, 'r', encoding='utf-8') as f:
+        csv_content = f.read()
+
+    index = WBGTAlertIndex.parse(csv_content)
+    print(f"File: {csv_file}")
+    print(f"Forecast areas: {len(index.areas)}, prefectures: {len(set(filter(None, index.prefectures)))}")
+
+    print_timings("WBGTAlertIndex.parse", time_runs(lambda: WBGTAlertIndex.parse(csv_content), args.repeat))
+    return 0
+
+
+def find_json_fixtures():
+    """Return (label, path) for each default JSON fixture that exists"""
+    fixtures = []
+    for label, directory, pattern in JSON_FIXTURES:
+        files = glob.glob(os.path.join(directory, pattern))
+        if files:
+            fixtures.append((label, max(files, key=os.path.getmtime)))
+    return fixtures
+
+
+def fetch_json_fixtures(area_code):
+    """Download the AMeDAS map of the last full hour and the overview forecast into data/cache"""
+    from datetime import datetime, timedelta
+
+    from amedas import MAP_URL
+    from http_client import get_shared_session
+
+    observed_at = (datetime.now() - timedelta(hours=1)).replace(minute=0, second=0, microsecond=0)
+    downloads = (
+        (MAP_URL.format(observed_at=observed_at), f"jma_amedas_map_{observed_at:%Y%m%d%H}.json"),
+        (OVERVIEW_FORECAST_URL.format(area_code=area_code), f"jma_overview_forecast_{area_code}.json"),
+    )
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    session = get_shared_session()
+    for url, file_name in downloads:
+        response = session.get(url, timeout=30)
+        response.raise_for_status()
+        path = os.path.join(CACHE_DIR, file_name)
+        with open(path, 'wb') as f:
+            f.write(response.content)
+        print(f"Saved {url} -> {path}")
+
+
+def benchmark_json(args):
+    """Benchmark decoding of JMA JSON responses with each available decoder backend"""
+    import json_backend
+
+    if args.fetch:
+        try:
+            fetch_json_fixtures(args.area)
+        except Exception as e:
+            print(f"Failed to download JSON fixtures: {e}", file=sys.stderr)
+            return 1
+
+    if args.file:
+        fixtures = [(os.path.basename(path), path) for path in args.file]
+    else:
+        fixtures = find_json_fixtures()
+        found = {label for label, _ in fixtures}
+        missing = sorted({label for label, _, _ in JSON_FIXTURES} - found)
+        if missing:
+            print(f"No fixture for: {', '.join(missing)} (run with --fetch to download them)", file=sys.stderr)
+    if not fixtures:
+        print("JSON fixtures not found. Run with --fetch, run scripts/download_jma_data.sh or pass --file.",
+              file=sys.stderr)
+        return 1
+
+    available = json_backend.available_backends()
+    backends = args.backend or available
+    missing = [name for name in backends if name not in available]
+    if missing:
+        print(f"Backend not installed: {', '.join(missing)} (available: {', '.join(available)})", file=sys.stderr)
+        return 1
+
+    print(f"Default backend: {json_backend.BACKEND}")
+    for label, path in fixtures:
+        with open(path, 'rb') as f:
+            content = f.read()
+        print(f"\n{label}: {path} ({len(content) / 1024:.1f} KiB)")
+        for name in backends:
+            decode = json_backend.get_decoder(name)
+            peak = measure_peak_memory(lambda: decode(content))
+            print_timings(f"{name}.loads", time_runs(lambda: decode(content), args.repeat))
+            print(f"  peak   {peak:.1f} KiB")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WBGT Kiosk parser benchmarks")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    alert_parser = subparsers.add_parser('alert', help="parse a national alert CSV (alert_YYYYMMDD_HH.csv)")
+    alert_parser.add_argument('--file', help="alert CSV to parse (default: latest in data/csv)")
+    alert_parser.add_argument('--repeat', type=int, default=1000, help="number of runs (default: 1000)")
+    alert_parser.set_defaults(func=benchmark_alert)
+
+    json_parser = subparsers.add_parser('json', help="decode JMA JSON responses with each decoder backend")
+    json_parser.add_argument('--file', action='append',
+                             help="JSON file to decode, repeatable (default: latest saved response of each endpoint)")
+    json_parser.add_argument('--fetch', action='store_true',
+                             help="download the latest AMeDAS map and overview forecast into data/cache first")
+    json_parser.add_argument('--area', default='130000',
+                             help="area code of the overview forecast to download (default: 130000)")
+    json_parser.add_argument('--backend', action='append', choices=('orjson', 'ujson', 'json'),
+                             help="decoder to benchmark, repeatable (default: all installed)")
+    json_parser.add_argument('--repeat', type=int, default=200, help="number of runs (default: 200)")
+    json_parser.set_defaults(func=benchmark_json)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
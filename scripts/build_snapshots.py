@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Snapshot builder for the offline CSV fallback files
+Parses the downloaded Environment Ministry CSVs in data/csv once and writes
+pre-parsed binary sidecars (<file>.snap) that the kiosk memory-maps instead
+of re-parsing the text every update cycle
+
+Usage:
+    python3 scripts/build_snapshots.py [DATA_DIR or CSV files...]
+"""
+
+import fnmatch
+import glob
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(SCRIPT_DIR, '..', 'data', 'csv')
+
+sys.path.insert(0, os.path.join(SCRIPT_DIR, '..', 'src'))
+
+from env_wbgt_data import WBGTForecastDocument, WBGTObservationMatrix, WBGTAlertIndex  # noqa: E402
+from snapshot_store import SNAPSHOT_SUFFIX, load_snapshot, snapshot_path, write_snapshot  # noqa: E402
+
+# File name pattern -> document class (names written by download_wbgt_data.sh)
+DOCUMENT_TYPES = (
+    ('wbgt_forecast_*.csv', WBGTForecastDocument),
+    ('wbgt_current_*_*.csv', WBGTObservationMatrix),
+    ('alert_*.csv', WBGTAlertIndex),
+)
+
+
+def document_class_for(csv_file):
+    """Return the document class for a data file name, or None if it has no snapshot"""
+    name = os.path.basename(csv_file)
+    for pattern, document_class in DOCUMENT_TYPES:
+        if fnmatch.fnmatch(name, pattern):
+            return document_class
+    return None
+
+
+def build_snapshot(csv_file):
+    """Write the snapshot for csv_file unless an up-to-date one exists. Returns True if written."""
+    document_class = document_class_for(csv_file)
+    if document_class is None or load_snapshot(csv_file, document_class) is not None:
+        return False
+
+    with open(csv_file, 'r', encoding='utf-8') as f:
+        document = document_class.parse(f.read())
+    write_snapshot(csv_file, document)
+    return True
+
+
+def remove_orphaned_snapshots(data_dir):
+    """Remove snapshots whose source file no longer exists"""
+    for path in glob.glob(os.path.join(data_dir, '*' + SNAPSHOT_SUFFIX)):
+        if not os.path.exists(path[:-len(SNAPSHOT_SUFFIX)]):
+            os.remove(path)
+
+
+def main():
+    targets = sys.argv[1:] or [DATA_DIR]
+
+    csv_files = []
+    for target in targets:
+        if os.path.isdir(target):
+            remove_orphaned_snapshots(target)
+            csv_files.extend(sorted(glob.glob(os.path.join(target, '*.csv'))))
+        else:
+            csv_files.append(target)
+
+    built = 0
+    failed = 0
+    for csv_file in csv_files:
+        try:
+            if build_snapshot(csv_file):
+                built += 1
+                print(f"Snapshot written: {snapshot_path(csv_file)}")
+        except (OSError, ValueError) as e:
+            failed += 1
+            print(f"Warning: Failed to build snapshot for {csv_file}: {e}", file=sys.stderr)
+
+    print(f"Snapshots: {built} written, {failed} failed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -194,6 +194,14 @@ if download_heatstroke_alert "$ALERT_DATE" "$ALERT_TIME" "$CURRENT_YEAR"; then
 fi
 ((total_count++))
 
+# Write pre-parsed snapshots (.snap) next to the downloaded CSV files
+log_message "Building snapshots for downloaded CSV files..."
+if python3 "$SCRIPT_DIR/build_snapshots.py" "$DATA_DIR" >> "$LOG_FILE" 2>&1; then
+    log_message "✅ Snapshots are up to date"
+else
+    log_message "❌ Failed to build some snapshots (CSV files will be parsed directly)"
+fi
+
 log_message "=== Environment Ministry WBGT Data Download Completed ==="
 log_message "Success: $success_count/$total_count downloads"
 
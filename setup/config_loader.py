@@ -107,6 +107,9 @@ def get_default_config() -> Dict[str, Any]:
             "那覇": "471000"
         },
         "update_interval_minutes": 30,
+        "fetch": {
+            "max_workers": 4
+        },
         "display": {
             "width": 800,
             "height": 600,
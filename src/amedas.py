@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AMeDAS station index and observation snapshots for the WBGT Kiosk
+アメダス観測所の索引（amedastable.json）と実況データのスナップショット
+"""
+
+import codecs
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from array import array
+
+from fetch_engine import RequestCoalescer
+from http_client import get_shared_cache, get_shared_session, parse_json
+import json_backend
+
+logger = logging.getLogger(__name__)
+
+STATION_TABLE_URL = "https://www.jma.go.jp/bosai/amedas/const/amedastable.json"
+MAP_URL = "https://www.jma.go.jp/bosai/amedas/data/map/{observed_at:%Y%m%d%H}0000.json"
+
+# スナップショットに保持する観測要素
+MAP_ELEMENTS = ('temp', 'humidity')
+# 実況データを逐次読み込む際のチャンクサイズ
+MAP_CHUNK_SIZE = 16 * 1024
+
+# 観測所一覧の保存先と有効期間（観測所の変更はまれなので1日1回の更新で十分）
+STATION_TABLE_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                                  'data', 'cache', 'amedastable.json')
+STATION_TABLE_MAX_AGE = 24 * 3600
+# 観測所一覧を取得できなかった場合に再試行するまでの時間（秒）
+STATION_TABLE_RETRY_INTERVAL = 600
+
+# elems文字列の各桁に対応する観測要素（'1'の場合に観測あり）
+ELEMENT_POSITIONS = {
+    'temp': 0,
+    'precipitation': 1,
+    'wind': 2,
+    'sun': 3,
+    'snow': 4,
+    'humidity': 5,
+    'pressure': 6,
+}
+
+
+class AmedasStation:
+    """アメダス観測所"""
+
+    def __init__(self, station_id, name, en_name, lat, lon, elems):
+        self.station_id = station_id
+        self.name = name
+        self.en_name = en_name
+        self.lat = lat
+        self.lon = lon
+        self.elems = elems
+
+    def observes(self, element):
+        """指定した観測要素を観測しているかどうか"""
+        position = ELEMENT_POSITIONS.get(element)
+        return position is not None and len(self.elems) > position and self.elems[position] == '1'
+
+    def distance_to(self, other):
+        """他の観測所までのおおよその距離（km、正距円筒近似）"""
+        mean_lat = math.radians((self.lat + other.lat) / 2)
+        dx = math.radians(other.lon - self.lon) * math.cos(mean_lat)
+        dy = math.radians(other.lat - self.lat)
+        return 6371.0 * math.hypot(dx, dy)
+
+
+def _parse_degrees(value):
+    """[度, 分] 形式の緯度経度を度に変換"""
+    if isinstance(value, (list, tuple)) and len(value) >= 2:
+        return float(value[0]) + float(value[1]) / 60.0
+    return float(value)
+
+
+class AmedasStationIndex:
+    """観測所番号から観測所情報を引く索引"""
+
+    def __init__(self, stations):
+        # stations: 観測所番号 -> AmedasStation
+        self.stations = stations
+        self._names = {}
+        for station in stations.values():
+            self._names.setdefault(station.name, station)
+            if station.en_name:
+                self._names.setdefault(station.en_name.lower(), station)
+
+    @classmethod
+    def from_table(cls, table):
+        """amedastable.json の内容から索引を作成"""
+        stations = {}
+        for station_id, entry in table.items():
+            try:
+                stations[station_id] = AmedasStation(
+                    station_id,
+                    entry.get('kjName', ''),
+                    entry.get('enName', ''),
+                    _parse_degrees(entry.get('lat')),
+                    _parse_degrees(entry.get('lon')),
+                    entry.get('elems', ''),
+                )
+            except (TypeError, ValueError):
+                logger.debug(f"アメダス観測所情報の解析に失敗: {station_id}")
+        return cls(stations)
+
+    def __contains__(self, station_id):
+        return station_id in self.stations
+
+    def get(self, station_id):
+        """観測所番号から観測所を取得"""
+        return self.stations.get(station_id)
+
+    def find_by_name(self, name):
+        """観測所名（漢字または英字）から観測所を取得"""
+        if not name:
+            return None
+        return self._names.get(name) or self._names.get(name.lower())
+
+    def nearest(self, origin, element='temp', limit=3):
+        """基準の観測所に近い順に、指定要素を観測している観測所を取得（基準自身を除く）"""
+        candidates = [station for station in self.stations.values()
+                      if station.station_id != origin.station_id and station.observes(element)]
+        candidates.sort(key=origin.distance_to)
+        return candidates[:limit]
+
+    def select_stations(self, station_id=None, name=None, element='temp', limit=3):
+        """
+        拠点の観測に使用する観測所番号を優先順に取得
+
+        Args:
+            station_id (str): 拠点の観測所番号（WBGT地点番号はアメダス観測所番号と共通）
+            name (str): 観測所番号が使えない場合に照合する地名
+            element (str): 必要な観測要素
+            limit (int): 取得する観測所数（近傍の代替観測所を含む）
+
+        Returns:
+            list: 観測所番号のリスト（該当なしは空リスト）
+        """
+        origin = self.get(station_id) if station_id else None
+        if origin is None:
+            origin = self.find_by_name(name)
+        if origin is None:
+            return []
+
+        selected = [origin] if origin.observes(element) else []
+        selected += self.nearest(origin, element, limit - len(selected))
+        return [station.station_id for station in selected]
+
+
+_index_lock = threading.Lock()
+_station_index = None
+# 次に観測所一覧を読み込み直す時刻（取得に失敗した場合は一定時間後に再試行）
+_station_index_next_load = 0
+
+
+def _load_station_table(verify=True):
+    """観測所一覧を保存済みファイルまたは気象庁から取得（1日1回まで）"""
+    cached_table = None
+    cached_time = 0
+    if os.path.exists(STATION_TABLE_FILE):
+        try:
+            with open(STATION_TABLE_FILE, 'r', encoding='utf-8') as f:
+                cached_table = json_backend.load(f)
+            cached_time = os.path.getmtime(STATION_TABLE_FILE)
+        except (OSError, ValueError) as e:
+            logger.warning(f"保存済みのアメダス観測所一覧を読み込めません: {e}")
+
+    if cached_table is not None and time.time() - cached_time < STATION_TABLE_MAX_AGE:
+        return cached_table, cached_time
+
+    try:
+        table = get_shared_cache().get(STATION_TABLE_URL, parse_json, 'jma_amedastable',
+                                       timeout=10, verify=verify)
+        logger.info(f"アメダス観測所一覧を取得: {len(table)}地点")
+    except Exception as e:
+        logger.error(f"アメダス観測所一覧の取得に失敗: {e}")
+        # 古くても保存済みの一覧があれば使用する
+        return cached_table, cached_time
+
+    try:
+        os.makedirs(os.path.dirname(STATION_TABLE_FILE), exist_ok=True)
+        with open(STATION_TABLE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(table, f, ensure_ascii=False)
+    except OSError as e:
+        logger.warning(f"アメダス観測所一覧を保存できません: {e}")
+    return table, time.time()
+
+
+def get_station_index(verify=True):
+    """
+    プロセス全体で共有する観測所索引を取得
+
+    Returns:
+        AmedasStationIndex: 観測所索引（取得できない場合はNone）
+    """
+    global _station_index, _station_index_next_load
+    with _index_lock:
+        now = time.time()
+        if now >= _station_index_next_load:
+            table, table_time = _load_station_table(verify)
+            if table is not None:
+                _station_index = AmedasStationIndex.from_table(table)
+            if table is not None and now - table_time < STATION_TABLE_MAX_AGE:
+                _station_index_next_load = table_time + STATION_TABLE_MAX_AGE
+            else:
+                # 取得できない（または古い一覧しかない）場合は毎回の通信を避け、一定時間後に再試行する
+                _station_index_next_load = now + STATION_TABLE_RETRY_INTERVAL
+        return _station_index
+
+
+class AmedasMapSnapshot:
+    """
+    1時刻分の全国アメダス実況値
+
+    観測所番号 -> 行位置の辞書と、要素ごとの値を並べた数値配列（欠測はNaN）で保持する。
+    """
+
+    def __init__(self, observed_at, offsets, values, elements=MAP_ELEMENTS, station_ids=None):
+        self.observed_at = observed_at
+        # 抽出対象の観測所（Noneは全観測所）
+        self.station_ids = station_ids
+        self.elements = elements
+        self._element_positions = {element: i for i, element in enumerate(elements)}
+        self._offsets = offsets
+        self._values = values
+
+    @classmethod
+    def from_map(cls, observed_at, data, elements=MAP_ELEMENTS, station_ids=None):
+        """map/{YYYYMMDDHH}0000.json の内容から作成"""
+        offsets = {}
+        values = array('d')
+        for station_id, station_data in data.items():
+            offsets[station_id] = len(offsets)
+            for element in elements:
+                observation = station_data.get(element)
+                value = observation[0] if observation else None
+                values.append(float('nan') if value is None else float(value))
+        return cls(observed_at, offsets, values, elements, station_ids)
+
+    @classmethod
+    def from_stream(cls, observed_at, chunks, station_ids, elements=MAP_ELEMENTS):
+        """レスポンス本文を逐次走査し、指定した観測所だけで作成"""
+        extractor = AmedasMapExtractor(station_ids)
+        for chunk in chunks:
+            extractor.feed(chunk)
+        return cls.from_map(observed_at, extractor.stations, elements, extractor.station_ids)
+
+    def covers(self, station_ids):
+        """指定した観測所がすべて抽出対象に含まれていたかどうか"""
+        return self.station_ids is None or set(station_ids) <= self.station_ids
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __contains__(self, station_id):
+        return station_id in self._offsets
+
+    def get(self, station_id, element):
+        """観測所の実況値を取得（欠測・対象外はNone）"""
+        offset = self._offsets.get(station_id)
+        position = self._element_positions.get(element)
+        if offset is None or position is None:
+            return None
+        value = self._values[offset * len(self.elements) + position]
+        return None if math.isnan(value) else value
+
+
+class AmedasMapExtractor:
+    """
+    全国アメダス実況JSONを逐次走査し、指定した観測所の値だけを取り出す
+
+    map/*.json は「観測所番号: {要素: [値, 品質]}」が並ぶ1階層のオブジェクトで、
+    文字列に括弧を含まないため、括弧の深さだけを数えて観測所ごとの範囲を切り出す。
+    対象外の観測所は文字列のまま読み捨てるので、メモリ使用量は対象の観測所数に比例する。
+    """
+
+    _KEY = re.compile(r'"([^"]*)"\s*:\s*\{')
+    _BRACE = re.compile(r'[{}]')
+
+    def __init__(self, station_ids):
+        self.station_ids = frozenset(station_ids)
+        # 観測所番号 -> 観測値（対象の観測所のみ）
+        self.stations = {}
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._started = False
+        self._station = None
+        self._depth = 0
+        self._scan_from = 0
+
+    def feed(self, chunk):
+        """受信したチャンク（bytes）を処理"""
+        text = self._buffer + self._decoder.decode(chunk)
+        pos = self._scan_from
+        if not self._started:
+            pos = text.find('{')
+            if pos == -1:
+                self._buffer = ''
+                return
+            self._started = True
+            pos += 1
+
+        while True:
+            if self._station is None:
+                match = self._KEY.search(text, pos)
+                if match is None:
+                    # 観測所番号が次のチャンクにまたがる場合に備えて残りを保持
+                    self._buffer, self._scan_from = text[pos:], 0
+                    return
+                self._station = match.group(1)
+                self._depth = 1
+                pos = match.end()
+                value_start = match.end() - 1
+            else:
+                value_start = 0
+
+            for brace in self._BRACE.finditer(text, pos):
+                self._depth += 1 if brace.group() == '{' else -1
+                if self._depth == 0:
+                    if self._station in self.station_ids:
+                        self.stations[self._station] = json_backend.loads(text[value_start:brace.end()])
+                    self._station = None
+                    pos = brace.end()
+                    break
+            else:
+                # 値が次のチャンクに続く：対象の観測所のみ値の先頭から保持する
+                if self._station in self.station_ids:
+                    self._buffer = text[value_start:]
+                    self._scan_from = len(self._buffer)
+                else:
+                    self._buffer, self._scan_from = '', 0
+                return
+
+
+# 実況データは時刻ごとに1回だけ取得し、全拠点で共有する
+_map_coalescer = RequestCoalescer()
+_map_url = None
+_map_lock = threading.Lock()
+_watch_lock = threading.Lock()
+_watched_stations = set()
+
+
+def watch_stations(station_ids):
+    """
+    実況データから抽出する観測所を登録
+
+    取得後に登録された観測所があるとその時刻の実況データを取り直すため、
+    全拠点の観測所を最初の取得より前（APIクライアントの作成時）に登録しておく。
+    """
+    with _watch_lock:
+        _watched_stations.update(station_ids)
+
+
+def get_map_snapshot(observed_at, station_ids, verify=True):
+    """
+    指定時刻（正時）の全国アメダス実況スナップショットを取得
+
+    同一時刻の要求は1回の通信・解析にまとめ、時刻が変わると前回分を破棄する。
+    本文は逐次走査し、登録済みの観測所の値だけを取り出す。
+
+    Args:
+        observed_at (datetime): 観測時刻
+        station_ids (list): 必要な観測所番号（抽出対象として登録される）
+        verify: SSL証明書の検証設定
+
+    Raises:
+        requests.exceptions.RequestException: 通信エラーまたはHTTPエラー
+    """
+    global _map_url
+    watch_stations(station_ids)
+    observed_at = observed_at.replace(minute=0, second=0, microsecond=0)
+    url = MAP_URL.format(observed_at=observed_at)
+
+    with _map_lock:
+        # 複数の取得スレッドから同時に呼ばれるため、URLの確認と切り替えは排他で行う
+        if url != _map_url:
+            _map_coalescer.clear()
+            _map_url = url
+
+    def load():
+        with _watch_lock:
+            watched = frozenset(_watched_stations)
+        # 時刻ごとのファイルは公開後に変わらないため条件付きGETは使わない
+        with get_shared_session().get(url, timeout=10, verify=verify, stream=True) as response:
+            response.raise_for_status()
+            snapshot = AmedasMapSnapshot.from_stream(
+                observed_at, response.iter_content(chunk_size=MAP_CHUNK_SIZE), watched)
+        logger.info(f"アメダス実況スナップショットを取得: {observed_at:%Y-%m-%d %H}時 {len(snapshot)}/{len(watched)}地点")
+        return snapshot
+
+    snapshot = _map_coalescer.get(url, load)
+    if not snapshot.covers(station_ids):
+        # 取得後に登録された観測所がある場合は取り直す
+        _map_coalescer.discard(url)
+        snapshot = _map_coalescer.get(url, load)
+    return snapshot
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Read-only, memory-mapped access to the data/csv fallback files
+data/csv のフォールバック用ファイルをメモリマップで読み取り専用に参照するストア
+"""
+
+import contextlib
+import logging
+import mmap
+import os
+import threading
+from datetime import datetime
+
+import json_backend
+from snapshot_store import load_snapshot
+
+logger = logging.getLogger(__name__)
+
+# ダウンロードスクリプト（scripts/download_*.sh）の保存先
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'csv')
+
+
+def _iter_lines(buffer):
+    """マップしたバッファを先頭から1行ずつUTF-8の文字列で返す（ファイル全体の文字列は作らない）"""
+    buffer.seek(0)
+    for line in iter(buffer.readline, b''):
+        yield line.decode('utf-8')
+
+
+class FallbackStore:
+    """
+    APIアクセス失敗時に使用する data/csv のファイルを参照するストア
+
+    ファイルは読み取り専用でメモリマップして解析するため、同じホストの複数のキオスクプロセスは
+    ページキャッシュ上の同じ内容を共有し、月間ファイル全体をプロセスごとに文字列として保持しない。
+    存在確認と更新時刻による鮮度の確認もここでまとめて行う。
+    """
+
+    def __init__(self, data_dir=DEFAULT_DATA_DIR):
+        self.data_dir = data_dir
+        self._lock = threading.Lock()
+        # ファイル名 -> ((更新時刻, サイズ), 解析済みJSON)
+        self._json_cache = {}
+
+    def path(self, file_name):
+        """ファイル名からパスを取得"""
+        return os.path.join(self.data_dir, file_name)
+
+    def locate(self, file_name, max_age_hours):
+        """
+        指定時間以内に更新されたファイルのパスと状態を取得
+
+        Returns:
+            tuple: (パス, os.stat_result)（存在しない・古すぎる場合はNone）
+        """
+        path = self.path(file_name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            logger.warning(f"フォールバック用ファイルが見つかりません: {path}")
+            return None
+
+        age_hours = (datetime.now().timestamp() - stat.st_mtime) / 3600
+        if age_hours > max_age_hours:
+            logger.warning(f"フォールバック用ファイルが古すぎます（{age_hours:.1f}時間前）: {path}")
+            return None
+        return path, stat
+
+    def map_file(self, path):
+        """ファイルを読み取り専用でメモリマップ（空のファイルはNone）"""
+        with open(path, 'rb') as f:
+            try:
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                logger.warning(f"フォールバック用ファイルが空です: {path}")
+                return None
+
+    def load_document(self, file_name, document_class, max_age_hours):
+        """
+        ファイルを解析済みドキュメントとして読み込む
+
+        最新のスナップショット（.snap）があればそれを使い、なければマップしたファイルを1行ずつ解析する。
+
+        Args:
+            file_name (str): data/csv 内のファイル名
+            document_class: parse_lines() を持つドキュメントのクラス（スナップショットの種別にも使用）
+            max_age_hours (float): 使用できる更新時刻からの経過時間
+
+        Returns:
+            ドキュメント（ファイルがない・古い・空の場合はNone）
+        """
+        with self.open_document(file_name, document_class, max_age_hours) as document:
+            return document
+
+    @contextlib.contextmanager
+    def open_document(self, file_name, document_class, max_age_hours, reader=None):
+        """
+        ファイルのドキュメントを with ブロックの間だけ参照する
+
+        reader を指定した場合はマップしたバッファをリーダーに渡し、ブロックを抜けるときにマップを閉じる。
+
+        Args:
+            reader (callable): マップしたバッファを受け取るリーダー（省略時は parse_lines() で解析）
+
+        Example:
+            with store.open_document(file_name, WBGTObservationMatrix, 6, reader=WBGTCurrentTailReader) as document:
+                latest = document.latest(location_code) if document else None
+        """
+        located = self.locate(file_name, max_age_hours)
+        if located is None:
+            yield None
+            return
+        path, _ = located
+
+        document = load_snapshot(path, document_class)
+        if document is not None:
+            logger.debug(f"スナップショットを使用: {path}")
+            yield document
+            return
+
+        buffer = self.map_file(path)
+        if buffer is None:
+            yield None
+            return
+        try:
+            if reader is not None:
+                yield reader(buffer)
+            else:
+                yield document_class.parse_lines(_iter_lines(buffer))
+        finally:
+            buffer.close()
+
+    def load_json(self, file_name, max_age_hours):
+        """
+        JSONファイルを読み込む（更新されていなければ前回の解析結果を再利用）
+
+        Returns:
+            解析済みJSON（ファイルがない・古い・空の場合はNone）
+        """
+        located = self.locate(file_name, max_age_hours)
+        if located is None:
+            return None
+        path, stat = located
+
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._json_cache.get(file_name)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        buffer = self.map_file(path)
+        if buffer is None:
+            return None
+        try:
+            data = json_backend.loads_buffer(buffer)
+        finally:
+            buffer.close()
+
+        with self._lock:
+            self._json_cache[file_name] = (version, data)
+        return data
+
+
+# プロセス全体で共有するストア（拠点・クライアント間でJSONの解析結果を共有）
+_shared_store = FallbackStore()
+
+
+def get_fallback_store():
+    """プロセス全体で共有するフォールバック用ストアを取得"""
+    return _shared_store
@@ -6,6 +6,12 @@ import sys
 from datetime import datetime, timedelta
 import logging
 import re
+import threading
+from env_wbgt_data import (WBGTForecastDocument, WBGTObservationMatrix, WBGTCurrentTailReader, WBGTAlertIndex,
+                            DAILY_HOURS_THRESHOLD)
+from fetch_engine import RequestCoalescer
+from csv_store import get_fallback_store
+from http_client import get_shared_cache, get_shared_session, RangeTailFetcher
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
@@ -20,10 +26,25 @@ class EnvWBGTAPI:
     
     def __init__(self):
         self.base_url = "https://www.wbgt.env.go.jp"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'WBGT-Kiosk/1.0 (Heat Stroke Prevention System)'
-        })
+        # 接続プールは全クライアントで共有する
+        self.session = get_shared_session()
+        
+        # 都道府県単位のCSVはURLごとに1回の通信・解析を全拠点で共有する
+        self._coalescer = RequestCoalescer()
+        # 今回のサイクルで都道府県別CSVの取得に失敗したか（地点のデータがないだけの場合は含まない）
+        self.cycle_failed = False
+        
+        # 全国分のアラートCSVは発表時刻（ファイル）ごとに1回だけ取得・解析し、全拠点で共有する
+        self._alert_coalescer = RequestCoalescer()
+        self._alert_url = None
+        self._alert_lock = threading.Lock()
+        
+        # 未更新のCSVは304応答で前回の解析結果を再利用する
+        self.http_cache = get_shared_cache()
+        # 月単位で追記される実況値CSVは、保持済みの長さ以降だけを取得する
+        self.tail_fetcher = RangeTailFetcher()
+        # APIアクセス失敗時は data/csv のファイルをメモリマップで参照する
+        self.fallback_store = get_fallback_store()
         
         # SSL設定の読み込み（Windows企業環境対応）
         try:
@@ -117,19 +138,11 @@ class EnvWBGTAPI:
                 from config import LOCATIONS
                 location = LOCATIONS[0]
             
-            prefecture = location.get('prefecture')
-            pref_name = self.prefecture_names.get(prefecture, 'kanagawa')
-            
-            # 環境省データサービスの正式URL構造（都道府県別予測値）
-            url = f"{self.base_url}/prev15WG/dl/yohou_{pref_name}.csv"
-            logger.info(f"WBGT予測値データ取得URL: {url}")
+            document = self._get_forecast_document(location)
             
-            response = self.session.get(url, timeout=10, verify=self.ssl_verify)
-            
-            if response.status_code == 200:
-                return self._parse_forecast_csv_data(response.text, location)
+            if document is not None:
+                return self._build_forecast_data(document, location)
             else:
-                logger.warning(f"環境省WBGTサービスからのデータ取得に失敗: {response.status_code} - URL: {url}")
                 return self._get_wbgt_forecast_from_csv(location)
                 
         except Exception as e:
@@ -137,6 +150,65 @@ class EnvWBGTAPI:
             logger.info("CSVファイルからのWBGT予測データ読み込みを試行中...")
             return self._get_wbgt_forecast_from_csv(location)
     
+    def begin_cycle(self):
+        """
+        データ更新サイクルの開始を通知
+        
+        前サイクルで取得した都道府県別CSVを破棄し、次回アクセス時に再取得させる
+        """
+        self._coalescer.clear()
+        self.cycle_failed = False
+    
+    def _get_forecast_document(self, location):
+        """予測値CSVを取得して解析（同一サイクル内では都道府県ごとに1回だけ）"""
+        prefecture = location.get('prefecture')
+        pref_name = self.prefecture_names.get(prefecture, 'kanagawa')
+        
+        # 環境省データサービスの正式URL構造（都道府県別予測値）
+        url = f"{self.base_url}/prev15WG/dl/yohou_{pref_name}.csv"
+        
+        def fetch():
+            return self.http_cache.get(url, lambda response: WBGTForecastDocument.parse(response.text), 'env_forecast',
+                                       session=self.session, timeout=10, verify=self.ssl_verify)
+        
+        return self._get_document(url, fetch, "WBGT予測値データ取得URL", "環境省WBGTサービスからのデータ取得に失敗")
+    
+    def _get_current_document(self, location):
+        """実況値CSVを取得して解析（同一サイクル内では都道府県ごとに1回だけ）"""
+        prefecture = location.get('prefecture')
+        pref_name = self.prefecture_names.get(prefecture, 'kanagawa')
+        now = datetime.now()
+        year_month = f"{now.year}{now.month:02d}"
+        
+        # 環境省データサービスの正式URL構造（都道府県別実況値）
+        url = f"{self.base_url}/est15WG/dl/wbgt_{pref_name}_{year_month}.csv"
+        
+        def fetch():
+            return self.tail_fetcher.get(
+                pref_name, url,
+                lambda content: WBGTObservationMatrix.parse(content.decode('utf-8')),
+                lambda document, content: document.extend(content.decode('utf-8')),
+                'env_current', session=self.session, timeout=10, verify=self.ssl_verify)
+        
+        return self._get_document(url, fetch, "WBGT実況値データ取得URL", "環境省WBGT実況データ取得に失敗")
+    
+    def _get_document(self, url, fetch, log_label, warning_label):
+        """CSVをダウンロードして解析（同一URLへの同時・同一サイクル内の要求は1回にまとめる）"""
+        def load():
+            logger.info(f"{log_label}: {url}")
+            
+            try:
+                return fetch()
+            except requests.exceptions.HTTPError as e:
+                logger.warning(f"{warning_label}: {e.response.status_code} - URL: {url}")
+                self.cycle_failed = True
+                return None
+            except Exception:
+                self.cycle_failed = True
+                raise
+        
+        return self._coalescer.get(url, load)
+    
     def get_wbgt_current_data(self, location=None):
         """
         WBGT実況値データを取得
@@ -164,21 +236,11 @@ class EnvWBGTAPI:
                 from config import LOCATIONS
                 location = LOCATIONS[0]
                 
-            prefecture = location.get('prefecture')
-            pref_name = self.prefecture_names.get(prefecture, 'kanagawa')
-            now = datetime.now()
-            year_month = f"{now.year}{now.month:02d}"
-            
-            # 環境省データサービスの正式URL構造（都道府県別実況値）
-            url = f"{self.base_url}/est15WG/dl/wbgt_{pref_name}_{year_month}.csv"
-            logger.info(f"WBGT実況値データ取得URL: {url}")
+            document = self._get_current_document(location)
             
-            response = self.session.get(url, timeout=10, verify=self.ssl_verify)
-            
-            if response.status_code == 200:
-                return self._parse_current_csv_data(response.text, location)
+            if document is not None:
+                return self._build_current_data(document, location)
             else:
-                logger.warning(f"環境省WBGT実況データ取得に失敗: {response.status_code} - URL: {url}")
                 return self._get_wbgt_current_from_csv(location)
                 
         except Exception as e:
@@ -231,17 +293,12 @@ class EnvWBGTAPI:
             return self._get_alert_from_csv(target_date, file_time, prefecture)
         
         try:
-            # 環境省データサービスの正式URL構造（アラート情報）
-            url = f"{self.base_url}/alert/dl/{now.year}/alert_{target_date}_{file_time}.csv"
-            logger.info(f"熱中症警戒アラートデータ取得URL: {url}")
+            # 同一発表時刻の索引があれば再ダウンロードせずに参照する
+            index = self._get_alert_index(now.year, target_date, file_time)
             
-            response = self.session.get(url, timeout=10, verify=self.ssl_verify)
-            
-            if response.status_code == 200:
-                csv_content = response.content.decode('utf-8')
-                return self._parse_alert_data(csv_content, prefecture)
+            if index is not None:
+                return self._build_alert_data(index, prefecture)
             else:
-                logger.warning(f"環境省アラートデータ取得に失敗: {response.status_code} - URL: {url}")
                 return self._get_alert_from_csv(target_date, file_time, prefecture)
                 
         except Exception as e:
@@ -252,47 +309,27 @@ class EnvWBGTAPI:
     def _parse_forecast_csv_data(self, csv_content, location):
         """予測値CSVデータを解析"""
         try:
-            lines = csv_content.strip().split('\n')
-            if len(lines) < 2:
-                return None
-            
-            # 2行目以降: 地点データ
-            data_lines = lines[1:]
-            target_location_code = location.get('wbgt_location_code')
-            
-            # 指定された地点のデータを検索
-            for data_row_str in data_lines:
-                data_row = data_row_str.split(',')
-                if len(data_row) >= 3 and data_row[0] == target_location_code:
-                    location_code = data_row[0]
-                    update_time = data_row[1]
-                    
-                    # 最新の予測値を取得（3番目の要素から）
-                    wbgt_values = []
-                    for i in range(2, len(data_row)):
-                        if data_row[i].strip():
-                            try:
-                                # WBGT値は10倍されているので10で割る
-                                wbgt_val = int(data_row[i].strip()) / 10.0
-                                wbgt_values.append(wbgt_val)
-                            except (ValueError, TypeError):
-                                continue
-                    
-                    if wbgt_values:
-                        return {
-                            'wbgt_value': wbgt_values[0],  # 最新の予測値
-                            'location_code': location_code,
-                            'location_name': location.get('name'),
-                            'update_time': update_time,
-                            'data_type': 'forecast',
-                            'source': '環境省熱中症予防情報サイト（予測値）'
-                        }
-            
-            return None
-            
+            return self._build_forecast_data(WBGTForecastDocument.parse(csv_content), location)
         except Exception as e:
             logger.error(f"予測値CSVデータ解析エラー: {e}")
             return None
+    
+    def _build_forecast_data(self, document, location):
+        """予測値ドキュメントから指定地点の最新予測値を取得"""
+        target_location_code = location.get('wbgt_location_code')
+        wbgt_value = document.latest(target_location_code)
+        
+        if wbgt_value is None:
+            return None
+        
+        return {
+            'wbgt_value': wbgt_value,  # 最新の予測値
+            'location_code': target_location_code,
+            'location_name': location.get('name'),
+            'update_time': document.update_time(target_location_code),
+            'data_type': 'forecast',
+            'source': '環境省熱中症予防情報サイト（予測値）'
+        }
 
     def get_wbgt_forecast_timeseries(self, location=None):
         """
@@ -310,19 +347,12 @@ class EnvWBGTAPI:
                 from config import LOCATIONS
                 location = LOCATIONS[0]
             
-            prefecture = location.get('prefecture')
-            pref_name = self.prefecture_names.get(prefecture, 'kanagawa')
-            
-            # 環境省データサービスの正式URL構造（都道府県別予測値）
-            url = f"{self.base_url}/prev15WG/dl/yohou_{pref_name}.csv"
-            logger.info(f"WBGT予測値時系列データ取得URL: {url}")
+            # 予測値と同じドキュメントを共有（追加のダウンロードは発生しない）
+            document = self._get_forecast_document(location)
             
-            response = self.session.get(url, timeout=10, verify=self.ssl_verify)
-            
-            if response.status_code == 200:
-                return self._parse_forecast_timeseries_csv_data(response.text, location)
+            if document is not None:
+                return self._build_forecast_timeseries_data(document, location)
             else:
-                logger.warning(f"環境省WBGT時系列データ取得に失敗: {response.status_code} - URL: {url}")
                 return None
                 
         except Exception as e:
@@ -332,205 +362,134 @@ class EnvWBGTAPI:
     def _parse_forecast_timeseries_csv_data(self, csv_content, location):
         """予測値時系列CSVデータを解析"""
         try:
-            from datetime import datetime, timedelta
-            
-            lines = csv_content.strip().split('\n')
-            if len(lines) < 2:
-                return None
-            
-            # 1行目: 時刻ヘッダー
-            time_headers = lines[0].split(',')[2:]  # 最初の2カラムはスキップ
-            
-            # 2行目以降: 地点データ
-            data_lines = lines[1:]
-            target_location_code = location.get('wbgt_location_code')
-            
-            # 指定された地点のデータを検索
-            for data_row_str in data_lines:
-                data_row = data_row_str.split(',')
-                if len(data_row) >= 3 and data_row[0] == target_location_code:
-                    location_code = data_row[0]
-                    update_time = data_row[1]
-                    
-                    # 時系列データを作成
-                    timeseries_data = []
-                    for i, time_str in enumerate(time_headers):
-                        if i + 2 < len(data_row) and data_row[i + 2].strip():
-                            try:
-                                # WBGT値は10倍されているので10で割る
-                                wbgt_val = int(data_row[i + 2].strip()) / 10.0
-                                
-                                # 時刻文字列を解析 (YYYYMMDDHH形式)
-                                if len(time_str.strip()) == 10:
-                                    year = int(time_str[0:4])
-                                    month = int(time_str[4:6])
-                                    day = int(time_str[6:8])
-                                    hour = int(time_str[8:10])
-                                    
-                                    # 24時を0時に変換
-                                    if hour == 24:
-                                        dt = datetime(year, month, day) + timedelta(days=1)
-                                    else:
-                                        dt = datetime(year, month, day, hour)
-                                    
-                                    timeseries_data.append({
-                                        'datetime': dt,
-                                        'wbgt_value': wbgt_val,
-                                        'datetime_str': dt.strftime('%m/%d %H:%M')
-                                    })
-                            except (ValueError, TypeError) as e:
-                                logger.debug(f"時系列データ解析エラー (時刻: {time_str}): {e}")
-                                continue
-                    
-                    if timeseries_data:
-                        return {
-                            'location_code': location_code,
-                            'location_name': location.get('name'),
-                            'update_time': update_time,
-                            'timeseries': timeseries_data,
-                            'data_type': 'forecast_timeseries',
-                            'source': '環境省熱中症予防情報サイト（予測値時系列）'
-                        }
-            
-            return None
-            
+            return self._build_forecast_timeseries_data(WBGTForecastDocument.parse(csv_content), location)
         except Exception as e:
             logger.error(f"予測値時系列CSVデータ解析エラー: {e}")
             return None
     
+    def _build_forecast_timeseries_data(self, document, location):
+        """予測値ドキュメントから指定地点の時系列データを作成"""
+        target_location_code = location.get('wbgt_location_code')
+        
+        timeseries_data = [
+            {
+                'datetime': dt,
+                'wbgt_value': wbgt_val,
+                'datetime_str': dt.strftime('%m/%d %H:%M')
+            }
+            for dt, wbgt_val in document.timeseries(target_location_code)
+        ]
+        
+        if not timeseries_data:
+            return None
+        
+        return {
+            'location_code': target_location_code,
+            'location_name': location.get('name'),
+            'update_time': document.update_time(target_location_code),
+            'timeseries': timeseries_data,
+            'data_type': 'forecast_timeseries',
+            'source': '環境省熱中症予防情報サイト（予測値時系列）'
+        }
+    
     def _parse_current_csv_data(self, csv_content, location):
         """実況値CSVデータを解析"""
         try:
-            lines = csv_content.strip().split('\n')
-            if len(lines) < 2:
-                return None
-            
-            target_location_code = location.get('wbgt_location_code')
-            
-            # ヘッダー行から地点番号のインデックスを取得
-            header = lines[0].split(',')
-            target_column_index = -1
-            
-            for i, column_name in enumerate(header):
-                if column_name.strip() == target_location_code:
-                    target_column_index = i
-                    break
-            
-            if target_column_index == -1:
-                logger.warning(f"地点番号 {target_location_code} がヘッダーに見つかりません: {header}")
-                return None
-            
-            # 最新のデータ行から検索（下から上へ）
-            for line in reversed(lines[1:]):  # ヘッダー行をスキップ
-                data = line.split(',')
-                if len(data) > target_column_index:
-                    date_time = f"{data[0]} {data[1]}" if len(data) > 1 else data[0]
-                    
-                    try:
-                        # 実況値は10で割る必要がない（既に実際の値）
-                        wbgt_val = float(data[target_column_index]) if data[target_column_index].strip() else None
-                        
-                        if wbgt_val is not None:
-                            return {
-                                'wbgt_value': wbgt_val,
-                                'location_code': target_location_code,
-                                'location_name': location.get('name'),
-                                'datetime': date_time,
-                                'data_type': 'current',
-                                'source': '環境省熱中症予防情報サイト（実況値）'
-                            }
-                    except (ValueError, TypeError):
-                        continue
-            
-            return None
-            
+            return self._build_current_data(WBGTCurrentTailReader.from_bytes(csv_content.encode('utf-8')), location)
         except Exception as e:
             logger.error(f"実況値CSVデータ解析エラー: {e}")
             return None
     
+    def _build_current_data(self, document, location):
+        """実況値ドキュメントから指定地点の最新実況値を取得"""
+        target_location_code = location.get('wbgt_location_code')
+        
+        if document.column_index(target_location_code) == -1:
+            logger.warning(f"地点番号 {target_location_code} がヘッダーに見つかりません: {document.header}")
+            return None
+        
+        latest = document.latest(target_location_code)
+        if latest is None:
+            return None
+        
+        date_time, wbgt_val = latest
+        current_data = {
+            'wbgt_value': wbgt_val,
+            'location_code': target_location_code,
+            'location_name': location.get('name'),
+            'datetime': date_time,
+            'data_type': 'current',
+            'source': '環境省熱中症予防情報サイト（実況値）'
+        }
+        if isinstance(document, WBGTObservationMatrix):
+            # 月間の実況値を配列で保持している場合は、日最高値と基準値以上の時間数も全地点分まとめて求める
+            daily_max, hours = document.daily_summary(target_location_code, DAILY_HOURS_THRESHOLD)
+            current_data.update({
+                'daily_max': daily_max,
+                'hours_above_threshold': hours,
+                'threshold': DAILY_HOURS_THRESHOLD
+            })
+        return current_data
+    
+    def _get_alert_index(self, year, target_date, file_time):
+        """全国アラートCSVを取得して索引化（同一発表時刻のファイルは1回だけ）"""
+        # 環境省データサービスの正式URL構造（アラート情報）
+        url = f"{self.base_url}/alert/dl/{year}/alert_{target_date}_{file_time}.csv"
+        
+        with self._alert_lock:
+            # 複数の取得スレッドから同時に呼ばれるため、URLの確認と切り替えは排他で行う
+            if url != self._alert_url:
+                # 発表時刻が変わったら前回の索引を破棄
+                self._alert_coalescer.clear()
+                self._alert_url = url
+        
+        def load():
+            logger.info(f"熱中症警戒アラートデータ取得URL: {url}")
+            
+            try:
+                return self.http_cache.get(url, lambda response: WBGTAlertIndex.parse(response.content.decode('utf-8')),
+                                           'env_alert', session=self.session, timeout=10, verify=self.ssl_verify)
+            except requests.exceptions.HTTPError as e:
+                logger.warning(f"環境省アラートデータ取得に失敗: {e.response.status_code} - URL: {url}")
+                return None
+        
+        index = self._alert_coalescer.get(url, load)
+        if index is None:
+            # 未発表などで取得できなかった場合は保持せず、次回再試行する
+            self._alert_coalescer.discard(url)
+        return index
+    
     def _parse_alert_data(self, csv_content, target_prefecture):
         """アラートデータを解析"""
         try:
-            lines = csv_content.strip().split('\n')
-            if not lines:
-                return None
-            
-            alerts = {
-                'today': {'status': '発表なし', 'level': 0, 'message': ''},
-                'tomorrow': {'status': '発表なし', 'level': 0, 'message': ''}
-            }
-            
-            # メタデータを除いてデータ行のみ処理
-            data_lines = []
-            for line in lines:
-                # メタデータ行をスキップ（Title, Encoding, TimeZoneなど）
-                # 都道府県データ行は含める（カンマ区切りで12項目以上あり、数字で始まらないもの）
-                if (not line.startswith('Title,') and 
-                    not line.startswith('Encoding,') and 
-                    not line.startswith('TimeZone,') and 
-                    not line.startswith('CreateDate,') and 
-                    not line.startswith('CreateTime,') and 
-                    not line.startswith('PublishingOffice,') and 
-                    not line.startswith('ReportDate,') and 
-                    not line.startswith('ReportTime,') and 
-                    not line.startswith('TargetDate') and 
-                    not line.startswith('TargetTime') and 
-                    not line.startswith('DurationTime') and 
-                    not line.startswith('BriefComment') and 
-                    not line.startswith('KeyMessage') and 
-                    not line.startswith('FlagExplanation') and 
-                    not line.startswith('Status') and 
-                    not line.startswith('InternalFlag') and
-                    not line.startswith('府県予報区,') and
-                    line.strip() and
-                    len(line.split(',')) >= 8):  # 都道府県データ行は最低8項目以上
-                    data_lines.append(line)
-                    logger.debug(f"データ行として追加: {line[:50]}...")
-            
-            logger.info(f"アラートCSVから{len(data_lines)}行のデータを抽出")
-            
-            # CSVのデータ行を解析
-            for line in data_lines:
-                data = line.split(',')
-                if len(data) >= 8:  # 都道府県データ行は最低8項目以上
-                    prefecture_name = data[4] if len(data) > 4 else ''
-                    target_date1_flag = data[6] if len(data) > 6 else '0'
-                    target_date2_flag = data[7] if len(data) > 7 else '0'
-                    
-                    logger.debug(f"都道府県: {prefecture_name}, フラグ1: {target_date1_flag}, フラグ2: {target_date2_flag}")
-                    logger.debug(f"target_prefecture='{target_prefecture}', prefecture_name='{prefecture_name}'")
-                    logger.debug(f"target_short='{target_prefecture.replace('県', '').replace('府', '').replace('都', '').replace('道', '')}'")
-                    
-                    # 対象都道府県のデータを検索（都道府県名の部分一致）
-                    target_short = target_prefecture.replace('県', '').replace('府', '').replace('都', '').replace('道', '')
-                    if (target_short in prefecture_name or 
-                        prefecture_name in target_short or 
-                        target_prefecture == prefecture_name):
-                        
-                        logger.info(f"対象都道府県 {target_prefecture} のデータを発見: {prefecture_name}")
-                        
-                        # TargetDate1フラグ（今日）の処理
-                        alerts['today'] = self._parse_alert_flag(target_date1_flag)
-                        
-                        # TargetDate2フラグ（明日）の処理  
-                        alerts['tomorrow'] = self._parse_alert_flag(target_date2_flag)
-                        break
-            
-            return {
-                'prefecture': target_prefecture,
-                'alerts': alerts,
-                'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'source': '環境省熱中症予防情報サイト（公式アラート）'
-            }
-            
+            return self._build_alert_data(WBGTAlertIndex.parse(csv_content), target_prefecture)
         except Exception as e:
             logger.error(f"アラートデータ解析エラー: {e}")
             return None
     
+    def _build_alert_data(self, index, target_prefecture):
+        """アラート索引から対象都道府県のアラート情報を作成"""
+        alerts = {
+            'today': {'status': '発表なし', 'level': 0, 'message': ''},
+            'tomorrow': {'status': '発表なし', 'level': 0, 'message': ''}
+        }
+        
+        flags = index.lookup(target_prefecture)
+        if flags is not None:
+            logger.debug(f"対象都道府県 {target_prefecture} のアラートフラグを参照: {flags}")
+            target_date1_flag, target_date2_flag = flags
+            alerts['today'] = self._parse_alert_flag(target_date1_flag)
+            alerts['tomorrow'] = self._parse_alert_flag(target_date2_flag)
+        
+        return {
+            'prefecture': target_prefecture,
+            'alerts': alerts,
+            'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'source': '環境省熱中症予防情報サイト（公式アラート）'
+        }
+    
     def _parse_alert_flag(self, flag_value):
         """アラートフラグを解析"""
-        logger.debug(f"アラートフラグ解析: flag_value='{flag_value}' (type: {type(flag_value)})")
-        
         flag_map = {
             '0': {'status': '発表なし', 'level': 0, 'message': ''},
             '1': {'status': '熱中症警戒情報', 'level': 3, 'message': '熱中症に警戒してください'},
@@ -539,9 +498,7 @@ class EnvWBGTAPI:
             '9': {'status': '発表時間外', 'level': 0, 'message': '発表時間外です'}
         }
         
-        result = flag_map.get(str(flag_value), {'status': '情報なし', 'level': 0, 'message': ''})
-        logger.debug(f"アラートフラグ解析結果: {result}")
-        return result
+        return flag_map.get(str(flag_value), {'status': '情報なし', 'level': 0, 'message': ''})
     
     def _get_alert_numeric_level(self, alert_level):
         """アラートレベルを数値に変換"""
@@ -592,33 +549,19 @@ class EnvWBGTAPI:
         try:
             prefecture = location.get('prefecture')
             pref_name = self.prefecture_names.get(prefecture, 'kanagawa')
+            file_name = f'wbgt_forecast_{pref_name}.csv'
             
-            # CSVファイルのパスを構築
-            script_dir = os.path.dirname(os.path.dirname(__file__))
-            csv_file = os.path.join(script_dir, 'data', 'csv', f'wbgt_forecast_{pref_name}.csv')
-            
-            if not os.path.exists(csv_file):
-                logger.warning(f"WBGT予測CSVファイルが見つかりません: {csv_file}")
-                return None
-            
-            # ファイルの更新時間をチェック（24時間以内かどうか）
-            file_mtime = os.path.getmtime(csv_file)
-            current_time = datetime.now().timestamp()
-            if current_time - file_mtime > 24 * 3600:  # 24時間
-                logger.warning(f"WBGT予測CSVファイルが古すぎます（{(current_time - file_mtime) / 3600:.1f}時間前）")
+            # 24時間以内に更新されたファイルのみ使用
+            document = self.fallback_store.load_document(file_name, WBGTForecastDocument, max_age_hours=24)
+            if document is None:
                 return None
             
-            # CSVファイルを読み込み
-            with open(csv_file, 'r', encoding='utf-8') as f:
-                csv_content = f.read()
-            
-            logger.info(f"CSVファイルからWBGT予測データを正常に読み込みました: {csv_file}")
-            return self._parse_forecast_csv_data(csv_content, location)
+            logger.info(f"CSVファイルからWBGT予測データを正常に読み込みました: {self.fallback_store.path(file_name)}")
+            return self._build_forecast_data(document, location)
             
         except Exception as e:
             logger.error(f"CSVファイルからのWBGT予測データ読み込みエラー: {e}")
             return None
-    
     def _get_wbgt_current_from_csv(self, location):
         """CSVファイルからWBGT実況データを取得（APIアクセス失敗時のフォールバック）"""
         try:
@@ -626,57 +569,33 @@ class EnvWBGTAPI:
             pref_name = self.prefecture_names.get(prefecture, 'kanagawa')
             now = datetime.now()
             year_month = f"{now.year}{now.month:02d}"
-            
-            # CSVファイルのパスを構築
-            script_dir = os.path.dirname(os.path.dirname(__file__))
-            csv_file = os.path.join(script_dir, 'data', 'csv', f'wbgt_current_{pref_name}_{year_month}.csv')
-            
-            if not os.path.exists(csv_file):
-                logger.warning(f"WBGT実況CSVファイルが見つかりません: {csv_file}")
-                return None
-            
-            # ファイルの更新時間をチェック（6時間以内かどうか）
-            file_mtime = os.path.getmtime(csv_file)
-            current_time = datetime.now().timestamp()
-            if current_time - file_mtime > 6 * 3600:  # 6時間
-                logger.warning(f"WBGT実況CSVファイルが古すぎます（{(current_time - file_mtime) / 3600:.1f}時間前）")
-                return None
-            
-            # CSVファイルを読み込み
-            with open(csv_file, 'r', encoding='utf-8') as f:
-                csv_content = f.read()
-            
-            logger.info(f"CSVファイルからWBGT実況データを正常に読み込みました: {csv_file}")
-            return self._parse_current_csv_data(csv_content, location)
+            file_name = f'wbgt_current_{pref_name}_{year_month}.csv'
+            
+            # 6時間以内に更新されたファイルのみ使用
+            # スナップショットがなければ末尾から読み込む（最新値が見つかった時点で終了）
+            with self.fallback_store.open_document(file_name, WBGTObservationMatrix, max_age_hours=6,
+                                                   reader=WBGTCurrentTailReader) as document:
+                if document is None:
+                    return None
+                
+                logger.info(f"CSVファイルからWBGT実況データを正常に読み込みました: {self.fallback_store.path(file_name)}")
+                return self._build_current_data(document, location)
             
         except Exception as e:
             logger.error(f"CSVファイルからのWBGT実況データ読み込みエラー: {e}")
             return None
-    
     def _get_alert_from_csv(self, target_date, file_time, prefecture):
         """CSVファイルからアラートデータを取得（APIアクセス失敗時のフォールバック）"""
         try:
-            # CSVファイルのパスを構築
-            script_dir = os.path.dirname(os.path.dirname(__file__))
-            csv_file = os.path.join(script_dir, 'data', 'csv', f'alert_{target_date}_{file_time}.csv')
+            file_name = f'alert_{target_date}_{file_time}.csv'
             
-            if not os.path.exists(csv_file):
-                logger.warning(f"アラートCSVファイルが見つかりません: {csv_file}")
+            # 24時間以内に更新されたファイルのみ使用
+            index = self.fallback_store.load_document(file_name, WBGTAlertIndex, max_age_hours=24)
+            if index is None:
                 return None
             
-            # ファイルの更新時間をチェック（24時間以内かどうか）
-            file_mtime = os.path.getmtime(csv_file)
-            current_time = datetime.now().timestamp()
-            if current_time - file_mtime > 24 * 3600:  # 24時間
-                logger.warning(f"アラートCSVファイルが古すぎます（{(current_time - file_mtime) / 3600:.1f}時間前）")
-                return None
-            
-            # CSVファイルを読み込み
-            with open(csv_file, 'r', encoding='utf-8') as f:
-                csv_content = f.read()
-            
-            logger.info(f"CSVファイルからアラートデータを正常に読み込みました: {csv_file}")
-            return self._parse_alert_data(csv_content, prefecture)
+            logger.info(f"CSVファイルからアラートデータを正常に読み込みました: {self.fallback_store.path(file_name)}")
+            return self._build_alert_data(index, prefecture)
             
         except Exception as e:
             logger.error(f"CSVファイルからのアラートデータ読み込みエラー: {e}")
@@ -6,6 +6,12 @@ import sys
 from datetime import datetime, timedelta
 import logging
 import re
+import threading
+from env_wbgt_data import (WBGTForecastDocument, WBGTObservationMatrix, WBGTCurrentTailReader, WBGTAlertIndex,
+                            DAILY_HOURS_THRESHOLD)
+from fetch_engine import RequestCoalescer
+from csv_store import get_fallback_store
+from http_client import get_shared_cache, get_shared_session, RangeTailFetcher
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
@@ -20,10 +26,25 @@ class EnvWBGTAPIEN:
     
     def __init__(self):
         self.base_url = "https://www.wbgt.env.go.jp"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'WBGT-Kiosk/1.0 (Heat Stroke Prevention System)'
-        })
+        # The connection pool is shared by all clients
+        self.session = get_shared_session()
+        
+        # Prefecture-wide CSVs are shared by all locations: one transfer and one parse per URL
+        self._coalescer = RequestCoalescer()
+        # Whether a prefecture CSV failed to download this cycle (a station with no data does not count)
+        self.cycle_failed = False
+        
+        # The nationwide alert CSV is fetched and parsed once per publication slot (file) and shared by all locations
+        self._alert_coalescer = RequestCoalescer()
+        self._alert_url = None
+        self._alert_lock = threading.Lock()
+        
+        # Unchanged CSVs are answered with 304 and the previous parse result is reused
+        self.http_cache = get_shared_cache()
+        # The monthly current CSV only grows, so only the bytes after the held length are fetched
+        self.tail_fetcher = RangeTailFetcher()
+        # On API failure the files in data/csv are read through memory maps
+        self.fallback_store = get_fallback_store()
         
         # SSL configuration for corporate Windows environments
         try:
@@ -166,19 +187,11 @@ class EnvWBGTAPIEN:
                 from config_en import LOCATIONS
                 location = LOCATIONS[0]
             
-            prefecture = location.get('prefecture')
-            pref_name = self.prefecture_names.get(prefecture, 'kanagawa')
-            
-            # Official URL structure for Environment Ministry data service (prefecture-specific forecast)
-            url = f"{self.base_url}/prev15WG/dl/yohou_{pref_name}.csv"
-            logger.info(f"WBGT forecast data URL: {url}")
+            document = self._get_forecast_document(location)
             
-            response = self.session.get(url, timeout=10, verify=self.ssl_verify)
-            
-            if response.status_code == 200:
-                return self._parse_forecast_csv_data(response.text, location)
+            if document is not None:
+                return self._build_forecast_data(document, location)
             else:
-                logger.warning(f"Failed to get data from Environment Ministry WBGT service: {response.status_code} - URL: {url}")
                 return self._get_wbgt_forecast_from_csv(location)
                 
         except Exception as e:
@@ -186,6 +199,65 @@ class EnvWBGTAPIEN:
             logger.info("Attempting to read WBGT forecast data from CSV file...")
             return self._get_wbgt_forecast_from_csv(location)
     
+    def begin_cycle(self):
+        """
+        Notify the start of a data update cycle
+        
+        Discards prefecture CSVs fetched in the previous cycle so they are re-fetched on next access
+        """
+        self._coalescer.clear()
+        self.cycle_failed = False
+    
+    def _get_forecast_document(self, location):
+        """Fetch and parse the forecast CSV (only once per prefecture within a cycle)"""
+        prefecture = location.get('prefecture')
+        pref_name = self.prefecture_names.get(prefecture, 'kanagawa')
+        
+        # Official URL structure for Environment Ministry data service (prefecture-specific forecast)
+        url = f"{self.base_url}/prev15WG/dl/yohou_{pref_name}.csv"
+        
+        def fetch():
+            return self.http_cache.get(url, lambda response: WBGTForecastDocument.parse(response.text), 'env_forecast',
+                                       session=self.session, timeout=10, verify=self.ssl_verify)
+        
+        return self._get_document(url, fetch, "WBGT forecast data URL", "Failed to get data from Environment Ministry WBGT service")
+    
+    def _get_current_document(self, location):
+        """Fetch and parse the current CSV (only once per prefecture within a cycle)"""
+        prefecture = location.get('prefecture')
+        pref_name = self.prefecture_names.get(prefecture, 'kanagawa')
+        now = datetime.now()
+        year_month = f"{now.year}{now.month:02d}"
+        
+        # Official URL structure for Environment Ministry data service (prefecture-specific current data)
+        url = f"{self.base_url}/est15WG/dl/wbgt_{pref_name}_{year_month}.csv"
+        
+        def fetch():
+            return self.tail_fetcher.get(
+                pref_name, url,
+                lambda content: WBGTObservationMatrix.parse(content.decode('utf-8')),
+                lambda document, content: document.extend(content.decode('utf-8')),
+                'env_current', session=self.session, timeout=10, verify=self.ssl_verify)
+        
+        return self._get_document(url, fetch, "WBGT current data URL", "Failed to get Environment Ministry WBGT current data")
+    
+    def _get_document(self, url, fetch, log_label, warning_label):
+        """Download and parse a CSV (concurrent and same-cycle requests for one URL are coalesced)"""
+        def load():
+            logger.info(f"{log_label}: {url}")
+            
+            try:
+                return fetch()
+            except requests.exceptions.HTTPError as e:
+                logger.warning(f"{warning_label}: {e.response.status_code} - URL: {url}")
+                self.cycle_failed = True
+                return None
+            except Exception:
+                self.cycle_failed = True
+                raise
+        
+        return self._coalescer.get(url, load)
+    
     def get_wbgt_current_data(self, location=None):
         """
         Get WBGT current data
@@ -213,21 +285,11 @@ class EnvWBGTAPIEN:
                 from config_en import LOCATIONS
                 location = LOCATIONS[0]
                 
-            prefecture = location.get('prefecture')
-            pref_name = self.prefecture_names.get(prefecture, 'kanagawa')
-            now = datetime.now()
-            year_month = f"{now.year}{now.month:02d}"
-            
-            # Official URL structure for Environment Ministry data service (prefecture-specific current data)
-            url = f"{self.base_url}/est15WG/dl/wbgt_{pref_name}_{year_month}.csv"
-            logger.info(f"WBGT current data URL: {url}")
+            document = self._get_current_document(location)
             
-            response = self.session.get(url, timeout=10, verify=self.ssl_verify)
-            
-            if response.status_code == 200:
-                return self._parse_current_csv_data(response.text, location)
+            if document is not None:
+                return self._build_current_data(document, location)
             else:
-                logger.warning(f"Failed to get Environment Ministry WBGT current data: {response.status_code} - URL: {url}")
                 return self._get_wbgt_current_from_csv(location)
                 
         except Exception as e:
@@ -273,17 +335,12 @@ class EnvWBGTAPIEN:
                 file_time = '17'
                 target_date = date_str
             
-            # Official URL structure for Environment Ministry data service (alert information)
-            url = f"{self.base_url}/alert/dl/{now.year}/alert_{target_date}_{file_time}.csv"
-            logger.info(f"Heat stroke warning alert data URL: {url}")
-            
-            response = self.session.get(url, timeout=10, verify=self.ssl_verify)
+            # Reuse the index for the same publication slot instead of downloading again
+            index = self._get_alert_index(now.year, target_date, file_time)
             
-            if response.status_code == 200:
-                csv_content = response.content.decode('utf-8')
-                return self._parse_alert_data(csv_content, prefecture)
+            if index is not None:
+                return self._build_alert_data(index, prefecture)
             else:
-                logger.warning(f"Failed to get Environment Ministry alert data: {response.status_code} - URL: {url}")
                 return self._get_alert_from_csv(target_date, file_time, prefecture)
                 
         except Exception as e:
@@ -294,47 +351,27 @@ class EnvWBGTAPIEN:
     def _parse_forecast_csv_data(self, csv_content, location):
         """Parse forecast CSV data"""
         try:
-            lines = csv_content.strip().split('\n')
-            if len(lines) < 2:
-                return None
-            
-            # From 2nd line onwards: location data
-            data_lines = lines[1:]
-            target_location_code = location.get('wbgt_location_code')
-            
-            # Search for data for specified location
-            for data_row_str in data_lines:
-                data_row = data_row_str.split(',')
-                if len(data_row) >= 3 and data_row[0] == target_location_code:
-                    location_code = data_row[0]
-                    update_time = data_row[1]
-                    
-                    # Get latest forecast value (from 3rd element)
-                    wbgt_values = []
-                    for i in range(2, len(data_row)):
-                        if data_row[i].strip():
-                            try:
-                                # WBGT value is multiplied by 10, so divide by 10
-                                wbgt_val = int(data_row[i].strip()) / 10.0
-                                wbgt_values.append(wbgt_val)
-                            except (ValueError, TypeError):
-                                continue
-                    
-                    if wbgt_values:
-                        return {
-                            'wbgt_value': wbgt_values[0],  # Latest forecast value
-                            'location_code': location_code,
-                            'location_name': location.get('name'),
-                            'update_time': update_time,
-                            'data_type': 'forecast',
-                            'source': 'Environment Ministry Heat Stroke Prevention Information Site (Forecast)'
-                        }
-            
-            return None
-            
+            return self._build_forecast_data(WBGTForecastDocument.parse(csv_content), location)
         except Exception as e:
             logger.error(f"Forecast CSV data parsing error: {e}")
             return None
+    
+    def _build_forecast_data(self, document, location):
+        """Get the latest forecast value for the location from a forecast document"""
+        target_location_code = location.get('wbgt_location_code')
+        wbgt_value = document.latest(target_location_code)
+        
+        if wbgt_value is None:
+            return None
+        
+        return {
+            'wbgt_value': wbgt_value,  # Latest forecast value
+            'location_code': target_location_code,
+            'location_name': location.get('name'),
+            'update_time': document.update_time(target_location_code),
+            'data_type': 'forecast',
+            'source': 'Environment Ministry Heat Stroke Prevention Information Site (Forecast)'
+        }
 
     def get_wbgt_forecast_timeseries(self, location=None):
         """
@@ -352,19 +389,12 @@ class EnvWBGTAPIEN:
                 from config_en import LOCATIONS
                 location = LOCATIONS[0]
             
-            prefecture = location.get('prefecture')
-            pref_name = self.prefecture_names.get(prefecture, 'kanagawa')
-            
-            # Official URL structure for Environment Ministry data service (prefecture-specific forecast)
-            url = f"{self.base_url}/prev15WG/dl/yohou_{pref_name}.csv"
-            logger.info(f"WBGT forecast time series data URL: {url}")
-            
-            response = self.session.get(url, timeout=10, verify=self.ssl_verify)
+            # Shares the forecast document (no extra download)
+            document = self._get_forecast_document(location)
             
-            if response.status_code == 200:
-                return self._parse_forecast_timeseries_csv_data(response.text, location)
+            if document is not None:
+                return self._build_forecast_timeseries_data(document, location)
             else:
-                logger.warning(f"Failed to get Environment Ministry WBGT time series data: {response.status_code} - URL: {url}")
                 return self._get_wbgt_timeseries_from_csv(location)
                 
         except Exception as e:
@@ -375,205 +405,134 @@ class EnvWBGTAPIEN:
     def _parse_forecast_timeseries_csv_data(self, csv_content, location):
         """Parse forecast time series CSV data"""
         try:
-            from datetime import datetime, timedelta
-            
-            lines = csv_content.strip().split('\n')
-            if len(lines) < 2:
-                return None
-            
-            # 1st line: time headers
-            time_headers = lines[0].split(',')[2:]  # Skip first 2 columns
-            
-            # From 2nd line onwards: location data
-            data_lines = lines[1:]
-            target_location_code = location.get('wbgt_location_code')
-            
-            # Search for data for specified location
-            for data_row_str in data_lines:
-                data_row = data_row_str.split(',')
-                if len(data_row) >= 3 and data_row[0] == target_location_code:
-                    location_code = data_row[0]
-                    update_time = data_row[1]
-                    
-                    # Create time series data
-                    timeseries_data = []
-                    for i, time_str in enumerate(time_headers):
-                        if i + 2 < len(data_row) and data_row[i + 2].strip():
-                            try:
-                                # WBGT value is multiplied by 10, so divide by 10
-                                wbgt_val = int(data_row[i + 2].strip()) / 10.0
-                                
-                                # Parse time string (YYYYMMDDHH format)
-                                if len(time_str.strip()) == 10:
-                                    year = int(time_str[0:4])
-                                    month = int(time_str[4:6])
-                                    day = int(time_str[6:8])
-                                    hour = int(time_str[8:10])
-                                    
-                                    # Convert 24:00 to 00:00 of next day
-                                    if hour == 24:
-                                        dt = datetime(year, month, day) + timedelta(days=1)
-                                    else:
-                                        dt = datetime(year, month, day, hour)
-                                    
-                                    timeseries_data.append({
-                                        'datetime': dt,
-                                        'wbgt_value': wbgt_val,
-                                        'datetime_str': dt.strftime('%m/%d %H:%M')
-                                    })
-                            except (ValueError, TypeError) as e:
-                                logger.debug(f"Time series data parsing error (time: {time_str}): {e}")
-                                continue
-                    
-                    if timeseries_data:
-                        return {
-                            'location_code': location_code,
-                            'location_name': location.get('name'),
-                            'update_time': update_time,
-                            'timeseries': timeseries_data,
-                            'data_type': 'forecast_timeseries',
-                            'source': 'Environment Ministry Heat Stroke Prevention Information Site (Forecast Time Series)'
-                        }
-            
-            return None
-            
+            return self._build_forecast_timeseries_data(WBGTForecastDocument.parse(csv_content), location)
         except Exception as e:
             logger.error(f"Forecast time series CSV data parsing error: {e}")
             return None
     
+    def _build_forecast_timeseries_data(self, document, location):
+        """Build time series data for the location from a forecast document"""
+        target_location_code = location.get('wbgt_location_code')
+        
+        timeseries_data = [
+            {
+                'datetime': dt,
+                'wbgt_value': wbgt_val,
+                'datetime_str': dt.strftime('%m/%d %H:%M')
+            }
+            for dt, wbgt_val in document.timeseries(target_location_code)
+        ]
+        
+        if not timeseries_data:
+            return None
+        
+        return {
+            'location_code': target_location_code,
+            'location_name': location.get('name'),
+            'update_time': document.update_time(target_location_code),
+            'timeseries': timeseries_data,
+            'data_type': 'forecast_timeseries',
+            'source': 'Environment Ministry Heat Stroke Prevention Information Site (Forecast Time Series)'
+        }
+    
     def _parse_current_csv_data(self, csv_content, location):
         """Parse current CSV data"""
         try:
-            lines = csv_content.strip().split('\n')
-            if len(lines) < 2:
-                return None
-            
-            target_location_code = location.get('wbgt_location_code')
-            
-            # Get location code index from header row
-            header = lines[0].split(',')
-            target_column_index = -1
-            
-            for i, column_name in enumerate(header):
-                if column_name.strip() == target_location_code:
-                    target_column_index = i
-                    break
-            
-            if target_column_index == -1:
-                logger.warning(f"Location code {target_location_code} not found in header: {header}")
-                return None
-            
-            # Search from latest data rows (bottom to top)
-            for line in reversed(lines[1:]):  # Skip header row
-                data = line.split(',')
-                if len(data) > target_column_index:
-                    date_time = f"{data[0]} {data[1]}" if len(data) > 1 else data[0]
-                    
-                    try:
-                        # Current values don't need division by 10 (already actual values)
-                        wbgt_val = float(data[target_column_index]) if data[target_column_index].strip() else None
-                        
-                        if wbgt_val is not None:
-                            return {
-                                'wbgt_value': wbgt_val,
-                                'location_code': target_location_code,
-                                'location_name': location.get('name'),
-                                'datetime': date_time,
-                                'data_type': 'current',
-                                'source': 'Environment Ministry Heat Stroke Prevention Information Site (Current)'
-                            }
-                    except (ValueError, TypeError):
-                        continue
-            
-            return None
-            
+            return self._build_current_data(WBGTCurrentTailReader.from_bytes(csv_content.encode('utf-8')), location)
         except Exception as e:
             logger.error(f"Current CSV data parsing error: {e}")
             return None
     
+    def _build_current_data(self, document, location):
+        """Get the latest current value for the location from a current document"""
+        target_location_code = location.get('wbgt_location_code')
+        
+        if document.column_index(target_location_code) == -1:
+            logger.warning(f"Location code {target_location_code} not found in header: {document.header}")
+            return None
+        
+        latest = document.latest(target_location_code)
+        if latest is None:
+            return None
+        
+        date_time, wbgt_val = latest
+        current_data = {
+            'wbgt_value': wbgt_val,
+            'location_code': target_location_code,
+            'location_name': location.get('name'),
+            'datetime': date_time,
+            'data_type': 'current',
+            'source': 'Environment Ministry Heat Stroke Prevention Information Site (Current)'
+        }
+        if isinstance(document, WBGTObservationMatrix):
+            # With the monthly matrix, the daily max and hours above the threshold are computed for all stations at once
+            daily_max, hours = document.daily_summary(target_location_code, DAILY_HOURS_THRESHOLD)
+            current_data.update({
+                'daily_max': daily_max,
+                'hours_above_threshold': hours,
+                'threshold': DAILY_HOURS_THRESHOLD
+            })
+        return current_data
+    
+    def _get_alert_index(self, year, target_date, file_time):
+        """Download and index the nationwide alert CSV (once per publication slot file)"""
+        # Official URL structure for Environment Ministry data service (alert information)
+        url = f"{self.base_url}/alert/dl/{year}/alert_{target_date}_{file_time}.csv"
+        
+        with self._alert_lock:
+            # Called from several fetch workers at once, so check and switch the URL under the lock
+            if url != self._alert_url:
+                # Discard the previous index when the publication slot changes
+                self._alert_coalescer.clear()
+                self._alert_url = url
+        
+        def load():
+            logger.info(f"Heat stroke warning alert data URL: {url}")
+            
+            try:
+                return self.http_cache.get(url, lambda response: WBGTAlertIndex.parse(response.content.decode('utf-8')),
+                                           'env_alert', session=self.session, timeout=10, verify=self.ssl_verify)
+            except requests.exceptions.HTTPError as e:
+                logger.warning(f"Failed to get Environment Ministry alert data: {e.response.status_code} - URL: {url}")
+                return None
+        
+        index = self._alert_coalescer.get(url, load)
+        if index is None:
+            # Not kept when unavailable (e.g. not yet published) so the next request retries
+            self._alert_coalescer.discard(url)
+        return index
+    
     def _parse_alert_data(self, csv_content, target_prefecture):
         """Parse alert data"""
         try:
-            lines = csv_content.strip().split('\n')
-            if not lines:
-                return None
-            
-            alerts = {
-                'today': {'status': 'No Alert', 'level': 0, 'message': ''},
-                'tomorrow': {'status': 'No Alert', 'level': 0, 'message': ''}
-            }
-            
-            # Process only data lines, excluding metadata
-            data_lines = []
-            for line in lines:
-                # Skip metadata lines (Title, Encoding, TimeZone, etc.)
-                # Include prefecture data lines (comma-separated with 8+ items)
-                if (not line.startswith('Title,') and 
-                    not line.startswith('Encoding,') and 
-                    not line.startswith('TimeZone,') and 
-                    not line.startswith('CreateDate,') and 
-                    not line.startswith('CreateTime,') and 
-                    not line.startswith('PublishingOffice,') and 
-                    not line.startswith('ReportDate,') and 
-                    not line.startswith('ReportTime,') and 
-                    not line.startswith('TargetDate') and 
-                    not line.startswith('TargetTime') and 
-                    not line.startswith('DurationTime') and 
-                    not line.startswith('BriefComment') and 
-                    not line.startswith('KeyMessage') and 
-                    not line.startswith('FlagExplanation') and 
-                    not line.startswith('Status') and 
-                    not line.startswith('InternalFlag') and
-                    not line.startswith('府県予報区,') and
-                    line.strip() and
-                    len(line.split(',')) >= 8):  # Prefecture data lines have minimum 8 items
-                    data_lines.append(line)
-                    logger.debug(f"Added data line: {line[:50]}...")
-            
-            logger.info(f"Extracted {len(data_lines)} lines of data from alert CSV")
-            
-            # Parse CSV data lines
-            for line in data_lines:
-                data = line.split(',')
-                if len(data) >= 8:  # Prefecture data lines have minimum 8 items
-                    prefecture_name = data[4] if len(data) > 4 else ''
-                    target_date1_flag = data[6] if len(data) > 6 else '0'
-                    target_date2_flag = data[7] if len(data) > 7 else '0'
-                    
-                    logger.debug(f"Prefecture: {prefecture_name}, Flag1: {target_date1_flag}, Flag2: {target_date2_flag}")
-                    logger.debug(f"target_prefecture='{target_prefecture}', prefecture_name='{prefecture_name}'")
-                    logger.debug(f"target_short='{target_prefecture.replace('県', '').replace('府', '').replace('都', '').replace('道', '')}'")
-                    
-                    # Search for target prefecture data (partial match of prefecture name)
-                    target_short = target_prefecture.replace('県', '').replace('府', '').replace('都', '').replace('道', '')
-                    if (target_short in prefecture_name or 
-                        prefecture_name in target_short or 
-                        target_prefecture == prefecture_name):
-                        
-                        logger.info(f"Found data for target prefecture {target_prefecture}: {prefecture_name}")
-                        
-                        # Process TargetDate1 flag (today)
-                        alerts['today'] = self._parse_alert_flag(target_date1_flag)
-                        
-                        # Process TargetDate2 flag (tomorrow)  
-                        alerts['tomorrow'] = self._parse_alert_flag(target_date2_flag)
-                        break
-            
-            return {
-                'prefecture': target_prefecture,
-                'alerts': alerts,
-                'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'source': 'Environment Ministry Heat Stroke Prevention Information Site (Official Alert)'
-            }
-            
+            return self._build_alert_data(WBGTAlertIndex.parse(csv_content), target_prefecture)
         except Exception as e:
             logger.error(f"Alert data parsing error: {e}")
             return None
     
+    def _build_alert_data(self, index, target_prefecture):
+        """Create alert information for the target prefecture from the alert index"""
+        alerts = {
+            'today': {'status': 'No Alert', 'level': 0, 'message': ''},
+            'tomorrow': {'status': 'No Alert', 'level': 0, 'message': ''}
+        }
+        
+        flags = index.lookup(target_prefecture)
+        if flags is not None:
+            logger.debug(f"Looking up alert flags for target prefecture {target_prefecture}: {flags}")
+            target_date1_flag, target_date2_flag = flags
+            alerts['today'] = self._parse_alert_flag(target_date1_flag)
+            alerts['tomorrow'] = self._parse_alert_flag(target_date2_flag)
+        
+        return {
+            'prefecture': target_prefecture,
+            'alerts': alerts,
+            'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'source': 'Environment Ministry Heat Stroke Prevention Information Site (Official Alert)'
+        }
+    
     def _parse_alert_flag(self, flag_value):
         """Parse alert flag"""
-        logger.debug(f"Alert flag analysis: flag_value='{flag_value}' (type: {type(flag_value)})")
-        
         flag_map = {
             '0': {'status': 'No Alert', 'level': 0, 'message': ''},
             '1': {'status': 'Heat Stroke Alert', 'level': 3, 'message': 'Please be alert for heat stroke'},
@@ -582,9 +541,7 @@ class EnvWBGTAPIEN:
             '9': {'status': 'Outside Alert Hours', 'level': 0, 'message': 'Outside alert hours'}
         }
         
-        result = flag_map.get(str(flag_value), {'status': 'No Information', 'level': 0, 'message': ''})
-        logger.debug(f"Alert flag analysis result: {result}")
-        return result
+        return flag_map.get(str(flag_value), {'status': 'No Information', 'level': 0, 'message': ''})
     
     def _get_alert_numeric_level(self, alert_level):
         """Convert alert level to numeric value"""
@@ -635,33 +592,19 @@ class EnvWBGTAPIEN:
         try:
             prefecture = location.get('prefecture')
             pref_name = self.prefecture_names.get(prefecture, 'kanagawa')
+            file_name = f'wbgt_forecast_{pref_name}.csv'
             
-            # Build CSV file path
-            script_dir = os.path.dirname(os.path.dirname(__file__))
-            csv_file = os.path.join(script_dir, 'data', 'csv', f'wbgt_forecast_{pref_name}.csv')
-            
-            if not os.path.exists(csv_file):
-                logger.warning(f"WBGT forecast CSV file not found: {csv_file}")
-                return None
-            
-            # Check file modification time (whether within 24 hours)
-            file_mtime = os.path.getmtime(csv_file)
-            current_time = datetime.now().timestamp()
-            if current_time - file_mtime > 24 * 3600:  # 24 hours
-                logger.warning(f"WBGT forecast CSV file is too old ({(current_time - file_mtime) / 3600:.1f} hours ago)")
+            # Only use a file updated within the last 24 hours
+            document = self.fallback_store.load_document(file_name, WBGTForecastDocument, max_age_hours=24)
+            if document is None:
                 return None
             
-            # Read CSV file
-            with open(csv_file, 'r', encoding='utf-8') as f:
-                csv_content = f.read()
-            
-            logger.info(f"Successfully read WBGT forecast data from CSV file: {csv_file}")
-            return self._parse_forecast_csv_data(csv_content, location)
+            logger.info(f"Successfully read WBGT forecast data from CSV file: {self.fallback_store.path(file_name)}")
+            return self._build_forecast_data(document, location)
             
         except Exception as e:
             logger.error(f"Error reading WBGT forecast data from CSV file: {e}")
             return None
-    
     def _get_wbgt_current_from_csv(self, location):
         """Get WBGT current data from CSV file (fallback when API access fails)"""
         try:
@@ -669,89 +612,51 @@ class EnvWBGTAPIEN:
             pref_name = self.prefecture_names.get(prefecture, 'kanagawa')
             now = datetime.now()
             year_month = f"{now.year}{now.month:02d}"
-            
-            # Build CSV file path
-            script_dir = os.path.dirname(os.path.dirname(__file__))
-            csv_file = os.path.join(script_dir, 'data', 'csv', f'wbgt_current_{pref_name}_{year_month}.csv')
-            
-            if not os.path.exists(csv_file):
-                logger.warning(f"WBGT current CSV file not found: {csv_file}")
-                return None
-            
-            # Check file modification time (whether within 6 hours)
-            file_mtime = os.path.getmtime(csv_file)
-            current_time = datetime.now().timestamp()
-            if current_time - file_mtime > 6 * 3600:  # 6 hours
-                logger.warning(f"WBGT current CSV file is too old ({(current_time - file_mtime) / 3600:.1f} hours ago)")
-                return None
-            
-            # Read CSV file
-            with open(csv_file, 'r', encoding='utf-8') as f:
-                csv_content = f.read()
-            
-            logger.info(f"Successfully read WBGT current data from CSV file: {csv_file}")
-            return self._parse_current_csv_data(csv_content, location)
+            file_name = f'wbgt_current_{pref_name}_{year_month}.csv'
+            
+            # Only use a file updated within the last 6 hours
+            # Without a snapshot, read from the end (stops once the latest value is found)
+            with self.fallback_store.open_document(file_name, WBGTObservationMatrix, max_age_hours=6,
+                                                   reader=WBGTCurrentTailReader) as document:
+                if document is None:
+                    return None
+                
+                logger.info(f"Successfully read WBGT current data from CSV file: {self.fallback_store.path(file_name)}")
+                return self._build_current_data(document, location)
             
         except Exception as e:
             logger.error(f"Error reading WBGT current data from CSV file: {e}")
             return None
-    
     def _get_wbgt_timeseries_from_csv(self, location):
         """Get WBGT time series data from CSV file (fallback when API access fails)"""
         try:
             prefecture = location.get('prefecture')
             pref_name = self.prefecture_names.get(prefecture, 'kanagawa')
+            file_name = f'wbgt_forecast_{pref_name}.csv'
             
-            # Build CSV file path
-            script_dir = os.path.dirname(os.path.dirname(__file__))
-            csv_file = os.path.join(script_dir, 'data', 'csv', f'wbgt_forecast_{pref_name}.csv')
-            
-            if not os.path.exists(csv_file):
-                logger.warning(f"WBGT time series CSV file not found: {csv_file}")
+            # Only use a file updated within the last 24 hours
+            document = self.fallback_store.load_document(file_name, WBGTForecastDocument, max_age_hours=24)
+            if document is None:
                 return None
             
-            # Check file modification time (whether within 24 hours)
-            file_mtime = os.path.getmtime(csv_file)
-            current_time = datetime.now().timestamp()
-            if current_time - file_mtime > 24 * 3600:  # 24 hours
-                logger.warning(f"WBGT time series CSV file is too old ({(current_time - file_mtime) / 3600:.1f} hours ago)")
-                return None
-            
-            # Read CSV file
-            with open(csv_file, 'r', encoding='utf-8') as f:
-                csv_content = f.read()
-            
-            logger.info(f"Successfully read WBGT time series data from CSV file: {csv_file}")
-            return self._parse_forecast_timeseries_csv_data(csv_content, location)
+            logger.info(f"Successfully read WBGT time series data from CSV file: {self.fallback_store.path(file_name)}")
+            return self._build_forecast_timeseries_data(document, location)
             
         except Exception as e:
             logger.error(f"Error reading WBGT time series data from CSV file: {e}")
             return None
-    
     def _get_alert_from_csv(self, target_date, file_time, prefecture):
         """Get alert data from CSV file (fallback when API access fails)"""
         try:
-            # Build CSV file path
-            script_dir = os.path.dirname(os.path.dirname(__file__))
-            csv_file = os.path.join(script_dir, 'data', 'csv', f'alert_{target_date}_{file_time}.csv')
+            file_name = f'alert_{target_date}_{file_time}.csv'
             
-            if not os.path.exists(csv_file):
-                logger.warning(f"Alert CSV file not found: {csv_file}")
+            # Only use a file updated within the last 24 hours
+            index = self.fallback_store.load_document(file_name, WBGTAlertIndex, max_age_hours=24)
+            if index is None:
                 return None
             
-            # Check file modification time (whether within 24 hours)
-            file_mtime = os.path.getmtime(csv_file)
-            current_time = datetime.now().timestamp()
-            if current_time - file_mtime > 24 * 3600:  # 24 hours
-                logger.warning(f"Alert CSV file is too old ({(current_time - file_mtime) / 3600:.1f} hours ago)")
-                return None
-            
-            # Read CSV file
-            with open(csv_file, 'r', encoding='utf-8') as f:
-                csv_content = f.read()
-            
-            logger.info(f"Successfully read alert data from CSV file: {csv_file}")
-            return self._parse_alert_data(csv_content, prefecture)
+            logger.info(f"Successfully read alert data from CSV file: {self.fallback_store.path(file_name)}")
+            return self._build_alert_data(index, prefecture)
             
         except Exception as e:
             logger.error(f"Error reading alert data from CSV file: {e}")
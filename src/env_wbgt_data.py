@@ -0,0 +1,634 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parsed documents for Environment Ministry WBGT data files
+環境省WBGTデータファイルの解析済みドキュメント
+"""
+
+import io
+import logging
+import re
+from datetime import datetime, timedelta
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 実況値CSVを末尾から読み込む際のブロックサイズ（バイト）
+TAIL_BLOCK_SIZE = 8192
+
+# 日ごとの集計で時間数を数える基準値（°C、厳重警戒の下限）
+DAILY_HOURS_THRESHOLD = 28.0
+
+# CSVの空欄（行頭・カンマ間・行末の空セル）
+_EMPTY_CELL = re.compile(r'(?<![^,\n])(?![^,\n])')
+
+
+def parse_forecast_time(time_str):
+    """予測値CSVの時刻ヘッダー（YYYYMMDDHH形式）を解析（24時は翌日0時）"""
+    time_str = time_str.strip()
+    if len(time_str) != 10:
+        return None
+    try:
+        year = int(time_str[0:4])
+        month = int(time_str[4:6])
+        day = int(time_str[6:8])
+        hour = int(time_str[8:10])
+        if hour == 24:
+            return datetime(year, month, day) + timedelta(days=1)
+        return datetime(year, month, day, hour)
+    except ValueError:
+        logger.debug(f"予測値時刻ヘッダーの解析に失敗: {time_str}")
+        return None
+
+
+def parse_observation_time(date_str, time_str):
+    """実況値CSVの日付・時刻（YYYY/MM/DD, HH:MM形式）を解析（24時は翌日0時）"""
+    try:
+        date = datetime.strptime(date_str.strip(), '%Y/%m/%d')
+        hour, minute = time_str.strip().split(':')
+        return date + timedelta(hours=int(hour), minutes=int(minute))
+    except ValueError:
+        logger.debug(f"実況値日時の解析に失敗: {date_str} {time_str}")
+        return None
+
+
+def _to_datetime64(values, unit):
+    """datetime（またはNone）のリストをdatetime64配列に変換（NoneはNaT）"""
+    return np.array([np.datetime64(value, unit) if value is not None else np.datetime64('NaT')
+                     for value in values], dtype=f'datetime64[{unit}]')
+
+
+def _parse_cell_matrix(value_lines, width, dtype, missing):
+    """
+    カンマ区切りの数値行をまとめて行×列の配列に変換
+
+    空欄を欠測値で埋めて全行を1回の変換で読み込み、列数の揃わない行や
+    数値以外の値がある場合のみ行ごとに変換する（変換できないセルは欠測値）。
+    """
+    values = np.full((len(value_lines), width), missing, dtype=dtype)
+    if not value_lines or width == 0:
+        return values
+
+    # 全体を1つの文字列に結合せず、空欄を埋めた行を1行ずつ渡す
+    missing_text = str(missing)
+    try:
+        parsed = np.loadtxt((_EMPTY_CELL.sub(missing_text, line) for line in value_lines),
+                            delimiter=',', dtype=dtype, ndmin=2)
+    except ValueError:
+        parsed = None
+
+    if parsed is not None and parsed.shape[0] == len(value_lines):
+        columns = min(width, parsed.shape[1])
+        values[:, :columns] = parsed[:, :columns]
+        return values
+
+    convert = np.dtype(dtype).type
+    for i, line in enumerate(value_lines):
+        for j, cell in enumerate(_EMPTY_CELL.sub(missing_text, line).split(',')[:width]):
+            try:
+                values[i, j] = convert(cell.strip())
+            except (ValueError, OverflowError):
+                pass
+    return values
+
+
+def _find_latest_value(rows, column_index):
+    """新しい順に並んだ行から、指定カラムに値がある最初の行を (日時文字列, °C) で取得"""
+    for data in rows:
+        if len(data) > column_index:
+            try:
+                # 実況値は10で割る必要がない（既に実際の値）
+                if data[column_index].strip():
+                    date_time = f"{data[0]} {data[1]}" if len(data) > 1 else data[0]
+                    return date_time, float(data[column_index])
+            except (ValueError, TypeError):
+                continue
+    return None
+
+
+class WBGTForecastDocument:
+    """
+    都道府県別予測値CSV（yohou_*.csv）を地点×予測時刻のint16配列に変換した列指向ドキュメント
+
+    全地点分の予測値を1回の走査で配列に読み込むため、地点ごとの予測値は
+    配列の行スライス（コピーなし）で参照でき、全国の地点を扱っても解析は1回で済む。
+    """
+
+    # 欠測値（予測値は10倍値の非負整数のため負の値で表す）
+    MISSING = -1
+
+    SNAPSHOT_KIND = 'wbgt_forecast'
+
+    def __init__(self, times, codes, update_times, values):
+        # times: 予測時刻のリスト（解析できない列はNone）
+        # codes: 地点番号のリスト（values の行順）
+        # update_times: 地点ごとの更新時刻のリスト
+        # values: 地点×予測時刻のint16配列（10倍値、欠測はMISSING）
+        self.times = times
+        self.time_axis = _to_datetime64(times, 'm')
+        self.codes = codes
+        self.update_times = update_times
+        self.values = values
+        self.rows = {}
+        for i, code in enumerate(codes):
+            self.rows.setdefault(code, i)
+        # 全地点の最新の予測値（最初の参照時に配列演算でまとめて求め、同じ都道府県の拠点で共有する）
+        self._latest = None
+
+    @classmethod
+    def parse(cls, csv_content):
+        """CSV全体を1回だけ走査して全地点分を配列に変換"""
+        return cls.parse_lines(io.StringIO(csv_content))
+
+    @classmethod
+    def parse_lines(cls, lines):
+        """
+        CSVの行を1回だけ走査して全地点分を配列に変換
+
+        Args:
+            lines: 改行付きの行を順に返すイテラブル（テキストファイル・マップしたバッファの行など）
+        """
+        lines = iter(lines)
+        header = next((line for line in lines if line.strip()), None)
+        if header is None:
+            return cls([], [], [], np.empty((0, 0), dtype=np.int16))
+
+        # 1行目: 時刻ヘッダー（最初の2カラムはスキップ）
+        times = [parse_forecast_time(cell) for cell in header.rstrip('\r\n').split(',')[2:]]
+
+        # 2行目以降: 地点番号・更新時刻と予測値部分に分割
+        codes = []
+        update_times = []
+        value_lines = []
+        for line in lines:
+            row = line.rstrip('\r\n').split(',', 2)
+            if len(row) < 3:
+                continue
+            codes.append(row[0].strip())
+            update_times.append(row[1])
+            value_lines.append(row[2])
+
+        return cls(times, codes, update_times,
+                   _parse_cell_matrix(value_lines, len(times), np.int16, cls.MISSING))
+
+    def to_snapshot(self):
+        """スナップショット用の (ヘッダー, 配列) を取得"""
+        header = {
+            'times': [dt.isoformat() if dt is not None else None for dt in self.times],
+            'codes': self.codes,
+            'update_times': self.update_times,
+        }
+        return header, {'values': self.values}
+
+    @classmethod
+    def from_snapshot(cls, header, arrays):
+        """スナップショットから作成"""
+        times = [datetime.fromisoformat(dt) if dt is not None else None for dt in header['times']]
+        return cls(times, header['codes'], header['update_times'], arrays['values'])
+
+    def __contains__(self, location_code):
+        return location_code in self.rows
+
+    def station_values(self, location_code):
+        """地点の予測値（10倍値、欠測はMISSING）を配列の行スライスで取得"""
+        row = self.rows.get(location_code)
+        return self.values[row] if row is not None else None
+
+    def update_time(self, location_code):
+        """地点の更新時刻を取得"""
+        row = self.rows.get(location_code)
+        return self.update_times[row] if row is not None else None
+
+    def latest(self, location_code):
+        """最新の予測値（°C）を取得"""
+        row = self.rows.get(location_code)
+        if row is None:
+            return None
+        if self._latest is None:
+            self._latest = self.latest_all()
+        value = self._latest[row]
+        if np.isnan(value):
+            return None
+        # float32の丸め誤差を除いて0.1℃単位で返す
+        return round(float(value), 1)
+
+    def latest_all(self):
+        """全地点の最新の予測値（°C、欠測はNaN）を地点の行順の配列で取得"""
+        if self.values.shape[1] == 0:
+            return np.full(len(self.codes), np.nan, dtype=np.float32)
+        valid = self.values != self.MISSING
+        first = valid.argmax(axis=1)
+        latest = self.values[np.arange(len(self.codes)), first] / np.float32(10.0)
+        latest[~valid.any(axis=1)] = np.nan
+        return latest
+
+    def timeseries(self, location_code):
+        """予測値の時系列（(datetime, °C) のリスト）を取得"""
+        values = self.station_values(location_code)
+        if values is None:
+            return []
+        valid = (values != self.MISSING) & ~np.isnat(self.time_axis)
+        return [(self.times[i], int(values[i]) / 10.0) for i in np.flatnonzero(valid)]
+
+
+class WBGTObservationMatrix:
+    """
+    都道府県別実況値CSV（wbgt_*_YYYYMM.csv）を時刻×地点のfloat32配列に変換した列指向ドキュメント
+
+    欠測はNaNで表し、最新値・日最高値・基準以上の時間数は全地点分を配列演算でまとめて求める。
+    """
+
+    SNAPSHOT_KIND = 'wbgt_current'
+
+    def __init__(self, header, labels, dates, index, values, fragment=''):
+        # header: ヘッダー行のカラム名リスト（先頭2カラムは日付・時刻）
+        # labels: 行ごとの日時文字列（"YYYY/MM/DD HH:MM"）
+        # dates: 行ごとの集計日（1時〜24時を1日とするため、0時・24時の行は前日に含める）
+        # index: 行ごとの観測日時（datetime64[m]、解析できない行はNaT）
+        # values: 時刻×地点のfloat32配列（°C、欠測はNaN）
+        # fragment: 改行で終わっていない最終行（追記時に続きと結合する）
+        self.header = header
+        self.labels = labels
+        self.dates = dates
+        self.index = index
+        self.values = values
+        self.fragment = fragment
+        self.stations = [column_name.strip() for column_name in header[2:]]
+        self.columns = {}
+        for i, code in enumerate(self.stations):
+            self.columns.setdefault(code, i)
+        # 全地点分の集計結果（最初の参照時に配列演算でまとめて求め、同じ都道府県の拠点で共有する）
+        self._latest = None
+        self._daily = {}
+
+    @classmethod
+    def parse(cls, csv_content):
+        """CSV全体を1回だけ走査して全地点分を配列に変換"""
+        return cls.parse_lines(io.StringIO(csv_content))
+
+    @classmethod
+    def parse_lines(cls, lines):
+        """
+        CSVの行を1回だけ走査して全地点分を配列に変換
+
+        Args:
+            lines: 改行付きの行を順に返すイテラブル（テキストファイル・マップしたバッファの行など）
+        """
+        lines = iter(lines)
+        header = next((line for line in lines if line.strip()), '')
+        rows = list(lines)
+        # 改行で終わっていない最終行は追記時に続きと結合する
+        fragment = rows[-1] if rows and not rows[-1].endswith('\n') else ''
+        return cls._from_lines(header.strip().split(',') if header else [], rows, fragment)
+
+    @classmethod
+    def _from_lines(cls, header, lines, fragment):
+        width = max(len(header) - 2, 0)
+        labels = []
+        dates = []
+        times = []
+        value_lines = []
+        for line in lines:
+            if not line.strip():
+                continue
+            row = line.rstrip('\r\n').split(',', 2)
+            date_str = row[0]
+            time_str = row[1] if len(row) > 1 else ''
+            labels.append(f"{date_str} {time_str}" if len(row) > 1 else date_str)
+            observed_at = parse_observation_time(date_str, time_str)
+            times.append(observed_at)
+            dates.append(observed_at - timedelta(minutes=1) if observed_at is not None else None)
+            value_lines.append(row[2] if len(row) > 2 else '')
+
+        return cls(header, labels, _to_datetime64(dates, 'D'), _to_datetime64(times, 'm'),
+                   _parse_cell_matrix(value_lines, width, np.float32, np.nan), fragment)
+
+    def to_snapshot(self):
+        """スナップショット用の (ヘッダー, 配列) を取得"""
+        header = {'header': self.header, 'labels': self.labels, 'fragment': self.fragment}
+        return header, {'dates': self.dates, 'index': self.index, 'values': self.values}
+
+    @classmethod
+    def from_snapshot(cls, header, arrays):
+        """スナップショットから作成"""
+        return cls(header['header'], header['labels'], arrays['dates'], arrays['index'],
+                   arrays['values'], header['fragment'])
+
+    def extend(self, csv_tail):
+        """追記されたCSV末尾を解析し、行を追加した新しいドキュメントを作成"""
+        rows = len(self.labels)
+        if self.fragment and rows:
+            # 前回の最終行が途中までだった場合は続きと結合して解析し直す
+            rows -= 1
+            csv_tail = self.fragment + csv_tail
+        fragment = '' if csv_tail.endswith('\n') else csv_tail.rsplit('\n', 1)[-1]
+        tail = self._from_lines(self.header, csv_tail.split('\n'), fragment)
+        return WBGTObservationMatrix(
+            self.header, self.labels[:rows] + tail.labels,
+            np.concatenate([self.dates[:rows], tail.dates]),
+            np.concatenate([self.index[:rows], tail.index]),
+            np.concatenate([self.values[:rows], tail.values]), fragment)
+
+    def column_index(self, location_code):
+        """地点番号の列位置を取得（見つからない場合は-1）"""
+        return self.columns.get(location_code, -1)
+
+    def station_values(self, location_code):
+        """地点の実況値（°C、欠測はNaN）を配列の列スライスで取得"""
+        column = self.column_index(location_code)
+        return self.values[:, column] if column != -1 else None
+
+    def latest(self, location_code):
+        """最新の実況値を (日時文字列, °C) で取得"""
+        column = self.column_index(location_code)
+        if column == -1:
+            return None
+        if self._latest is None:
+            self._latest = self.latest_valid()
+        rows, values = self._latest
+        row = rows[column]
+        if row == -1:
+            return None
+        # 実況値は0.1℃単位のため、float32の丸め誤差を除いて返す
+        return self.labels[row], round(float(values[column]), 1)
+
+    def daily_summary(self, location_code, threshold=DAILY_HOURS_THRESHOLD):
+        """
+        最新の観測日の日最高値と、基準値以上だった時間数を取得
+
+        Returns:
+            tuple: (日最高値（°C、値がない場合はNone）, 時間数)（地点がない場合はNone）
+        """
+        column = self.column_index(location_code)
+        if column == -1:
+            return None
+        summary = self._daily.get(threshold)
+        if summary is None:
+            summary = self._daily[threshold] = (self.daily_max(), self.hours_above(threshold))
+        daily_max, hours = summary
+        value = daily_max[column]
+        return (None if np.isnan(value) else round(float(value), 1)), int(hours[column])
+
+    def latest_valid(self):
+        """
+        全地点の最新の実況値を取得
+
+        Returns:
+            tuple: (行位置の配列（値がない地点は-1）, °Cの配列（値がない地点はNaN）)
+        """
+        latest = np.full(len(self.stations), np.nan, dtype=np.float32)
+        if self.values.shape[0] == 0:
+            return np.full(len(self.stations), -1, dtype=np.intp), latest
+        valid = ~np.isnan(self.values)
+        rows = len(self.labels) - 1 - valid[::-1].argmax(axis=0)
+        has_value = valid.any(axis=0)
+        rows = np.where(has_value, rows, -1)
+        latest[has_value] = self.values[rows[has_value], np.flatnonzero(has_value)]
+        return rows, latest
+
+    def _day_rows(self, day):
+        """指定日（省略時は最新の観測日）の行のマスクを取得"""
+        if day is None:
+            valid_dates = self.dates[~np.isnat(self.dates)]
+            if valid_dates.size == 0:
+                return np.zeros(len(self.labels), dtype=bool)
+            day = valid_dates.max()
+        return self.dates == np.datetime64(day, 'D')
+
+    def daily_max(self, day=None):
+        """全地点の日最高値（°C、値がない地点はNaN）を取得"""
+        day_values = self.values[self._day_rows(day)]
+        if day_values.shape[0] == 0:
+            return np.full(len(self.stations), np.nan, dtype=np.float32)
+        # fmax はNaNを無視する（全て欠測の地点はNaNのまま）
+        return np.fmax.reduce(day_values, axis=0)
+
+    def hours_above(self, threshold, day=None):
+        """全地点について、実況値が基準値以上だった時間数を取得"""
+        return np.count_nonzero(self.values[self._day_rows(day)] >= threshold, axis=0)
+
+
+class WBGTCurrentTailReader:
+    """
+    実況値CSVのファイルまたはバッファを末尾からブロック単位で逆向きに読むリーダー
+
+    先頭はヘッダー行だけを解析し、対象カラムに値がある行が見つかった時点で読み込みを終えるため、
+    最新値の取得にかかる時間は月の経過日数（ファイルの長さ）によらない。
+    """
+
+    def __init__(self, stream, block_size=TAIL_BLOCK_SIZE):
+        # stream: シーク可能なバイナリストリーム（ファイル・BytesIO・mmap）
+        self._stream = stream
+        self.block_size = block_size
+        stream.seek(0)
+        self.header = stream.readline().decode('utf-8').strip().split(',')
+        self._data_start = stream.tell()
+        self.columns = {}
+        for i, column_name in enumerate(self.header):
+            self.columns.setdefault(column_name.strip(), i)
+
+    @classmethod
+    def from_bytes(cls, data, block_size=TAIL_BLOCK_SIZE):
+        """メモリ上のCSV（bytes）から作成"""
+        return cls(io.BytesIO(data), block_size)
+
+    def column_index(self, location_code):
+        """地点番号のカラム位置を取得（見つからない場合は-1）"""
+        return self.columns.get(location_code, -1)
+
+    def iter_rows_reversed(self):
+        """データ行を末尾から順に（カラムに分割して）返す"""
+        stream = self._stream
+        # mmap.seek は位置を返さないため tell() で取得する
+        stream.seek(0, io.SEEK_END)
+        position = stream.tell()
+        remainder = b''
+        while position > self._data_start:
+            read_size = min(self.block_size, position - self._data_start)
+            position -= read_size
+            stream.seek(position)
+            lines = (stream.read(read_size) + remainder).split(b'\n')
+            # 先頭は前のブロックに続く途中の行の可能性があるため次回に持ち越す
+            remainder = lines[0]
+            for line in reversed(lines[1:]):
+                if line.strip():
+                    yield line.rstrip(b'\r').decode('utf-8').split(',')
+        if remainder.strip():
+            yield remainder.rstrip(b'\r').decode('utf-8').split(',')
+
+    def latest(self, location_code):
+        """最新の実況値を (日時文字列, °C) で取得"""
+        column_index = self.column_index(location_code)
+        if column_index == -1:
+            return None
+        return _find_latest_value(self.iter_rows_reversed(), column_index)
+
+
+# 都道府県名（全国地方公共団体コード順）
+PREFECTURES = (
+    '北海道', '青森県', '岩手県', '宮城県', '秋田県', '山形県', '福島県',
+    '茨城県', '栃木県', '群馬県', '埼玉県', '千葉県', '東京都', '神奈川県',
+    '新潟県', '富山県', '石川県', '福井県', '山梨県', '長野県', '岐阜県',
+    '静岡県', '愛知県', '三重県', '滋賀県', '京都府', '大阪府', '兵庫県',
+    '奈良県', '和歌山県', '鳥取県', '島根県', '岡山県', '広島県', '山口県',
+    '徳島県', '香川県', '愛媛県', '高知県', '福岡県', '佐賀県', '長崎県',
+    '熊本県', '大分県', '宮崎県', '鹿児島県', '沖縄県'
+)
+
+# 都道府県名と一致しない府県予報区 -> 都道府県名
+FORECAST_AREA_PREFECTURES = {
+    '宗谷地方': '北海道',
+    '上川・留萌地方': '北海道',
+    '網走・北見・紋別地方': '北海道',
+    '釧路・根室地方': '北海道',
+    '十勝地方': '北海道',
+    '胆振・日高地方': '北海道',
+    '石狩・空知・後志地方': '北海道',
+    '渡島・檜山地方': '北海道',
+    '奄美地方': '鹿児島県',
+    '沖縄本島地方': '沖縄県',
+    '大東島地方': '沖縄県',
+    '宮古島地方': '沖縄県',
+    '八重山地方': '沖縄県',
+}
+
+
+def _build_prefecture_aliases():
+    """都道府県名の表記（正式名・「都府県」を除いた名前）-> 正式名の表を作成"""
+    aliases = {}
+    for prefecture in PREFECTURES:
+        aliases[prefecture] = prefecture
+        aliases.setdefault(prefecture[:-1], prefecture)
+    return aliases
+
+
+_PREFECTURE_ALIASES = _build_prefecture_aliases()
+
+
+def canonical_prefecture(name):
+    """都道府県名または府県予報区名を正式な都道府県名に変換（該当なしはNone）"""
+    name = name.strip()
+    prefecture = _PREFECTURE_ALIASES.get(name) or FORECAST_AREA_PREFECTURES.get(name)
+    if prefecture is None:
+        # 「鹿児島県（奄美地方除く）」のように都道府県名で始まる府県予報区
+        prefecture = next((p for p in PREFECTURES if name.startswith(p)), None)
+    return prefecture
+
+
+class WBGTAlertIndex:
+    """
+    熱中症警戒アラートCSV（alert_YYYYMMDD_HH.csv）の府県予報区別フラグ索引
+
+    メタデータ行（Title, TargetDate1など）とデータ行を1回の走査で分け、
+    府県予報区名は解析時に1度だけ都道府県名に正規化する。
+    """
+
+    # メタデータ行とデータ行の列見出し「府県予報区,」（位置に関係なく全行に適用）
+    METADATA_ROW = re.compile(
+        r'(?:Title|Encoding|TimeZone|CreateDate|CreateTime|PublishingOffice|ReportDate|ReportTime),'
+        r'|TargetDate|TargetTime|DurationTime|BriefComment|KeyMessage|FlagExplanation|Status|InternalFlag'
+        r'|府県予報区,'
+    )
+
+    # フラグを解析できない場合の値
+    MISSING = -1
+
+    SNAPSHOT_KIND = 'wbgt_alert'
+
+    # フラグの深刻度（特別警戒 > 警戒 > 特別警戒（判定） > 発表なし・発表時間外・不明）
+    SEVERITY = {3: 3, 1: 2, 2: 1}
+
+    def __init__(self, metadata, areas, flags):
+        # metadata: メタデータ項目名 -> 値
+        # areas: 府県予報区名のリスト（ファイル順）
+        # flags: 府県予報区×(TargetDate1, TargetDate2) のint8配列（解析できない値はMISSING）
+        self.metadata = metadata
+        self.areas = areas
+        self.flags = flags
+        self.prefectures = [canonical_prefecture(area) for area in areas]
+
+        self._area_rows = {}
+        for i, area in enumerate(areas):
+            self._area_rows.setdefault(area, i)
+
+        # 都道府県 -> [今日, 明日] の最も深刻なフラグ（府県予報区が複数ある北海道・鹿児島県・沖縄県）
+        # 今日と明日で深刻な府県予報区が異なる場合があるため、TargetDateの列ごとに選ぶ
+        self._prefecture_flags = {}
+        for i, prefecture in enumerate(self.prefectures):
+            if prefecture is None:
+                continue
+            row = [int(flag) for flag in flags[i]]
+            current = self._prefecture_flags.get(prefecture)
+            if current is None:
+                self._prefecture_flags[prefecture] = row
+                continue
+            for j, flag in enumerate(row):
+                if self._severity(flag) > self._severity(current[j]):
+                    current[j] = flag
+
+    @classmethod
+    def parse(cls, csv_content):
+        """全国分のCSVを1回だけ走査して索引を作成"""
+        return cls.parse_lines(io.StringIO(csv_content))
+
+    @classmethod
+    def parse_lines(cls, lines):
+        """
+        全国分のCSVの行を1回だけ走査して索引を作成
+
+        Args:
+            lines: 改行付きの行を順に返すイテラブル（テキストファイル・マップしたバッファの行など）
+        """
+        metadata = {}
+        areas = []
+        flag_cells = []
+        for line in lines:
+            if not line.strip():
+                continue
+            line = line.rstrip('\r\n')
+            if cls.METADATA_ROW.match(line):
+                key, _, value = line.partition(',')
+                metadata.setdefault(key, value)
+                continue
+
+            data = line.split(',')
+            # 都道府県データ行は最低8項目以上
+            if len(data) < 8:
+                continue
+            areas.append(data[4].strip())
+            flag_cells.append((data[6], data[7]))
+
+        flags = np.full((len(areas), 2), cls.MISSING, dtype=np.int8)
+        for i, cells in enumerate(flag_cells):
+            for j, cell in enumerate(cells):
+                try:
+                    flags[i, j] = int(cell)
+                except (ValueError, OverflowError):
+                    pass
+
+        logger.info(f"アラートCSVから{len(areas)}件の府県予報区データを抽出")
+        return cls(metadata, areas, flags)
+
+    def to_snapshot(self):
+        """スナップショット用の (ヘッダー, 配列) を取得"""
+        return {'metadata': self.metadata, 'areas': self.areas}, {'flags': self.flags}
+
+    @classmethod
+    def from_snapshot(cls, header, arrays):
+        """スナップショットから作成"""
+        return cls(header['metadata'], header['areas'], arrays['flags'])
+
+    def _severity(self, flag):
+        return self.SEVERITY.get(flag, 0)
+
+    def lookup(self, target_prefecture):
+        """対象都道府県（または府県予報区）の (今日, 明日) フラグを取得（該当なしはNone）"""
+        row = self._area_rows.get(target_prefecture)
+        if row is not None:
+            return str(self.flags[row, 0]), str(self.flags[row, 1])
+        prefecture = canonical_prefecture(target_prefecture)
+        flags = self._prefecture_flags.get(prefecture) if prefecture else None
+        if flags is None:
+            return None
+        return str(flags[0]), str(flags[1])
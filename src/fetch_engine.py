@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Concurrent fetch engine and background refresh worker for WBGT Kiosk
+複数拠点のデータ取得を並行実行するエンジンと、バックグラウンドで取得を繰り返すワーカー
+"""
+
+import copy
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from http_client import configure_pool
+
+logger = logging.getLogger(__name__)
+
+# 同時実行数のデフォルト値（Raspberry Piでも負荷にならない程度）
+DEFAULT_MAX_WORKERS = 4
+
+# GUIのメインスレッドがスナップショットを確認する間隔（ミリ秒）
+DEFAULT_POLL_INTERVAL_MS = 200
+
+
+class FetchEngine:
+    """独立したデータ取得リクエストをスレッドプールで並行実行するクラス"""
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS):
+        try:
+            self.max_workers = max(1, int(max_workers))
+        except (TypeError, ValueError):
+            self.max_workers = DEFAULT_MAX_WORKERS
+        # 共有セッションの接続プールを同時取得数に合わせる
+        configure_pool(self.max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix='wbgt-fetch')
+
+    def run(self, tasks):
+        """
+        タスクを並行実行し、キーごとの結果を返す
+
+        Args:
+            tasks (dict): キー -> (呼び出し可能オブジェクト, 引数...) のタプル
+
+        Returns:
+            dict: キー -> 結果（例外が発生したタスクはNone）
+        """
+        futures = {}
+        for key, (func, *args) in tasks.items():
+            futures[key] = self._executor.submit(func, *args)
+
+        # タスクごとにエラーを分離し、1件の失敗が他の結果に影響しないようにする
+        results = {}
+        for key, future in futures.items():
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                logger.error(f"データ取得タスクでエラーが発生 ({key}): {e}")
+                results[key] = None
+        return results
+
+    def shutdown(self):
+        """スレッドプールを停止"""
+        self._executor.shutdown(wait=False)
+
+
+class _PendingRequest:
+    """実行中または完了済みのリクエスト"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class RequestCoalescer:
+    """
+    URLをキーに同一リクエストを1回の通信・解析にまとめるクラス
+
+    同時に要求された場合は最初の呼び出しの完了を待って結果を共有し、
+    同一サイクル内の後続の要求には完了済みの結果を返す。
+    失敗したリクエストは保持せず、次の要求で再試行する。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requests = {}
+
+    def get(self, key, loader):
+        """
+        キーに対応する結果を取得（未取得の場合のみloaderを呼び出す）
+
+        Args:
+            key (str): リクエストのキー（URL）
+            loader (callable): 取得と解析を行う関数
+
+        Returns:
+            loaderの戻り値
+        """
+        with self._lock:
+            pending = self._requests.get(key)
+            is_owner = pending is None
+            if is_owner:
+                pending = _PendingRequest()
+                self._requests[key] = pending
+
+        if is_owner:
+            try:
+                pending.result = loader()
+            except Exception as e:
+                pending.error = e
+                with self._lock:
+                    self._requests.pop(key, None)
+            finally:
+                pending.done.set()
+        else:
+            pending.done.wait()
+
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def discard(self, key):
+        """指定キーの完了済みの結果を破棄"""
+        with self._lock:
+            pending = self._requests.get(key)
+            if pending is not None and pending.done.is_set():
+                del self._requests[key]
+
+    def clear(self):
+        """完了済みの結果を破棄（新しいサイクルの開始時に呼び出す）"""
+        with self._lock:
+            self._requests.clear()
+
+
+class DataSnapshot:
+    """
+    1回の取得サイクルの結果（作成後は変更しない）
+
+    拠点データはワーカー側で複製してから渡すため、次のサイクルの取得で内容が変わることはない。
+    """
+
+    def __init__(self, success, locations_data, fetch_seconds):
+        self.success = success
+        self.locations_data = tuple(locations_data)
+        self.fetch_seconds = fetch_seconds
+        self.created_at = datetime.now()
+
+
+class RefreshWorker:
+    """
+    バックグラウンドのスレッドでデータ取得を繰り返し、結果をスナップショットとして受け渡すクラス
+
+    取得（通信・解析）はすべてワーカーのスレッドで行い、GUIのメインスレッドは
+    attach() で登録した root.after のポーリングでキューから取り出して描画するだけにする。
+    取得時間と描画時間はそれぞれ計測してログに出力する。
+    """
+
+    def __init__(self, refresh, get_locations_data, next_interval):
+        """
+        Args:
+            refresh (callable): データを取得する関数（成功時にTrue）
+            get_locations_data (callable): 取得後の拠点データのリストを返す関数
+            next_interval (callable): 次の取得までの秒数を返す関数
+        """
+        self._refresh = refresh
+        self._get_locations_data = get_locations_data
+        self._next_interval = next_interval
+        # 描画が追いつかない場合も最新のスナップショットだけを保持
+        self._queue = queue.Queue(maxsize=1)
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self.last_fetch_seconds = None
+        self.last_render_seconds = None
+
+    def start(self):
+        """ワーカーのスレッドを開始"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='wbgt-refresh', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """ワーカーを停止（取得中の場合はそのサイクルの終了後に停止）"""
+        self._stopped.set()
+        self._wake.set()
+
+    def request_refresh(self):
+        """待機中の場合は直ちに次の取得を開始させる"""
+        self._wake.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            start = time.perf_counter()
+            try:
+                success = bool(self._refresh())
+                locations_data = copy.deepcopy(self._get_locations_data())
+            except Exception as e:
+                logger.error(f"バックグラウンドのデータ取得でエラーが発生: {e}")
+                success, locations_data = False, []
+            self.last_fetch_seconds = time.perf_counter() - start
+            logger.info(f"データ取得時間: {self.last_fetch_seconds * 1000:.0f} ms")
+            self._publish(DataSnapshot(success, locations_data, self.last_fetch_seconds))
+
+            self._wake.wait(self._next_interval())
+            self._wake.clear()
+
+    def _publish(self, snapshot):
+        while True:
+            try:
+                self._queue.put_nowait(snapshot)
+                return
+            except queue.Full:
+                # 未描画の古いスナップショットは破棄
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def get_snapshot(self):
+        """未描画のスナップショットを取得（ない場合はNone）"""
+        try:
+            return self._queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    def attach(self, root, render, interval_ms=DEFAULT_POLL_INTERVAL_MS):
+        """
+        Tkのメインループからスナップショットを確認し、届いていれば描画関数を呼び出す
+
+        Args:
+            root: Tkのルートウィンドウ（after() を使用）
+            render (callable): スナップショットを受け取る描画関数（メインスレッドで実行）
+            interval_ms (int): 確認間隔（ミリ秒）
+        """
+        def poll():
+            snapshot = self.get_snapshot()
+            if snapshot is not None:
+                start = time.perf_counter()
+                try:
+                    render(snapshot)
+                except Exception as e:
+                    logger.error(f"スナップショットの描画でエラーが発生: {e}")
+                self.last_render_seconds = time.perf_counter() - start
+                logger.info(f"描画時間: {self.last_render_seconds * 1000:.1f} ms"
+                            f"（取得時間: {snapshot.fetch_seconds * 1000:.0f} ms）")
+            if not self._stopped.is_set():
+                root.after(interval_ms, poll)
+
+        root.after(0, poll)
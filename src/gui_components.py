@@ -9,9 +9,26 @@ import tkinter as tk
 from tkinter import ttk
 import platform
 import logging
+import time
+import weakref
+from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# WBGT警戒レベル（日本語・英語）。予測値表の行の色は level_{レベル} のタグで表示する
+WBGT_LEVELS = (
+    'ほぼ安全', '注意', '警戒', '厳重警戒', '危険', '極めて危険',
+    'Safe', 'Caution', 'Warning', 'Severe Warning', 'Dangerous', 'Extremely Dangerous',
+)
+
+# 時計表示の更新間隔（ミリ秒）と、1回の更新に許容する処理時間（ミリ秒、Raspberry Pi想定）
+CLOCK_TICK_MS = 1000
+CLOCK_TICK_BUDGET_MS = 5.0
+# 処理時間の超過を警告する最短間隔（秒）
+CLOCK_BUDGET_WARNING_INTERVAL = 60
+# 取得データの timestamp の形式
+UPDATE_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
 
 class PlatformUtils:
     """プラットフォーム固有の処理を管理するクラス"""
@@ -152,14 +169,192 @@ class TreeviewManager:
         return style
     
     @staticmethod
-    def setup_default_tags(treeview):
-        """デフォルトタグを設定"""
+    def setup_default_tags(treeview, is_windows=False):
+        """デフォルトタグとWBGT警戒レベルのタグを設定（表の作成時に1回だけ呼び出す）"""
         try:
             treeview.tag_configure('default', background='#2a2a2a', foreground='white')
+            for level in WBGT_LEVELS:
+                treeview.tag_configure(wbgt_level_tag(level),
+                                       background=ColorManager.get_wbgt_color(level, is_windows),
+                                       foreground='black')
         except Exception as e:
             logger.debug(f"デフォルトタグの設定に失敗: {e}")
 
 
+def wbgt_level_tag(level):
+    """WBGT警戒レベルの行に付けるタグ名"""
+    return f'level_{level}'
+
+
+class TreeviewReconciler:
+    """
+    Treeviewの行をキー（時間帯・日付）で前回の表示内容と照合し、変更のあったセルだけを更新するクラス
+
+    表示中の行の値とタグはPython側で保持するため、内容が変わらない場合のTk呼び出しは0回になる。
+    表ごとのインスタンスは attach() で取得する。
+    """
+
+    _instances = weakref.WeakKeyDictionary()
+
+    def __init__(self, treeview):
+        self.treeview = treeview
+        self.columns = tuple(treeview['columns'])
+        # キー -> [行ID, 値のタプル, タグのタプル]
+        self._rows = {}
+        self._order = []
+
+    @classmethod
+    def attach(cls, treeview):
+        """Treeviewに対応するインスタンスを取得（初回のみ作成）"""
+        reconciler = cls._instances.get(treeview)
+        if reconciler is None:
+            reconciler = cls._instances[treeview] = cls(treeview)
+        return reconciler
+
+    def render(self, rows):
+        """
+        表の内容を rows に合わせる
+
+        Args:
+            rows (list): (キー, 値のタプル, タグのタプル) のリスト（表示順）
+
+        Returns:
+            int: 実行したTk呼び出しの回数
+        """
+        calls = 0
+        keys = [key for key, _, _ in rows]
+
+        # なくなった行を削除
+        wanted = set(keys)
+        for key in [key for key in self._order if key not in wanted]:
+            self.treeview.delete(self._rows.pop(key)[0])
+            calls += 1
+        order = [key for key in self._order if key in wanted]
+
+        for index, (key, values, tags) in enumerate(rows):
+            values = tuple(values)
+            tags = tuple(tags)
+            row = self._rows.get(key)
+            if row is None:
+                item = self.treeview.insert('', index, values=values, tags=tags)
+                self._rows[key] = [item, values, tags]
+                order.insert(index, key)
+                calls += 1
+                continue
+
+            item, old_values, old_tags = row
+            if old_values != values:
+                # 変更のあったセルだけを更新
+                for column, old, new in zip(self.columns, old_values, values):
+                    if old != new:
+                        self.treeview.set(item, column, new)
+                        calls += 1
+                row[1] = values
+            if old_tags != tags:
+                self.treeview.item(item, tags=tags)
+                row[2] = tags
+                calls += 1
+
+        # 並び順が変わった行だけを移動
+        if order != keys:
+            for index, key in enumerate(keys):
+                if order[index] != key:
+                    self.treeview.move(self._rows[key][0], '', index)
+                    order.remove(key)
+                    order.insert(index, key)
+                    calls += 1
+        self._order = keys
+        return calls
+
+
+class ClockTicker:
+    """
+    時計とデータの経過時間（「〇分前」）の表示だけを1秒ごとに更新するクラス
+
+    データ取得や表の描画とは独立して root.after で動作し、表示内容が変わったラベルだけを更新する。
+    1回の更新にかかった時間を計測し、CLOCK_TICK_BUDGET_MS を超えた場合は警告を出力する。
+    """
+    
+    def __init__(self, root, clock_label=None, format_clock=None, age_label=None, format_age=None,
+                 budget_ms=CLOCK_TICK_BUDGET_MS):
+        """
+        Args:
+            root: Tkのルートウィンドウ（after() を使用）
+            clock_label: 時計を表示するラベル（省略可）
+            format_clock (callable): 現在時刻 -> 表示文字列
+            age_label: データの経過時間を表示するラベル（省略可）
+            format_age (callable): (最終更新の表示文字列, 経過分数) -> 表示文字列
+            budget_ms (float): 1回の更新に許容する処理時間（ミリ秒）
+        """
+        self.root = root
+        self.clock_label = clock_label
+        self.format_clock = format_clock
+        self.age_label = age_label
+        self.format_age = format_age
+        self.budget_ms = budget_ms
+        self._texts = {}
+        self._updated_text = None
+        self._updated_at = None
+        self._last_warning = 0
+        self.tick_count = 0
+        self.over_budget_count = 0
+        self.max_tick_ms = 0.0
+    
+    def set_last_update(self, text, updated_at=None):
+        """
+        最終更新の表示文字列と時刻を設定（経過時間の表示はすぐに更新）
+
+        updated_at を省略した場合は text（取得データの timestamp）から求め、解析できなければ現在時刻とする。
+        """
+        if updated_at is None:
+            try:
+                updated_at = datetime.strptime(text, UPDATE_TIME_FORMAT)
+            except (TypeError, ValueError):
+                updated_at = datetime.now()
+        self._updated_text = text
+        self._updated_at = updated_at
+        self._update_age(datetime.now())
+    
+    def start(self):
+        """1秒ごとの更新を開始"""
+        self._tick()
+    
+    def _set_text(self, label, text):
+        # 表示中の文字列と同じ場合はTkを呼び出さない
+        if self._texts.get(label) != text:
+            label.config(text=text)
+            self._texts[label] = text
+    
+    def _update_age(self, now):
+        if self.age_label is None or self._updated_at is None:
+            return
+        minutes = max(0, int((now - self._updated_at).total_seconds() // 60))
+        self._set_text(self.age_label, self.format_age(self._updated_text, minutes))
+    
+    def _tick(self):
+        start = time.perf_counter()
+        now = datetime.now()
+        try:
+            if self.clock_label is not None:
+                self._set_text(self.clock_label, self.format_clock(now))
+            self._update_age(now)
+        except Exception as e:
+            logger.error(f"時計表示の更新エラー: {e}")
+        
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.tick_count += 1
+        self.max_tick_ms = max(self.max_tick_ms, elapsed_ms)
+        if elapsed_ms > self.budget_ms:
+            self.over_budget_count += 1
+            if time.monotonic() - self._last_warning >= CLOCK_BUDGET_WARNING_INTERVAL:
+                self._last_warning = time.monotonic()
+                logger.warning(f"時計表示の更新が処理時間の上限を超過: {elapsed_ms:.1f} ms "
+                               f"（上限 {self.budget_ms:.1f} ms、超過 {self.over_budget_count}/{self.tick_count}回）")
+        
+        # 次の秒の変わり目に合わせて再スケジュール
+        self.root.after(CLOCK_TICK_MS - now.microsecond // 1000, self._tick)
+
+
 class GUIComponentFactory:
     """GUI コンポーネント生成ファクトリークラス"""
     
@@ -249,7 +444,7 @@ class GUIComponentFactory:
         
         # スタイル適用
         TreeviewManager.configure_style(config.FONT_SIZE_SMALL, is_windows)
-        TreeviewManager.setup_default_tags(forecast_table)
+        TreeviewManager.setup_default_tags(forecast_table, is_windows)
         
         forecast_table.pack(fill=tk.BOTH, expand=True)
         
@@ -283,7 +478,7 @@ class GUIComponentFactory:
         
         # スタイル適用
         TreeviewManager.configure_style(config.FONT_SIZE_SMALL, is_windows)
-        TreeviewManager.setup_default_tags(weekly_forecast_table)
+        TreeviewManager.setup_default_tags(weekly_forecast_table, is_windows)
         
         weekly_forecast_table.pack(fill=tk.X)
         
@@ -335,4 +530,38 @@ class WeatherDataProcessor:
                 'temp': temp_range
             })
         
-        return processed_data
\ No newline at end of file
+        return processed_data
+    
+    @staticmethod
+    def build_wbgt_forecast_rows(location_data, env_wbgt_api, language='ja'):
+        """WBGT予測値表の行（キー, 値, タグ）を作成（現在値と最初の3つの予測値）"""
+        rows = []
+        
+        # 現在値
+        current_data = location_data.get('env_wbgt_current')
+        if current_data:
+            level, _, _ = env_wbgt_api.get_wbgt_level_info(current_data['wbgt_value'])
+            label = '現在' if language == 'ja' else 'Current'
+            rows.append(('current', (label, f"{current_data.get('wbgt_value', 0):.1f}°C", level),
+                         (wbgt_level_tag(level),)))
+        
+        # 時系列予測値（時間帯をキーにする）
+        timeseries_data = location_data.get('env_wbgt_timeseries')
+        if timeseries_data and 'timeseries' in timeseries_data:
+            for data_point in timeseries_data['timeseries'][:3]:
+                level, _, _ = env_wbgt_api.get_wbgt_level_info(data_point['wbgt_value'])
+                time_str = data_point['datetime_str']
+                value_str = f"{data_point.get('wbgt_value', 0):.1f}°C"
+                rows.append((time_str, (time_str, value_str, level), (wbgt_level_tag(level),)))
+        
+        return rows
+    
+    @staticmethod
+    def build_weekly_forecast_rows(weekly_forecast, weather_api, language='ja'):
+        """週間予報表の行（キー, 値, タグ）を作成（日付をキーにする）"""
+        processed_data = WeatherDataProcessor.process_weekly_forecast_data(weekly_forecast, weather_api, language)
+        if not processed_data:
+            no_data = 'データなし' if language == 'ja' else 'No data'
+            return [('no_data', ('--', no_data, '--', '--'), ())]
+        return [(data['date'], (data['date'], data['weather'], data['pop'], data['temp']), ())
+                for data in processed_data]
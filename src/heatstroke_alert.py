@@ -4,18 +4,21 @@ import os
 import sys
 from datetime import datetime, timedelta
 import logging
+from http_client import get_shared_cache, parse_json
 from env_wbgt_api import EnvWBGTAPI
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
 class HeatstrokeAlert:
-    def __init__(self):
-        # 環境省公式データサービスを優先使用
-        self.env_wbgt_api = EnvWBGTAPI()
+    def __init__(self, env_wbgt_api=None):
+        # 環境省公式データサービスを優先使用（キオスクと共有する場合は同じインスタンスを受け取る）
+        self.env_wbgt_api = env_wbgt_api if env_wbgt_api is not None else EnvWBGTAPI()
         
         # フォールバック用のJMA APIデータ
         self.base_url = "https://www.jma.go.jp/bosai/forecast/data/forecast"
+        # JMAWeatherAPIと同じURLは取得結果を共有する
+        self.http_cache = get_shared_cache()
         
         # SSL設定の読み込み（Windows企業環境対応）
         try:
@@ -98,9 +101,7 @@ class HeatstrokeAlert:
         url = f"{self.base_url}/{area_code}.json"
         
         try:
-            response = requests.get(url, timeout=10, verify=self.ssl_verify)
-            response.raise_for_status()
-            data = response.json()
+            data = self.http_cache.get(url, parse_json, 'jma_forecast', timeout=10, verify=self.ssl_verify)
             return self._parse_alert_data(data, prefecture)
         except requests.exceptions.RequestException as e:
             logger.error(f"熱中症警戒アラート情報の取得に失敗しました: {e}")
@@ -4,18 +4,21 @@ import os
 import sys
 from datetime import datetime, timedelta
 import logging
+from http_client import get_shared_cache, parse_json
 from env_wbgt_api_en import EnvWBGTAPIEN
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
 class HeatstrokeAlertEN:
-    def __init__(self):
-        # Prioritize official Environment Ministry data service
-        self.env_wbgt_api = EnvWBGTAPIEN()
+    def __init__(self, env_wbgt_api=None):
+        # Prioritize official Environment Ministry data service (the kiosk passes its own instance to share it)
+        self.env_wbgt_api = env_wbgt_api if env_wbgt_api is not None else EnvWBGTAPIEN()
         
         # Fallback JMA API data
         self.base_url = "https://www.jma.go.jp/bosai/forecast/data/forecast"
+        # Responses for the same URL are shared with JMAWeatherAPI
+        self.http_cache = get_shared_cache()
         
         # SSL configuration loading (for Windows corporate environments)
         try:
@@ -98,9 +101,7 @@ class HeatstrokeAlertEN:
         url = f"{self.base_url}/{area_code}.json"
         
         try:
-            response = requests.get(url, timeout=10, verify=self.ssl_verify)
-            response.raise_for_status()
-            data = response.json()
+            data = self.http_cache.get(url, parse_json, 'jma_forecast', timeout=10, verify=self.ssl_verify)
             return self._parse_alert_data(data, prefecture)
         except requests.exceptions.RequestException as e:
             logger.error(f"Failed to get heat stroke warning alert information: {e}")
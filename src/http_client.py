@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shared HTTP session and conditional-GET cache for the WBGT Kiosk data clients
+データ取得クライアント共通のHTTPセッション（接続プール）と条件付きGETキャッシュ
+"""
+
+import logging
+import re
+import threading
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import json_backend
+
+logger = logging.getLogger(__name__)
+
+# 保持するURL数の上限（拠点数×データ種別に対して十分な値）
+DEFAULT_MAX_ENTRIES = 64
+
+# 接続プールの設定（接続先は環境省・気象庁の数ホストのみ）
+POOL_CONNECTIONS = 4
+# ホストごとに保持する接続数の初期値（取得エンジンの作成時に同時取得数に合わせる）
+DEFAULT_POOL_MAXSIZE = 10
+
+USER_AGENT = 'WBGT-Kiosk/1.0 (Heat Stroke Prevention System)'
+
+_session_lock = threading.Lock()
+_shared_session = None
+_pool_maxsize = DEFAULT_POOL_MAXSIZE
+
+
+def _mount_adapter(session, pool_maxsize):
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=pool_maxsize)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+
+def create_session(pool_maxsize=DEFAULT_POOL_MAXSIZE):
+    """Keep-Alive接続をホストごとにプールするセッションを作成"""
+    session = requests.Session()
+    _mount_adapter(session, pool_maxsize)
+    session.headers.update({'User-Agent': USER_AGENT})
+    return session
+
+
+def configure_pool(max_workers):
+    """
+    共有セッションのホストごとの接続数を同時取得数に合わせる
+
+    接続数が同時取得数より少ないと、返却時にあふれた接続が破棄されて再利用されない。
+    """
+    global _pool_maxsize
+    pool_maxsize = max(1, int(max_workers))
+    with _session_lock:
+        if pool_maxsize == _pool_maxsize:
+            return
+        _pool_maxsize = pool_maxsize
+        if _shared_session is not None:
+            _mount_adapter(_shared_session, pool_maxsize)
+    logger.debug(f"接続プールのホストごとの接続数: {pool_maxsize}")
+
+
+def get_shared_session():
+    """
+    プロセス全体で共有するセッションを取得
+
+    全拠点・全クライアントが同じ接続プールを使うため、確立済みの
+    TCP/TLS接続が再利用され、更新サイクルごとのハンドシェイクはホスト数程度で済む。
+    """
+    global _shared_session
+    with _session_lock:
+        if _shared_session is None:
+            _shared_session = create_session(_pool_maxsize)
+        return _shared_session
+
+
+class _CacheEntry:
+    """URLごとの検証子と解析済みオブジェクト"""
+
+    def __init__(self, etag, last_modified, data):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.data = data
+
+
+class HTTPCache:
+    """
+    検証子（ETag / Last-Modified）と解析済みオブジェクトをURLごとに保持するキャッシュ
+
+    再取得時は If-None-Match / If-Modified-Since を付けて問い合わせ、
+    304 Not Modified の場合は本文の転送も再解析も行わずに前回の解析結果を返す。
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._stats = {}
+
+    def get(self, url, parser, endpoint, session=None, **kwargs):
+        """
+        URLを取得して解析（未更新の場合は前回の解析結果を再利用）
+
+        Args:
+            url (str): 取得するURL
+            parser (callable): レスポンスを受け取り解析結果を返す関数
+            endpoint (str): 統計用のエンドポイント名
+            session: 使用するrequestsのセッション（省略時は共有セッション）
+            **kwargs: requestsに渡す追加引数（timeout, verifyなど）
+
+        Returns:
+            解析結果
+
+        Raises:
+            requests.exceptions.RequestException: 通信エラーまたはHTTPエラー
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+
+        headers = dict(kwargs.pop('headers', None) or {})
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+
+        response = (session or get_shared_session()).get(url, headers=headers, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            self._count(endpoint, 'hits')
+            with self._lock:
+                if url in self._entries:
+                    self._entries.move_to_end(url)
+            logger.debug(f"未更新のため前回の解析結果を再利用 ({endpoint}): {url}")
+            return entry.data
+
+        response.raise_for_status()
+        self._count(endpoint, 'misses')
+        data = parser(response)
+
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        with self._lock:
+            if data is not None and (etag or last_modified):
+                self._entries[url] = _CacheEntry(etag, last_modified, data)
+                self._entries.move_to_end(url)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            else:
+                # 検証子がない応答は次回も全体を取得する
+                self._entries.pop(url, None)
+        return data
+
+    def _count(self, endpoint, key):
+        with self._lock:
+            counters = self._stats.setdefault(endpoint, {'hits': 0, 'misses': 0})
+            counters[key] += 1
+
+    def stats(self):
+        """エンドポイントごとのヒット（304）／ミス（本文取得）回数を取得"""
+        with self._lock:
+            return {endpoint: dict(counters) for endpoint, counters in self._stats.items()}
+
+    def format_stats(self):
+        """統計をログ出力用の文字列に整形"""
+        return ', '.join(f"{endpoint} {counters['hits']}/{counters['misses']}"
+                         for endpoint, counters in sorted(self.stats().items()))
+
+
+# 追記分の取得時に照合する保持済みの末尾の長さ（バイト）
+# CSVは必ず改行で終わるため、1バイトでは置き換えられたファイルと区別できない
+TAIL_OVERLAP_BYTES = 64
+
+
+class _TailEntry:
+    """保持済みのファイルの長さ・末尾（TAIL_OVERLAP_BYTES まで）と解析済みオブジェクト"""
+
+    def __init__(self, url, length, tail, data):
+        self.url = url
+        self.length = length
+        self.tail = tail
+        self.data = data
+
+
+class RangeTailFetcher:
+    """
+    追記のみで伸びるファイルを、保持済みの長さ以降だけ Range で取得するクラス
+
+    保持済みの末尾（最大64バイト）から要求し、応答の先頭が保持済みの末尾と一致すれば残りを追記分として
+    解析済みオブジェクトに追加する（末尾のみの応答は未更新）。
+    サーバーが Range を無視した場合（200）、内容が一致しない場合、
+    URL が変わった場合（月の切り替わり）は全体を取得し直す。
+    """
+
+    _CONTENT_RANGE = re.compile(r'bytes\s+(\d+)-\d+/(?:\d+|\*)')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._stats = {}
+
+    def get(self, key, url, parser, appender, endpoint, session=None, **kwargs):
+        """
+        URLを取得して解析（保持済みの部分は再取得しない）
+
+        Args:
+            key (str): 保持単位のキー（同じキーで URL が変わると前回分を破棄）
+            url (str): 取得するURL
+            parser (callable): ファイル全体（bytes）を解析する関数
+            appender (callable): (解析済みオブジェクト, 追記分bytes) から新しいオブジェクトを返す関数
+            endpoint (str): 統計用のエンドポイント名
+            session: 使用するrequestsのセッション（省略時は共有セッション）
+            **kwargs: requestsに渡す追加引数（timeout, verifyなど）
+
+        Returns:
+            解析結果
+
+        Raises:
+            requests.exceptions.RequestException: 通信エラーまたはHTTPエラー
+        """
+        session = session or get_shared_session()
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry is not None and entry.url == url and entry.length > 0:
+            overlap = len(entry.tail)
+            offset = entry.length - overlap
+            # 圧縮されると Range が圧縮後のバイト位置になるため、範囲指定の要求のみ無圧縮で取得する
+            headers = {'Accept-Encoding': 'identity', 'Range': f"bytes={offset}-"}
+            response = session.get(url, headers=headers, **kwargs)
+            match = self._CONTENT_RANGE.match(response.headers.get('Content-Range', ''))
+            content = response.content if response.status_code == 206 else b''
+
+            if match and int(match.group(1)) == offset and content[:overlap] == entry.tail:
+                appended = content[overlap:]
+                if not appended:
+                    self._count(endpoint, 'unchanged')
+                    return entry.data
+                data = appender(entry.data, appended)
+                self._store(key, url, entry.length + len(appended), entry.tail + appended, data)
+                self._count(endpoint, 'partial')
+                logger.debug(f"追記分のみ取得 ({endpoint}): {len(appended)}バイト - {url}")
+                return data
+
+            if response.status_code >= 400 and response.status_code != 416:
+                response.raise_for_status()
+            if response.status_code != 200:
+                # 保持済みの内容と整合しない場合は全体を取得し直す
+                logger.info(f"保持済みのファイルと整合しないため全体を再取得 ({endpoint}): {url}")
+                response = session.get(url, **kwargs)
+        else:
+            response = session.get(url, **kwargs)
+
+        response.raise_for_status()
+        content = response.content
+        data = parser(content)
+        self._store(key, url, len(content), content, data)
+        self._count(endpoint, 'full')
+        return data
+
+    def _store(self, key, url, length, content, data):
+        with self._lock:
+            self._entries[key] = _TailEntry(url, length, content[-TAIL_OVERLAP_BYTES:], data)
+
+    def _count(self, endpoint, key):
+        with self._lock:
+            counters = self._stats.setdefault(endpoint, {'full': 0, 'partial': 0, 'unchanged': 0})
+            counters[key] += 1
+
+    def stats(self):
+        """エンドポイントごとの全体取得／追記取得／未更新の回数を取得"""
+        with self._lock:
+            return {endpoint: dict(counters) for endpoint, counters in self._stats.items()}
+
+
+def parse_json(response):
+    """JSONレスポンスを解析（json_backend の高速なデコーダーで本文のbytesを直接解析）"""
+    return json_backend.loads(response.content)
+
+
+# プロセス全体で共有するキャッシュ（拠点・クライアント間で同一URLの結果を共有）
+_shared_cache = HTTPCache()
+
+
+def get_shared_cache():
+    """プロセス全体で共有するHTTPキャッシュを取得"""
+    return _shared_cache
@@ -1,16 +1,27 @@
 import requests
-import json
 import math
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
+from http_client import get_shared_cache, parse_json
+from csv_store import get_fallback_store
+from jma_forecast import AREA_CODES, ForecastDocument
+from amedas import get_station_index, get_map_snapshot, watch_stations, STATION_TABLE_RETRY_INTERVAL
 
 logger = logging.getLogger(__name__)
 
 class JMAWeatherAPI:
-    def __init__(self, area_code='130000'):
+    def __init__(self, area_code='130000', location=None):
         self.area_code = area_code
+        # 拠点情報（アメダス観測所の選択に使用）
+        self.location = location or {}
+        self._amedas_station_ids = None
+        self._amedas_station_retry_at = None
         self.base_url = "https://www.jma.go.jp/bosai"
+        # 未更新のJSONは304応答で前回の解析結果を再利用する（全拠点で共有）
+        self.http_cache = get_shared_cache()
+        # APIアクセス失敗時は data/csv のファイルを参照する（未更新のJSONは解析結果を再利用）
+        self.fallback_store = get_fallback_store()
         
         # SSL設定の読み込み（Windows企業環境対応）
         try:
@@ -27,55 +38,28 @@ class JMAWeatherAPI:
             self.ssl_verify = True
             self.ssl_cert_path = None
         
-        self.area_codes = {
-            '札幌': '016000',
-            '青森': '020000', 
-            '盛岡': '030000',
-            '仙台': '040000',
-            '秋田': '050000',
-            '山形': '060000',
-            '福島': '070000',
-            '水戸': '080000',
-            '宇都宮': '090000',
-            '前橋': '100000',
-            'さいたま': '110000',
-            '千葉': '120000',
-            '東京': '130000',
-            '横浜': '140000',
-            '新潟': '150000',
-            '富山': '160000',
-            '金沢': '170000',
-            '福井': '180000',
-            '甲府': '190000',
-            '長野': '200000',
-            '岐阜': '210000',
-            '静岡': '220000',
-            '名古屋': '230000',
-            '津': '240000',
-            '大津': '250000',
-            '京都': '260000',
-            '大阪': '270000',
-            '神戸': '280000',
-            '奈良': '290000',
-            '和歌山': '300000',
-            '鳥取': '310000',
-            '松江': '320000',
-            '岡山': '330000',
-            '広島': '340000',
-            '山口': '350000',
-            '徳島': '360000',
-            '高松': '370000',
-            '松山': '380000',
-            '高知': '390000',
-            '福岡': '400000',
-            '佐賀': '410000',
-            '長崎': '420000',
-            '熊本': '430000',
-            '大分': '440000',
-            '宮崎': '450000',
-            '鹿児島': '460100',
-            '那覇': '471000'
-        }
+        self.area_codes = dict(AREA_CODES)
+        # 予報JSONを1回だけ走査した予報ドキュメント（同じJSONに対しては使い回す）
+        self._forecast_document = None
+    
+    def watch_amedas_stations(self):
+        """
+        拠点のアメダス観測点を実況データの抽出対象として登録
+        
+        同じ時刻の実況データを拠点ごとに取り直さないよう、全拠点分を最初の取得より前に
+        取得スレッドから呼び出す（観測所一覧の取得に通信を伴うため、GUIのメインスレッドでは呼ばない）
+        """
+        if os.environ.get('FORCE_CSV_MODE', '0') == '1':
+            # CSVのみを使用する場合は観測所一覧を取得しない
+            return
+        try:
+            station_ids = self._get_amedas_station_ids()
+        except Exception as e:
+            # 選択できない場合は初回の実況データ取得時に登録する
+            logger.warning(f"アメダス観測点の事前登録に失敗: {e}")
+            return
+        if station_ids:
+            watch_stations(station_ids)
     
     def get_current_weather(self):
         """現在の天気データを取得"""
@@ -88,22 +72,18 @@ class JMAWeatherAPI:
         
         try:
             forecast_url = f"{self.base_url}/forecast/data/forecast/{self.area_code}.json"
-            response = requests.get(forecast_url, timeout=10, verify=self.ssl_verify)
-            response.raise_for_status()
-            forecast_data = response.json()
-            
-            # 観測データも取得
-            obs_url = f"{self.base_url}/amedas/const/amedastable.json"
-            obs_response = requests.get(obs_url, timeout=10, verify=self.ssl_verify)
-            obs_response.raise_for_status()
+            forecast_data = self.http_cache.get(forecast_url, parse_json, 'jma_forecast',
+                                                timeout=10, verify=self.ssl_verify)
             
+            # 予報JSONを1回だけ走査して予報ドキュメントを作成
+            document = self._get_forecast_document(forecast_data)
             # 週間予報データも取得
-            weekly_data = self._parse_weekly_forecast(forecast_data)
-            weather_data = self._parse_weather_data(forecast_data)
+            weekly_data = self._parse_weekly_forecast(document)
+            weather_data = self._parse_weather_data(document)
             if weather_data:
                 if weekly_data:
                     # 今日・明日予報から週間予報の最初の日を補完
-                    weekly_data = self._supplement_weekly_with_daily_forecast(forecast_data, weekly_data)
+                    weekly_data = self._supplement_weekly_with_daily_forecast(document, weekly_data)
                     weather_data['weekly_forecast'] = weekly_data
                 return weather_data
             return None
@@ -117,57 +97,48 @@ class JMAWeatherAPI:
             logger.info("CSVファイルからのデータ読み込みを試行中...")
             return self._get_weather_from_csv()
     
-    def _supplement_weekly_with_daily_forecast(self, forecast_data, weekly_data):
+    def _get_forecast_document(self, forecast_data):
+        """予報JSONの予報ドキュメントを取得（同じJSONに対しては1回だけ作成）"""
+        if self._forecast_document is None or not self._forecast_document.describes(forecast_data):
+            self._forecast_document = ForecastDocument(forecast_data)
+        return self._forecast_document
+
+    def _supplement_weekly_with_daily_forecast(self, document, weekly_data):
         """今日・明日予報から週間予報の最初の日を補完"""
         try:
-            if not forecast_data or len(forecast_data) < 1 or not weekly_data:
-                return weekly_data
-            
-            daily_series = forecast_data[0]  # Series 0が今日・明日予報
-            if 'timeSeries' not in daily_series:
+            if not weekly_data or document.daily_pops is None:
                 return weekly_data
             
             # 今日・明日の降水確率を取得
-            for ts in daily_series['timeSeries']:
-                if 'areas' in ts and ts['areas']:
-                    area = ts['areas'][0]
-                    if 'pops' in area:
-                        time_defines = ts.get('timeDefines', [])
-                        pops = area.get('pops', [])
-                        
-                        # 明日のデータを検索（時間で判断）
-                        from datetime import datetime, timedelta
-                        tomorrow = datetime.now() + timedelta(days=1)
-                        tomorrow_date_str = tomorrow.strftime('%Y-%m-%d')
-                        
-                        for i, time_str in enumerate(time_defines):
-                            if tomorrow_date_str in time_str and i < len(pops) and pops[i]:
-                                # 週間予報の最初の日が明日の場合、降水確率を補完
-                                if weekly_data and weekly_data[0]['pop'] is None:
-                                    weekly_data[0]['pop'] = pops[i]
-                                    logger.info(f"明日の降水確率を補完: {pops[i]}%")
-                                break
-                        break
+            series = document.daily_pops
+            area, _ = series.select(self.area_code)
+            pops = area.get('pops', [])
+            
+            # 明日のデータを検索（解析済みの時刻で判断）
+            tomorrow = (datetime.now() + timedelta(days=1)).date()
+            for time, pop in zip(series.times, pops):
+                if time is not None and time.date() == tomorrow and pop:
+                    # 週間予報の最初の日が明日の場合、降水確率を補完
+                    if weekly_data[0]['pop'] is None:
+                        weekly_data[0]['pop'] = pop
+                        logger.info(f"明日の降水確率を補完: {pop}%")
+                    break
             
             return weekly_data
             
         except Exception as e:
             logger.warning(f"週間予報の補完処理でエラー: {e}")
             return weekly_data
-    
-    def _parse_weather_data(self, forecast_data):
+
+    def _parse_weather_data(self, document):
         """予報データを解析"""
         try:
             # 基本情報取得
-            publishing_office = forecast_data[0]['publishingOffice']
-            report_datetime = forecast_data[0]['reportDatetime']
+            publishing_office = document.publishing_office
+            report_datetime = document.report_datetime
             
-            # 今日の予報を取得
-            time_series = forecast_data[0]['timeSeries']
-            
-            # 天気予報データ
-            weather_data = time_series[0]
-            areas = weather_data['areas'][0]
+            # 天気予報データ（今日の予報）
+            areas, _ = document.daily_weather.select(self.area_code)
             
             # 今日の天気
             weather_code = areas['weatherCodes'][0] if areas.get('weatherCodes') else '100'
@@ -180,67 +151,30 @@ class JMAWeatherAPI:
             forecast_low = None
             
             # JMA予報データから気温を取得
-            for ts in time_series:
-                areas_temp = ts.get('areas', [])
-                if areas_temp and 'temps' in areas_temp[0]:
-                    # 気温予報データが含まれている
-                    time_defines = ts.get('timeDefines', [])
-                    
-                    # 設定で指定された地域名に一致するエリアを探す
-                    target_area = None
-                    # エリアコードから目標地域名を推定（優先度順）
-                    target_names = {
-                        '140000': ['横浜'],  # 神奈川県
-                        '120000': ['銚子']  # 千葉県（銚子を優先）
-                    }
-                    
-                    possible_names = target_names.get(self.area_code, [])
-                    
-                    # 最初に具体的な地域名で探す
-                    for possible_name in possible_names:
-                        for area in areas_temp:
-                            area_name = area['area']['name']
-                            if area_name == possible_name:  # 完全一致を優先
-                                target_area = area
-                                logger.info(f"目標地域を発見(完全一致): {area_name}")
-                                break
-                        if target_area:
-                            break
-                    
-                    # 完全一致がない場合は部分一致で探す
-                    if not target_area:
-                        for possible_name in possible_names:
-                            for area in areas_temp:
-                                area_name = area['area']['name']
-                                if possible_name in area_name or area_name in possible_name:
-                                    target_area = area
-                                    logger.info(f"目標地域を発見(部分一致): {area_name}")
-                                    break
-                            if target_area:
-                                break
-                    
-                    # 目標地域が見つからない場合は最初のエリアを使用
-                    if not target_area:
-                        target_area = areas_temp[0]
-                        logger.warning(f"目標地域が見つからないため、最初のエリアを使用: {target_area['area']['name']}")
-                    
-                    temps = target_area.get('temps', [])
-                    
-                    # temps配列の構造: [今日最高, 今日最高(重複), 明日最低, 明日最高]
-                    # メインロジック: シンプルに配列から直接取得
-                    if len(temps) >= 1 and temps[0]:
-                        forecast_high = int(temps[0])  # 今日の最高気温
-                        logger.info(f"今日の最高気温を取得: {forecast_high}°C ({target_area['area']['name']})")
-                    
-                    if len(temps) >= 3 and temps[2]:
-                        forecast_low = int(temps[2])   # 明日の最低気温を今日の最低気温として使用
-                        logger.info(f"今日の最低気温を取得: {forecast_low}°C ({target_area['area']['name']})")
-                    elif len(temps) >= 2 and temps[1]:
-                        forecast_low = int(temps[1])   # フォールバック
-                        logger.info(f"今日の最低気温を取得(フォールバック): {forecast_low}°C ({target_area['area']['name']})")
-                    
-                    # 最初のtempsデータを取得したらループ終了
-                    break
+            if document.daily_temps is not None:
+                # 地域コードに対応する地点を選択（完全一致 > 部分一致 > 最初のエリア）
+                target_area, match = document.daily_temps.select(self.area_code)
+                if match == 'exact':
+                    logger.info(f"目標地域を発見(完全一致): {target_area['area']['name']}")
+                elif match == 'partial':
+                    logger.info(f"目標地域を発見(部分一致): {target_area['area']['name']}")
+                else:
+                    logger.warning(f"目標地域が見つからないため、最初のエリアを使用: {target_area['area']['name']}")
+                
+                temps = target_area.get('temps', [])
+                
+                # temps配列の構造: [今日最高, 今日最高(重複), 明日最低, 明日最高]
+                # メインロジック: シンプルに配列から直接取得
+                if len(temps) >= 1 and temps[0]:
+                    forecast_high = int(temps[0])  # 今日の最高気温
+                    logger.info(f"今日の最高気温を取得: {forecast_high}°C ({target_area['area']['name']})")
+                
+                if len(temps) >= 3 and temps[2]:
+                    forecast_low = int(temps[2])   # 明日の最低気温を今日の最低気温として使用
+                    logger.info(f"今日の最低気温を取得: {forecast_low}°C ({target_area['area']['name']})")
+                elif len(temps) >= 2 and temps[1]:
+                    forecast_low = int(temps[1])   # フォールバック
+                    logger.info(f"今日の最低気温を取得(フォールバック): {forecast_low}°C ({target_area['area']['name']})")
             
             # 現在気温と予想気温のデフォルト値
             if not current_temp:
@@ -282,28 +216,25 @@ class JMAWeatherAPI:
             logger.error(f"天気データの解析に失敗: {e}")
             return None
     
-    def _parse_weekly_forecast(self, forecast_data):
+    def _parse_weekly_forecast(self, document):
         """週間予報データを解析（改善版）"""
         try:
-            if len(forecast_data) < 2:
+            if not document.weekly:
                 logger.warning("週間予報データが見つかりません")
                 return None
             
-            weekly_series = forecast_data[1]  # Series 1が週間予報
-            
-            if 'timeSeries' not in weekly_series or len(weekly_series['timeSeries']) < 2:
+            if document.weekly_weather is None:
                 logger.warning("週間予報の時系列データが不完全です")
                 return None
             
             # 週間天気データ（timeSeries[0]）
-            weather_ts = weekly_series['timeSeries'][0]
-            weather_areas = weather_ts.get('areas', [])
-            if not weather_areas:
+            weather_series = document.weekly_weather
+            weather_area, _ = weather_series.select(self.area_code)
+            if weather_area is None:
                 logger.warning("週間予報の地域データが見つかりません")
                 return None
             
-            weather_area = weather_areas[0]
-            weather_dates = weather_ts.get('timeDefines', [])
+            weather_dates = weather_series.time_defines
             weather_codes = weather_area.get('weatherCodes', [])
             pops = weather_area.get('pops', [])
             reliabilities = weather_area.get('reliabilities', [])
@@ -311,14 +242,13 @@ class JMAWeatherAPI:
             logger.info(f"週間天気データ: {weather_area['area']['name']}, 日数: {len(weather_dates)}")
             
             # 週間気温データ（timeSeries[1]）
-            temp_ts = weekly_series['timeSeries'][1]
-            temp_areas = temp_ts.get('areas', [])
-            if not temp_areas:
+            temp_series = document.weekly_temps
+            temp_area, _ = temp_series.select(self.area_code)
+            if temp_area is None:
                 logger.warning("週間予報の気温データが見つかりません")
                 return None
             
-            temp_area = temp_areas[0]
-            temp_dates = temp_ts.get('timeDefines', [])
+            temp_dates = temp_series.time_defines
             temps_max = temp_area.get('tempsMax', [])
             temps_min = temp_area.get('tempsMin', [])
             temps_max_upper = temp_area.get('tempsMaxUpper', [])
@@ -349,18 +279,21 @@ class JMAWeatherAPI:
                     'temp_min_lower': temps_min_lower[i] if i < len(temps_min_lower) and temps_min_lower[i] and str(temps_min_lower[i]).strip() != '' else None
                 }
             
+            # 日付文字列 -> 解析済みの日付
+            parsed_dates = dict(zip(temp_dates, temp_series.times))
+            parsed_dates.update(zip(weather_dates, weather_series.times))
+            
             # 全日付を収集（天気と気温の両方から）
             all_dates = set(weather_dates + temp_dates)
             
             # 週間予報データを整理
             weekly_forecast = []
             for date_str in sorted(all_dates)[:7]:  # 最大7日間、日付順
-                try:
-                    from datetime import datetime
-                    date_obj = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+                date_obj = parsed_dates.get(date_str)
+                if date_obj is not None:
                     formatted_date = date_obj.strftime('%m/%d')
                     weekday = ['月', '火', '水', '木', '金', '土', '日'][date_obj.weekday()]
-                except:
+                else:
                     formatted_date = f"Day{len(weekly_forecast)+1}"
                     weekday = ""
                 
@@ -606,9 +539,8 @@ class JMAWeatherAPI:
             # overview_forecastエンドポイントのURL
             overview_url = f"https://www.jma.go.jp/bosai/forecast/data/overview_forecast/{self.area_code}.json"
             
-            response = requests.get(overview_url, timeout=10, verify=self.ssl_verify)
-            response.raise_for_status()
-            overview_data = response.json()
+            overview_data = self.http_cache.get(overview_url, parse_json, 'jma_overview',
+                                                timeout=10, verify=self.ssl_verify)
             
             # 現在気温データの取得を試行
             if 'targetArea' in overview_data:
@@ -645,48 +577,24 @@ class JMAWeatherAPI:
         """アメダス実況データから現在気温を取得（フォールバック）"""
         try:
             from datetime import datetime, timedelta
-            import json
             
             # 現在時刻の1時間前のデータを取得（実況データの更新頻度を考慮）
-            now = datetime.now()
-            target_time = now - timedelta(hours=1)
-            date_str = target_time.strftime('%Y%m%d')
-            hour_str = target_time.strftime('%H')
-            
-            # アメダス実況データのURL
-            amedas_url = f"https://www.jma.go.jp/bosai/amedas/data/map/{date_str}{hour_str}0000.json"
-            
-            response = requests.get(amedas_url, timeout=10, verify=self.ssl_verify)
-            response.raise_for_status()
-            amedas_data = response.json()
-            
-            # 地域コードに対応するアメダス観測点を探す
-            # 横浜: 46106, 千葉(銚子): 45148などから近い観測点を選択
-            target_stations = {
-                '140000': ['46106', '46078'],  # 神奈川県: 横浜、小田原
-                '120000': ['45148', '45056']   # 千葉県: 銚子、木更津
-            }
+            target_time = datetime.now() - timedelta(hours=1)
             
-            stations_to_check = target_stations.get(self.area_code, [])
+            # 拠点に対応するアメダス観測点（近傍の代替観測点を含む）
+            station_ids = self._get_amedas_station_ids()
+            if not station_ids:
+                logger.warning(f"地域コード {self.area_code} に対応するアメダス観測点がありません")
+                return None
             
-            # 該当観測点のデータを検索
-            for station_id in stations_to_check:
-                if station_id in amedas_data:
-                    station_data = amedas_data[station_id]
-                    if 'temp' in station_data and station_data['temp'][0] is not None:
-                        temp = float(station_data['temp'][0])
-                        logger.info(f"アメダス実況気温取得成功: {temp}°C (観測点: {station_id})")
-                        return temp
+            # 全国分の実況データは時刻ごとに1回だけ取得し、全拠点で共有（必要な観測点のみ抽出）
+            snapshot = get_map_snapshot(target_time, station_ids, verify=self.ssl_verify)
             
-            # 該当観測点がない場合は、首都圏の主要観測点を試行
-            fallback_stations = ['44132', '44136', '46106', '45148']  # 東京、練馬、横浜、銚子
-            for station_id in fallback_stations:
-                if station_id in amedas_data:
-                    station_data = amedas_data[station_id]
-                    if 'temp' in station_data and station_data['temp'][0] is not None:
-                        temp = float(station_data['temp'][0])
-                        logger.info(f"アメダス実況気温取得成功(代替): {temp}°C (観測点: {station_id})")
-                        return temp
+            for station_id in station_ids:
+                temp = snapshot.get(station_id, 'temp')
+                if temp is not None:
+                    logger.info(f"アメダス実況気温取得成功: {temp}°C (観測点: {station_id})")
+                    return temp
             
             logger.warning("アメダス実況データから気温を取得できませんでした")
             return None
@@ -695,6 +603,25 @@ class JMAWeatherAPI:
             logger.error(f"アメダス実況データ取得エラー: {e}")
             return None
     
+    def _get_amedas_station_ids(self):
+        """気温の取得に使用するアメダス観測点番号を優先順に取得（観測所一覧から選択）"""
+        if self._amedas_station_ids is None:
+            if self._amedas_station_retry_at is not None and datetime.now() < self._amedas_station_retry_at:
+                return []
+            station_index = get_station_index(verify=self.ssl_verify)
+            if station_index is None:
+                # 観測所一覧を取得できない間は、呼び出しごとに取得し直さない
+                self._amedas_station_retry_at = datetime.now() + timedelta(seconds=STATION_TABLE_RETRY_INTERVAL)
+                return []
+            
+            # WBGT地点番号（アメダス観測所番号と共通）を優先し、なければ地域の代表地点名で照合
+            station_id = self.location.get('wbgt_location_code')
+            area_names = {code: name for name, code in self.area_codes.items()}
+            self._amedas_station_ids = station_index.select_stations(
+                station_id=station_id, name=area_names.get(self.area_code))
+            logger.info(f"アメダス観測点を選択: {self._amedas_station_ids} (地域コード: {self.area_code})")
+        return self._amedas_station_ids
+    
     def calculate_wbgt(self, temp, humidity):
         """WBGT指数を計算"""
         # 湿球温度の計算
@@ -759,35 +686,25 @@ class JMAWeatherAPI:
     def _get_weather_from_csv(self):
         """CSVファイルから天気データを取得（APIアクセス失敗時のフォールバック）"""
         try:
-            # JSONファイルのパスを構築
-            script_dir = os.path.dirname(os.path.dirname(__file__))
-            json_file = os.path.join(script_dir, 'data', 'csv', f'jma_forecast_{self.area_code}.json')
+            file_name = f'jma_forecast_{self.area_code}.json'
             
-            if not os.path.exists(json_file):
-                logger.warning(f"JMA JSONファイルが見つかりません: {json_file}")
+            # 24時間以内に更新されたファイルのみ使用
+            forecast_data = self.fallback_store.load_json(file_name, max_age_hours=24)
+            if forecast_data is None:
                 return None
             
-            # ファイルの更新時間をチェック（24時間以内かどうか）
-            file_mtime = os.path.getmtime(json_file)
-            current_time = datetime.now().timestamp()
-            if current_time - file_mtime > 24 * 3600:  # 24時間
-                logger.warning(f"JMA JSONファイルが古すぎます（{(current_time - file_mtime) / 3600:.1f}時間前）")
-                return None
-            
-            # JSONファイルを読み込み
-            with open(json_file, 'r', encoding='utf-8') as f:
-                forecast_data = json.load(f)
-            
-            logger.info(f"JSONファイルからデータを正常に読み込みました: {json_file}")
+            logger.info(f"JSONファイルからデータを正常に読み込みました: {self.fallback_store.path(file_name)}")
             
+            # 予報JSONを1回だけ走査して予報ドキュメントを作成
+            document = self._get_forecast_document(forecast_data)
             # 週間予報データも含めて処理
-            weekly_data = self._parse_weekly_forecast(forecast_data)
-            weather_data = self._parse_weather_data(forecast_data)
+            weekly_data = self._parse_weekly_forecast(document)
+            weather_data = self._parse_weather_data(document)
             
             if weather_data:
                 if weekly_data:
                     # 今日・明日予報から週間予報の最初の日を補完
-                    weekly_data = self._supplement_weekly_with_daily_forecast(forecast_data, weekly_data)
+                    weekly_data = self._supplement_weekly_with_daily_forecast(document, weekly_data)
                     weather_data['weekly_forecast'] = weekly_data
                 return weather_data
             
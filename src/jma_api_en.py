@@ -1,17 +1,30 @@
 import requests
-import json
 import math
 import os
 import sys
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
+from http_client import get_shared_cache, parse_json
+from csv_store import get_fallback_store
+from jma_forecast import ForecastDocument
+from amedas import get_station_index, get_map_snapshot, watch_stations, STATION_TABLE_RETRY_INTERVAL
 
 logger = logging.getLogger(__name__)
 
 class JMAWeatherAPIEN:
-    def __init__(self, area_code='130000'):
+    def __init__(self, area_code='130000', location=None):
         self.area_code = area_code
+        # Location information (used to select AMeDAS stations)
+        self.location = location or {}
+        self._amedas_station_ids = None
+        self._amedas_station_retry_at = None
         self.base_url = "https://www.jma.go.jp/bosai"
+        # Unchanged JSON is answered with 304 and the previous parse result is reused (shared by all locations)
+        self.http_cache = get_shared_cache()
+        # On API failure the files in data/csv are used (unchanged JSON reuses the parse result)
+        self.fallback_store = get_fallback_store()
+        # Forecast document built in one pass over the forecast JSON (reused for the same JSON)
+        self._forecast_document = None
         
         # SSL設定の読み込み（Windows企業環境対応）
         try:
@@ -76,6 +89,25 @@ class JMAWeatherAPIEN:
             'Naha': '471000'
         }
     
+    def watch_amedas_stations(self):
+        """
+        Register this location's AMeDAS stations for extraction from the real-time map
+        
+        Called for every location from a fetch thread before the first fetch, so the hourly map is not
+        refetched per location (loading the station table may hit the network, so never on the GUI thread)
+        """
+        if os.environ.get('FORCE_CSV_MODE', '0') == '1':
+            # The station table is not fetched when only CSV files are used
+            return
+        try:
+            station_ids = self._get_amedas_station_ids()
+        except Exception as e:
+            # When they cannot be selected yet they are registered on the first real-time data fetch
+            logger.warning(f"Failed to pre-register AMeDAS stations: {e}")
+            return
+        if station_ids:
+            watch_stations(station_ids)
+    
     def get_current_weather(self):
         """Get current weather data"""
         # Check for forced CSV mode
@@ -87,18 +119,14 @@ class JMAWeatherAPIEN:
         
         try:
             forecast_url = f"{self.base_url}/forecast/data/forecast/{self.area_code}.json"
-            response = requests.get(forecast_url, timeout=10, verify=self.ssl_verify)
-            response.raise_for_status()
-            forecast_data = response.json()
-            
-            # Also get observation data
-            obs_url = f"{self.base_url}/amedas/const/amedastable.json"
-            obs_response = requests.get(obs_url, timeout=10, verify=self.ssl_verify)
-            obs_response.raise_for_status()
+            forecast_data = self.http_cache.get(forecast_url, parse_json, 'jma_forecast',
+                                                timeout=10, verify=self.ssl_verify)
             
+            # Walk the forecast JSON once to build the forecast document
+            document = self._get_forecast_document(forecast_data)
             # Also get weekly forecast data
-            weekly_data = self._parse_weekly_forecast(forecast_data)
-            weather_data = self._parse_weather_data(forecast_data)
+            weekly_data = self._parse_weekly_forecast(document)
+            weather_data = self._parse_weather_data(document)
             if weather_data:
                 if weekly_data:
                     weather_data['weekly_forecast'] = weekly_data
@@ -114,19 +142,15 @@ class JMAWeatherAPIEN:
             logger.info("Attempting to read data from CSV file...")
             return self._get_weather_from_csv()
     
-    def _parse_weather_data(self, forecast_data):
+    def _parse_weather_data(self, document):
         """Parse forecast data"""
         try:
             # Get basic information
-            publishing_office = forecast_data[0]['publishingOffice']
-            report_datetime = forecast_data[0]['reportDatetime']
-            
-            # Get today's forecast
-            time_series = forecast_data[0]['timeSeries']
+            publishing_office = document.publishing_office
+            report_datetime = document.report_datetime
             
-            # Weather forecast data
-            weather_data = time_series[0]
-            areas = weather_data['areas'][0]
+            # Weather forecast data (today's forecast)
+            areas, _ = document.daily_weather.select(self.area_code)
             
             # Today's weather
             weather_code = areas['weatherCodes'][0] if areas.get('weatherCodes') else '100'
@@ -139,54 +163,28 @@ class JMAWeatherAPIEN:
             forecast_low = None
             
             # Get temperature from JMA forecast data
-            for ts in time_series:
-                areas_temp = ts.get('areas', [])
-                if areas_temp and 'temps' in areas_temp[0]:
-                    # Temperature forecast data is included
-                    time_defines = ts.get('timeDefines', [])
-                    
-                    # Find area matching the configured location name
-                    target_area = None
-                    # Map area codes to target location names
-                    target_names = {
-                        '140000': ['Yokohama', '横浜'],  # Kanagawa
-                        '120000': ['Choshi', '銚子', 'Chiba', '千葉']  # Chiba
-                    }
-                    
-                    possible_names = target_names.get(self.area_code, [])
-                    
-                    for area in areas_temp:
-                        area_name = area['area']['name']
-                        for possible_name in possible_names:
-                            if possible_name in area_name or area_name in possible_name:
-                                target_area = area
-                                logger.info(f"Found target area: {area_name}")
-                                break
-                        if target_area:
-                            break
-                    
-                    # Use first area if target area not found
-                    if not target_area:
-                        target_area = areas_temp[0]
-                        logger.warning(f"Target area not found, using first area: {target_area['area']['name']}")
-                    
-                    temps = target_area.get('temps', [])
-                    
-                    # temps array structure: [today_high, today_high(duplicate), tomorrow_low, tomorrow_high]
-                    # Main logic: directly get from array
-                    if len(temps) >= 1 and temps[0]:
-                        forecast_high = int(temps[0])  # Today's high temperature
-                        logger.info(f"Got today's high temperature: {forecast_high}°C ({target_area['area']['name']})")
-                    
-                    if len(temps) >= 3 and temps[2]:
-                        forecast_low = int(temps[2])   # Use tomorrow's low as today's low
-                        logger.info(f"Got today's low temperature: {forecast_low}°C ({target_area['area']['name']})")
-                    elif len(temps) >= 2 and temps[1]:
-                        forecast_low = int(temps[1])   # Fallback
-                        logger.info(f"Got today's low temperature (fallback): {forecast_low}°C ({target_area['area']['name']})")
-                    
-                    # Break after finding first temps data
-                    break
+            if document.daily_temps is not None:
+                # Select the point for the area code (exact > partial > first area)
+                target_area, match = document.daily_temps.select(self.area_code)
+                if match == 'default':
+                    logger.warning(f"Target area not found, using first area: {target_area['area']['name']}")
+                else:
+                    logger.info(f"Found target area: {target_area['area']['name']}")
+                
+                temps = target_area.get('temps', [])
+                
+                # temps array structure: [today_high, today_high(duplicate), tomorrow_low, tomorrow_high]
+                # Main logic: directly get from array
+                if len(temps) >= 1 and temps[0]:
+                    forecast_high = int(temps[0])  # Today's high temperature
+                    logger.info(f"Got today's high temperature: {forecast_high}°C ({target_area['area']['name']})")
+                
+                if len(temps) >= 3 and temps[2]:
+                    forecast_low = int(temps[2])   # Use tomorrow's low as today's low
+                    logger.info(f"Got today's low temperature: {forecast_low}°C ({target_area['area']['name']})")
+                elif len(temps) >= 2 and temps[1]:
+                    forecast_low = int(temps[1])   # Fallback
+                    logger.info(f"Got today's low temperature (fallback): {forecast_low}°C ({target_area['area']['name']})")
             
             # Default values for current and forecast temperatures
             if not current_temp:
@@ -228,66 +226,58 @@ class JMAWeatherAPIEN:
             logger.error(f"Failed to parse weather data: {e}")
             return None
     
-    def _supplement_weekly_with_daily_forecast(self, forecast_data, weekly_data):
+    def _get_forecast_document(self, forecast_data):
+        """Get the forecast document of the forecast JSON (built once per JSON)"""
+        if self._forecast_document is None or not self._forecast_document.describes(forecast_data):
+            self._forecast_document = ForecastDocument(forecast_data)
+        return self._forecast_document
+
+    def _supplement_weekly_with_daily_forecast(self, document, weekly_data):
         """Supplement weekly forecast with today/tomorrow forecast data"""
         try:
-            if not forecast_data or len(forecast_data) < 1 or not weekly_data:
-                return weekly_data
-            
-            daily_series = forecast_data[0]  # Series 0 is today/tomorrow forecast
-            if 'timeSeries' not in daily_series:
+            if not weekly_data or document.daily_pops is None:
                 return weekly_data
             
             # Get precipitation probability from today/tomorrow forecast
-            for ts in daily_series['timeSeries']:
-                if 'areas' in ts and ts['areas']:
-                    area = ts['areas'][0]
-                    if 'pops' in area:
-                        time_defines = ts.get('timeDefines', [])
-                        pops = area.get('pops', [])
-                        
-                        # Search for tomorrow's data (determined by time)
-                        from datetime import datetime, timedelta
-                        tomorrow = datetime.now() + timedelta(days=1)
-                        tomorrow_date_str = tomorrow.strftime('%Y-%m-%d')
-                        
-                        for i, time_str in enumerate(time_defines):
-                            if tomorrow_date_str in time_str and i < len(pops) and pops[i]:
-                                # If the first day of weekly forecast is tomorrow, supplement precipitation probability
-                                if weekly_data and weekly_data[0]['pop'] is None:
-                                    weekly_data[0]['pop'] = pops[i]
-                                    logger.info(f"Supplemented tomorrow's precipitation probability: {pops[i]}%")
-                                break
-                        break
+            series = document.daily_pops
+            area, _ = series.select(self.area_code)
+            pops = area.get('pops', [])
+            
+            # Search for tomorrow's data (using the pre-parsed times)
+            tomorrow = (datetime.now() + timedelta(days=1)).date()
+            for time, pop in zip(series.times, pops):
+                if time is not None and time.date() == tomorrow and pop:
+                    # If the first day of weekly forecast is tomorrow, supplement precipitation probability
+                    if weekly_data[0]['pop'] is None:
+                        weekly_data[0]['pop'] = pop
+                        logger.info(f"Supplemented tomorrow's precipitation probability: {pop}%")
+                    break
             
             return weekly_data
             
         except Exception as e:
             logger.warning(f"Error in weekly forecast supplementation: {e}")
             return weekly_data
-    
-    def _parse_weekly_forecast(self, forecast_data):
+
+    def _parse_weekly_forecast(self, document):
         """Parse weekly forecast data (improved version)"""
         try:
-            if len(forecast_data) < 2:
+            if not document.weekly:
                 logger.warning("Weekly forecast data not found")
                 return None
             
-            weekly_series = forecast_data[1]  # Series 1 is weekly forecast
-            
-            if 'timeSeries' not in weekly_series or len(weekly_series['timeSeries']) < 2:
+            if document.weekly_weather is None:
                 logger.warning("Weekly forecast time series data incomplete")
                 return None
             
             # Weekly weather data (timeSeries[0])
-            weather_ts = weekly_series['timeSeries'][0]
-            weather_areas = weather_ts.get('areas', [])
-            if not weather_areas:
+            weather_series = document.weekly_weather
+            weather_area, _ = weather_series.select(self.area_code)
+            if weather_area is None:
                 logger.warning("Weekly forecast area data not found")
                 return None
             
-            weather_area = weather_areas[0]
-            weather_dates = weather_ts.get('timeDefines', [])
+            weather_dates = weather_series.time_defines
             weather_codes = weather_area.get('weatherCodes', [])
             pops = weather_area.get('pops', [])
             reliabilities = weather_area.get('reliabilities', [])
@@ -295,14 +285,13 @@ class JMAWeatherAPIEN:
             logger.info(f"Weekly weather data: {weather_area['area']['name']}, days: {len(weather_dates)}")
             
             # Weekly temperature data (timeSeries[1])
-            temp_ts = weekly_series['timeSeries'][1]
-            temp_areas = temp_ts.get('areas', [])
-            if not temp_areas:
+            temp_series = document.weekly_temps
+            temp_area, _ = temp_series.select(self.area_code)
+            if temp_area is None:
                 logger.warning("Weekly forecast temperature data not found")
                 return None
             
-            temp_area = temp_areas[0]
-            temp_dates = temp_ts.get('timeDefines', [])
+            temp_dates = temp_series.time_defines
             temps_max = temp_area.get('tempsMax', [])
             temps_min = temp_area.get('tempsMin', [])
             temps_max_upper = temp_area.get('tempsMaxUpper', [])
@@ -333,18 +322,21 @@ class JMAWeatherAPIEN:
                     'temp_min_lower': temps_min_lower[i] if i < len(temps_min_lower) and temps_min_lower[i] and str(temps_min_lower[i]).strip() != '' else None
                 }
             
+            # Date string -> pre-parsed date
+            parsed_dates = dict(zip(temp_dates, temp_series.times))
+            parsed_dates.update(zip(weather_dates, weather_series.times))
+            
             # Collect all dates (from both weather and temperature)
             all_dates = set(weather_dates + temp_dates)
             
             # Organize weekly forecast data
             weekly_forecast = []
             for date_str in sorted(all_dates)[:7]:  # Maximum 7 days, sorted by date
-                try:
-                    from datetime import datetime
-                    date_obj = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+                date_obj = parsed_dates.get(date_str)
+                if date_obj is not None:
                     formatted_date = date_obj.strftime('%m/%d')
                     weekday = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'][date_obj.weekday()]
-                except:
+                else:
                     formatted_date = f"Day{len(weekly_forecast)+1}"
                     weekday = ""
                 
@@ -590,9 +582,8 @@ class JMAWeatherAPIEN:
             # overview_forecast endpoint URL
             overview_url = f"https://www.jma.go.jp/bosai/forecast/data/overview_forecast/{self.area_code}.json"
             
-            response = requests.get(overview_url, timeout=10, verify=self.ssl_verify)
-            response.raise_for_status()
-            overview_data = response.json()
+            overview_data = self.http_cache.get(overview_url, parse_json, 'jma_overview',
+                                                timeout=10, verify=self.ssl_verify)
             
             # Try to get current temperature data
             if 'targetArea' in overview_data:
@@ -632,48 +623,24 @@ class JMAWeatherAPIEN:
         """Get current temperature from AMeDAS real-time data (fallback)"""
         try:
             from datetime import datetime, timedelta
-            import json
             
             # Get data from 1 hour ago (considering AMeDAS data update frequency)
-            now = datetime.now()
-            target_time = now - timedelta(hours=1)
-            date_str = target_time.strftime('%Y%m%d')
-            hour_str = target_time.strftime('%H')
-            
-            # AMeDAS real-time data URL
-            amedas_url = f"https://www.jma.go.jp/bosai/amedas/data/map/{date_str}{hour_str}0000.json"
-            
-            response = requests.get(amedas_url, timeout=10, verify=self.ssl_verify)
-            response.raise_for_status()
-            amedas_data = response.json()
-            
-            # Search for AMeDAS stations corresponding to area codes
-            # Yokohama: 46106, Chiba(Choshi): 45148, etc.
-            target_stations = {
-                '140000': ['46106', '46078'],  # Kanagawa: Yokohama, Odawara
-                '120000': ['45148', '45056']   # Chiba: Choshi, Kisarazu
-            }
+            target_time = datetime.now() - timedelta(hours=1)
             
-            stations_to_check = target_stations.get(self.area_code, [])
+            # The location's AMeDAS stations (including nearby substitutes)
+            station_ids = self._get_amedas_station_ids()
+            if not station_ids:
+                logger.warning(f"No AMeDAS station found for area code {self.area_code}")
+                return None
             
-            # Search data for relevant stations
-            for station_id in stations_to_check:
-                if station_id in amedas_data:
-                    station_data = amedas_data[station_id]
-                    if 'temp' in station_data and station_data['temp'][0] is not None:
-                        temp = float(station_data['temp'][0])
-                        logger.info(f"AMeDAS temperature acquired: {temp}°C (station: {station_id})")
-                        return temp
+            # Nationwide observations are fetched once per hour and shared by all locations (only the needed stations are extracted)
+            snapshot = get_map_snapshot(target_time, station_ids, verify=self.ssl_verify)
             
-            # Try major stations in Tokyo metropolitan area as fallback
-            fallback_stations = ['44132', '44136', '46106', '45148']  # Tokyo, Nerima, Yokohama, Choshi
-            for station_id in fallback_stations:
-                if station_id in amedas_data:
-                    station_data = amedas_data[station_id]
-                    if 'temp' in station_data and station_data['temp'][0] is not None:
-                        temp = float(station_data['temp'][0])
-                        logger.info(f"AMeDAS temperature acquired (fallback): {temp}°C (station: {station_id})")
-                        return temp
+            for station_id in station_ids:
+                temp = snapshot.get(station_id, 'temp')
+                if temp is not None:
+                    logger.info(f"AMeDAS temperature acquired: {temp}°C (station: {station_id})")
+                    return temp
             
             logger.warning("Could not acquire temperature from AMeDAS real-time data")
             return None
@@ -682,6 +649,25 @@ class JMAWeatherAPIEN:
             logger.error(f"AMeDAS real-time data acquisition error: {e}")
             return None
     
+    def _get_amedas_station_ids(self):
+        """Get AMeDAS station ids used for temperature, in priority order (selected from the station table)"""
+        if self._amedas_station_ids is None:
+            if self._amedas_station_retry_at is not None and datetime.now() < self._amedas_station_retry_at:
+                return []
+            station_index = get_station_index(verify=self.ssl_verify)
+            if station_index is None:
+                # While the station table is unavailable, do not reload it on every call
+                self._amedas_station_retry_at = datetime.now() + timedelta(seconds=STATION_TABLE_RETRY_INTERVAL)
+                return []
+            
+            # Prefer the WBGT location code (shared with the AMeDAS station id), otherwise match the area's representative name
+            station_id = self.location.get('wbgt_location_code')
+            area_names = {code: name for name, code in self.area_codes.items()}
+            self._amedas_station_ids = station_index.select_stations(
+                station_id=station_id, name=area_names.get(self.area_code))
+            logger.info(f"Selected AMeDAS stations: {self._amedas_station_ids} (area code: {self.area_code})")
+        return self._amedas_station_ids
+    
     def calculate_wbgt(self, temp, humidity):
         """Calculate WBGT index"""
         # Calculate wet bulb temperature
@@ -746,35 +732,25 @@ class JMAWeatherAPIEN:
     def _get_weather_from_csv(self):
         """Get weather data from CSV file (fallback when API access fails)"""
         try:
-            # Build JSON file path
-            script_dir = os.path.dirname(os.path.dirname(__file__))
-            json_file = os.path.join(script_dir, 'data', 'csv', f'jma_forecast_{self.area_code}.json')
+            file_name = f'jma_forecast_{self.area_code}.json'
             
-            if not os.path.exists(json_file):
-                logger.warning(f"JMA JSON file not found: {json_file}")
+            # Only use a file updated within the last 24 hours
+            forecast_data = self.fallback_store.load_json(file_name, max_age_hours=24)
+            if forecast_data is None:
                 return None
             
-            # Check file modification time (whether within 24 hours)
-            file_mtime = os.path.getmtime(json_file)
-            current_time = datetime.now().timestamp()
-            if current_time - file_mtime > 24 * 3600:  # 24 hours
-                logger.warning(f"JMA JSON file is too old ({(current_time - file_mtime) / 3600:.1f} hours ago)")
-                return None
-            
-            # Read JSON file
-            with open(json_file, 'r', encoding='utf-8') as f:
-                forecast_data = json.load(f)
-            
-            logger.info(f"Successfully read data from JSON file: {json_file}")
+            logger.info(f"Successfully read data from JSON file: {self.fallback_store.path(file_name)}")
             
+            # Walk the forecast JSON once to build the forecast document
+            document = self._get_forecast_document(forecast_data)
             # Process including weekly forecast data
-            weekly_data = self._parse_weekly_forecast(forecast_data)
-            weather_data = self._parse_weather_data(forecast_data)
+            weekly_data = self._parse_weekly_forecast(document)
+            weather_data = self._parse_weather_data(document)
             
             if weather_data:
                 if weekly_data:
                     # Supplement weekly forecast with daily forecast data
-                    weekly_data = self._supplement_weekly_with_daily_forecast(forecast_data, weekly_data)
+                    weekly_data = self._supplement_weekly_with_daily_forecast(document, weekly_data)
                     weather_data['weekly_forecast'] = weekly_data
                 return weather_data
             
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Area tables and single-pass document model for JMA forecast JSON
+気象庁予報JSONの地域テーブルと、1回の走査で作成する予報ドキュメント
+"""
+
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# 府県予報区の代表地点名 -> 地域コード（予報JSONの気温地点名と共通）
+AREA_CODES = {
+    '札幌': '016000',
+    '青森': '020000',
+    '盛岡': '030000',
+    '仙台': '040000',
+    '秋田': '050000',
+    '山形': '060000',
+    '福島': '070000',
+    '水戸': '080000',
+    '宇都宮': '090000',
+    '前橋': '100000',
+    'さいたま': '110000',
+    '千葉': '120000',
+    '東京': '130000',
+    '横浜': '140000',
+    '新潟': '150000',
+    '富山': '160000',
+    '金沢': '170000',
+    '福井': '180000',
+    '甲府': '190000',
+    '長野': '200000',
+    '岐阜': '210000',
+    '静岡': '220000',
+    '名古屋': '230000',
+    '津': '240000',
+    '大津': '250000',
+    '京都': '260000',
+    '大阪': '270000',
+    '神戸': '280000',
+    '奈良': '290000',
+    '和歌山': '300000',
+    '鳥取': '310000',
+    '松江': '320000',
+    '岡山': '330000',
+    '広島': '340000',
+    '山口': '350000',
+    '徳島': '360000',
+    '高松': '370000',
+    '松山': '380000',
+    '高知': '390000',
+    '福岡': '400000',
+    '佐賀': '410000',
+    '長崎': '420000',
+    '熊本': '430000',
+    '大分': '440000',
+    '宮崎': '450000',
+    '鹿児島': '460100',
+    '那覇': '471000'
+}
+
+# 代表地点より優先する地点名（地域コード -> 地点名、優先度順）
+PREFERRED_AREA_NAMES = {
+    '120000': ('銚子',),  # 千葉県（銚子を優先）
+}
+
+
+def _build_area_candidate_names():
+    """地域コード -> 照合する地点名（優先度順）の表を作成"""
+    candidates = {}
+    for name, code in AREA_CODES.items():
+        candidates.setdefault(code, []).append(name)
+    for code, names in PREFERRED_AREA_NAMES.items():
+        candidates[code] = list(names) + [name for name in candidates.get(code, []) if name not in names]
+    return {code: tuple(names) for code, names in candidates.items()}
+
+
+# 地域コード -> 照合する地点名（インポート時に1回だけ作成）
+AREA_CANDIDATE_NAMES = _build_area_candidate_names()
+
+
+def parse_forecast_datetime(time_str):
+    """予報JSONの時刻（ISO 8601形式）を解析（解析できない場合はNone）"""
+    try:
+        return datetime.fromisoformat(time_str.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+
+
+class ForecastSeries:
+    """予報JSONの1つの時系列（timeDefines と地域別の値）"""
+
+    def __init__(self, time_series):
+        # time_defines: 時刻文字列のリスト（JSONのまま）
+        # times: 解析済みの時刻のリスト（解析できない時刻はNone）
+        # areas: 地域名 -> 地域データ（ファイル順、同名は最初のもの）
+        self.time_defines = time_series.get('timeDefines', [])
+        self.times = [parse_forecast_datetime(time_str) for time_str in self.time_defines]
+        self.areas = {}
+        for area in time_series.get('areas', []):
+            self.areas.setdefault(area['area']['name'], area)
+        first_area = next(iter(self.areas.values()), {})
+        # 最初の地域が持つ要素（weatherCodes, pops, temps, tempsMaxなど）
+        self.elements = frozenset(first_area)
+        # 地域コード -> (地域データ, 照合方法)
+        self._selected = {}
+
+    def select(self, area_code):
+        """
+        地域コードに対応する地域データを選択（結果は保持し、2回目以降は辞書の参照のみ）
+
+        Returns:
+            tuple: (地域データ, 照合方法 'exact' / 'partial' / 'default')（地域がない場合は (None, None)）
+        """
+        if area_code not in self._selected:
+            self._selected[area_code] = self._select(area_code)
+        return self._selected[area_code]
+
+    def _select(self, area_code):
+        candidates = AREA_CANDIDATE_NAMES.get(area_code, ())
+
+        # 完全一致を優先
+        for candidate in candidates:
+            if candidate in self.areas:
+                return self.areas[candidate], 'exact'
+
+        # 完全一致がない場合は部分一致
+        for candidate in candidates:
+            for area_name, area in self.areas.items():
+                if candidate in area_name or area_name in candidate:
+                    return area, 'partial'
+
+        # 見つからない場合は最初の地域
+        for area in self.areas.values():
+            return area, 'default'
+        return None, None
+
+
+class ForecastDocument:
+    """
+    気象庁予報JSON（forecast/{地域コード}.json）を1回だけ走査した予報ドキュメント
+
+    今日・明日予報と週間予報の時系列を、時刻を解析済みの ForecastSeries として保持する。
+    天気・降水確率・気温の各時系列は要素の有無で1度だけ振り分けるため、
+    今日・明日予報、週間予報、補完処理はいずれもこのドキュメントを参照するだけで済む。
+    """
+
+    def __init__(self, forecast_data):
+        self.forecast_data = forecast_data
+        head = forecast_data[0]
+        self.publishing_office = head['publishingOffice']
+        self.report_datetime = head['reportDatetime']
+
+        # daily: 今日・明日予報（Series 0）、weekly: 週間予報（Series 1）
+        self.daily = [ForecastSeries(ts) for ts in head.get('timeSeries', [])]
+        self.weekly = ([ForecastSeries(ts) for ts in forecast_data[1].get('timeSeries', [])]
+                       if len(forecast_data) >= 2 else [])
+
+        self.daily_weather = self.daily[0] if self.daily else None
+        self.daily_pops = self._find(self.daily, 'pops')
+        self.daily_temps = self._find(self.daily, 'temps')
+        # 週間予報は天気（timeSeries[0]）と気温（timeSeries[1]）が揃っている場合のみ使用
+        self.weekly_weather = self.weekly[0] if len(self.weekly) >= 2 else None
+        self.weekly_temps = self.weekly[1] if len(self.weekly) >= 2 else None
+
+    @staticmethod
+    def _find(series_list, element):
+        """最初の地域が要素を持つ最初の時系列を取得"""
+        for series in series_list:
+            if element in series.elements:
+                return series
+        return None
+
+    def describes(self, forecast_data):
+        """指定した予報JSONから作成したドキュメントかどうか"""
+        return self.forecast_data is forecast_data
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pluggable JSON decoder: orjson or ujson when installed, otherwise the standard library
+JSONデコーダーの切り替え（orjson / ujson がインストールされていれば使用し、なければ標準ライブラリ）
+"""
+
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 優先順（先にインポートできたものを使用）
+BACKEND_PREFERENCE = ('orjson', 'ujson', 'json')
+
+
+def _load_backend(name):
+    """デコーダーを読み込み (名前, loads関数) を返す（インストールされていない場合はNone）"""
+    if name == 'orjson':
+        try:
+            import orjson
+        except ImportError:
+            return None
+        # orjson は bytes / str をそのまま受け取れる
+        return name, orjson.loads
+    if name == 'ujson':
+        try:
+            import ujson
+        except ImportError:
+            return None
+        return name, ujson.loads
+    if name == 'json':
+        return name, json.loads
+    raise ValueError(f"未対応のJSONデコーダーです: {name}")
+
+
+def available_backends():
+    """インストールされているデコーダー名のリストを優先順で取得"""
+    return [name for name in BACKEND_PREFERENCE if _load_backend(name) is not None]
+
+
+def get_decoder(name):
+    """
+    指定したデコーダーの loads 関数を取得
+
+    Raises:
+        ValueError: 未対応またはインストールされていない場合
+    """
+    backend = _load_backend(name)
+    if backend is None:
+        raise ValueError(f"JSONデコーダーがインストールされていません: {name}")
+    return backend[1]
+
+
+def _select_backend():
+    for name in BACKEND_PREFERENCE:
+        backend = _load_backend(name)
+        if backend is not None:
+            return backend
+    return 'json', json.loads
+
+
+# インポート時に1回だけ選択
+BACKEND, _loads = _select_backend()
+logger.debug(f"JSONデコーダー: {BACKEND}")
+
+
+def loads(data):
+    """
+    JSONを解析（bytes / str のどちらも可）
+
+    高速なデコーダーが解析できない入力（標準ライブラリのみ受け付けるNaN等）は
+    標準ライブラリで解析し直すため、結果は標準ライブラリと同じになる。
+    """
+    try:
+        return _loads(data)
+    except ValueError:
+        if _loads is json.loads:
+            raise
+        return json.loads(data)
+
+
+def loads_buffer(buffer):
+    """
+    バッファ（mmap等）のJSONを解析
+
+    orjson はバッファをそのまま解析するためファイル全体の文字列やbytesを作らない。
+    バッファを受け取れないデコーダーでは bytes に変換してから解析する。
+    """
+    with memoryview(buffer) as view:
+        if BACKEND == 'orjson':
+            try:
+                return _loads(view)
+            except ValueError:
+                pass
+        return loads(view.tobytes())
+
+
+def load(f):
+    """ファイルオブジェクトからJSONを解析"""
+    return loads(f.read())
@@ -7,11 +7,211 @@ WBGT キオスクアプリケーションのベースクラス
 
 import os
 import sys
+import math
 import time
 import signal
+import socket
 import logging
-from datetime import datetime
-from gui_components import PlatformUtils
+import selectors
+from datetime import datetime, timedelta
+from gui_components import PlatformUtils, TreeviewReconciler, WeatherDataProcessor
+from terminal_frame import FrameRenderer
+
+
+class RefreshPolicy:
+    """
+    データ源の公開スケジュールに基づく再取得方針
+
+    公開時刻（hours）または公開間隔（interval_minutes）から直近の公開時刻を求め、
+    公開から delay_minutes 経過後に再取得の対象とする。
+    """
+    
+    def __init__(self, hours=None, interval_minutes=None, delay_minutes=0):
+        self.hours = sorted(hours) if hours else None
+        self.interval_minutes = interval_minutes
+        self.delay = timedelta(minutes=delay_minutes)
+    
+    def last_publication(self, now):
+        """now時点で取得可能になっている直近の公開時刻（公開遅延込み）"""
+        base = now - self.delay
+        midnight = base.replace(hour=0, minute=0, second=0, microsecond=0)
+        if self.hours:
+            published = [midnight.replace(hour=hour) for hour in self.hours if midnight.replace(hour=hour) <= base]
+            if published:
+                return published[-1] + self.delay
+            return midnight - timedelta(days=1) + timedelta(hours=self.hours[-1]) + self.delay
+        
+        interval = timedelta(minutes=self.interval_minutes)
+        return midnight + interval * ((base - midnight) // interval) + self.delay
+    
+    def next_publication(self, now):
+        """now以降に取得可能になる次の公開時刻（公開遅延込み）"""
+        if self.hours:
+            last = self.last_publication(now) - self.delay
+            for hour in self.hours:
+                candidate = last.replace(hour=hour, minute=0)
+                if candidate > last:
+                    return candidate + self.delay
+            return last.replace(hour=self.hours[0], minute=0) + timedelta(days=1) + self.delay
+        return self.last_publication(now) + timedelta(minutes=self.interval_minutes)
+
+
+# データ源ごとの公開スケジュール（日本時間）
+# AMeDASは10分ごとに更新されるが、キオスクは毎正時の全国実況ファイルを使用するため1時間ごと
+DEFAULT_REFRESH_POLICIES = {
+    'alert': RefreshPolicy(hours=(5, 10, 14, 17), delay_minutes=10),
+    'jma_forecast': RefreshPolicy(hours=(5, 11, 17), delay_minutes=10),
+    'env_wbgt': RefreshPolicy(interval_minutes=60, delay_minutes=15),
+    'amedas': RefreshPolicy(interval_minutes=60, delay_minutes=10),
+}
+
+# 取得タスクと、その結果が依存するデータ源の対応
+TASK_SOURCES = {
+    'weather_data': ('jma_forecast', 'amedas'),
+    'alert_data': ('alert',),
+    'env_wbgt_current': ('env_wbgt',),
+    'env_wbgt_forecast': ('env_wbgt',),
+    'env_wbgt_timeseries': ('env_wbgt',),
+}
+
+# 取得に失敗したデータ源を再試行するまでの時間（分）
+DEFAULT_RETRY_MINUTES = 10
+
+
+class FetchScheduler:
+    """データ源ごとに公開スケジュールを管理し、更新が見込まれるものだけを再取得させるクラス"""
+    
+    def __init__(self, policies=None, retry_minutes=DEFAULT_RETRY_MINUTES):
+        self.policies = dict(policies or DEFAULT_REFRESH_POLICIES)
+        self.retry = timedelta(minutes=retry_minutes)
+        self._fetched_at = {}
+        self._retry_at = {}
+    
+    def is_due(self, source, now=None):
+        """データ源の再取得が必要かどうか"""
+        now = now or datetime.now()
+        if source in self._retry_at:
+            return now >= self._retry_at[source]
+        fetched_at = self._fetched_at.get(source)
+        return fetched_at is None or fetched_at < self.policies[source].last_publication(now)
+    
+    def due_sources(self, now=None):
+        """再取得が必要なデータ源の集合"""
+        now = now or datetime.now()
+        return {source for source in self.policies if self.is_due(source, now)}
+    
+    def mark_fetched(self, source, success=True, now=None):
+        """取得結果を記録（失敗した場合は一定時間後に再試行）"""
+        now = now or datetime.now()
+        if success:
+            self._fetched_at[source] = now
+            self._retry_at.pop(source, None)
+        else:
+            self._retry_at[source] = now + self.retry
+    
+    def next_due(self, now=None):
+        """次にいずれかのデータ源が再取得対象になる時刻"""
+        now = now or datetime.now()
+        times = []
+        for source, policy in self.policies.items():
+            if self.is_due(source, now):
+                return now
+            times.append(self._retry_at.get(source) or policy.next_publication(now))
+        return min(times)
+    
+    def seconds_until_next_due(self, max_seconds=None, now=None):
+        """次の再取得までの秒数（最短1秒、max_secondsで上限を設定）"""
+        now = now or datetime.now()
+        # 切り上げて、公開時刻より前に起きないようにする
+        seconds = max(1, math.ceil((self.next_due(now) - now).total_seconds()))
+        if max_seconds is not None:
+            seconds = min(seconds, int(max_seconds))
+        return seconds
+
+
+class RefreshWaiter:
+    """
+    次の再取得時刻、またはシグナルの受信まで眠る待機処理
+
+    signal.set_wakeup_fd でシグナルの受信をソケットに書き込ませて selectors で待機するため、
+    1秒ごとのポーリングと異なり、待機中にプロセスが起きるのは再取得時刻とシグナルの受信時だけになる。
+    SIGUSR1 を受信した場合は待機を終えて直ちに再取得する（kill -USR1 <pid>）。
+    起床回数を記録し、1時間あたりの回数を指標として提供する。
+    """
+    
+    # 待機を終えて再取得するシグナル（存在するもののみ使用）
+    REFRESH_SIGNALS = ('SIGUSR1',)
+    
+    def __init__(self):
+        self._reader, self._writer = socket.socketpair()
+        self._reader.setblocking(False)
+        self._writer.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._reader, selectors.EVENT_READ)
+        self._installed = False
+        self._started = time.monotonic()
+        self.wakeups = 0
+        self.signal_wakeups = 0
+    
+    def install(self):
+        """シグナル受信時に待機を終えるよう設定（メインスレッドから呼び出す）"""
+        try:
+            signal.set_wakeup_fd(self._writer.fileno(), warn_on_full_buffer=False)
+        except ValueError:
+            # メインスレッド以外では設定できないため、wake() と待機時間の経過でのみ起きる
+            return False
+        for name in self.REFRESH_SIGNALS:
+            if hasattr(signal, name):
+                signal.signal(getattr(signal, name), self._on_refresh_signal)
+        self._installed = True
+        return True
+    
+    def _on_refresh_signal(self, signum, frame):
+        # 待機の解除は set_wakeup_fd の書き込みで行われるため、既定の動作（終了）を止めるだけ
+        pass
+    
+    def wake(self):
+        """待機を終えさせる（他のスレッドから呼び出し可）"""
+        try:
+            self._writer.send(b'\0')
+        except (BlockingIOError, OSError):
+            pass
+    
+    def wait(self, seconds):
+        """
+        指定秒数が経過するか、シグナルを受信するまで待機
+        
+        Returns:
+            bool: シグナルまたは wake() で起きた場合はTrue
+        """
+        events = self._selector.select(seconds)
+        self.wakeups += 1
+        if not events:
+            return False
+        try:
+            while self._reader.recv(64):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+        self.signal_wakeups += 1
+        return True
+    
+    def wakeups_per_hour(self):
+        """開始からの1時間あたりの起床回数"""
+        elapsed = time.monotonic() - self._started
+        return self.wakeups * 3600 / elapsed if elapsed > 0 else 0.0
+    
+    def close(self):
+        """シグナルの設定を戻し、ソケットを閉じる"""
+        if self._installed:
+            try:
+                signal.set_wakeup_fd(-1)
+            except ValueError:
+                pass
+            self._installed = False
+        self._selector.close()
+        self._reader.close()
+        self._writer.close()
 
 
 class WBGTKioskBase:
@@ -25,6 +225,11 @@ class WBGTKioskBase:
         self.running = True
         self.locations = config.LOCATIONS
         self.locations_data = []
+        self.fetch_scheduler = FetchScheduler()
+        # ターミナル表示のフレームレンダラー（サブクラスの display_all で使用）
+        self.frame_renderer = FrameRenderer()
+        # 次の再取得時刻またはシグナルまでの待機
+        self.refresh_waiter = RefreshWaiter()
         
         # ログ設定
         self.setup_logging()
@@ -119,6 +324,7 @@ class WBGTKioskBase:
             print(self.colored_text("⚠️ 初期データ取得に問題がありますが、継続します", 'yellow'))
         
         time.sleep(1)
+        self.refresh_waiter.install()
         
         try:
             while self.running:
@@ -126,16 +332,17 @@ class WBGTKioskBase:
                 self.update_data()
                 self.display_all()
                 
-                # 更新間隔まで待機
-                interval_seconds = self.config.UPDATE_INTERVAL_MINUTES * 60
-                for i in range(interval_seconds):
-                    if not self.running:
-                        break
-                    time.sleep(1)
+                # 次のデータ公開まで眠る（表示は更新間隔ごとに更新、SIGUSR1で即時更新）
+                interval_seconds = self.fetch_scheduler.seconds_until_next_due(self.config.UPDATE_INTERVAL_MINUTES * 60)
+                if self.refresh_waiter.wait(interval_seconds):
+                    self.logger.info("更新要求のシグナルを受信")
+                self.logger.info(f"起床回数: {self.refresh_waiter.wakeups_per_hour():.1f}回/時")
                     
         except KeyboardInterrupt:
             pass
         finally:
+            self.refresh_waiter.close()
+            self.frame_renderer.close()
             self.clear_screen()
             print(self.colored_text("WBGTキオスクを終了しました", 'cyan'))
             self.logger.info("ターミナルキオスクアプリケーション終了")
@@ -162,36 +369,13 @@ class WBGTKioskBase:
 class GUIUpdateMixin:
     """GUI更新に関する共通処理"""
     
-    def update_wbgt_forecast_table(self, forecast_table, location_data, get_wbgt_color_func):
-        """WBGT予測値表を更新"""
-        # 既存の行をクリア
-        for item in forecast_table.get_children():
-            forecast_table.delete(item)
-        
-        # 現在値を追加
-        current_data = location_data.get('env_wbgt_current')
-        if current_data:
-            level, _, _ = self.env_wbgt_api.get_wbgt_level_info(current_data['wbgt_value'])
-            color = get_wbgt_color_func(level)
-            item = forecast_table.insert('', 'end', 
-                values=('現在' if hasattr(self, 'language') and self.language == 'ja' else 'Current', 
-                       f"{current_data.get('wbgt_value', 0):.1f}°C", level))
-            forecast_table.set(item, 'level', level)
-            # 行に色を適用
-            forecast_table.tag_configure(f'level_{level}', background=color, foreground='black')
-            forecast_table.item(item, tags=(f'level_{level}',))
+    def update_wbgt_forecast_table(self, forecast_table, location_data, get_wbgt_color_func=None):
+        """
+        WBGT予測値表を更新（時間帯ごとに前回の表示と照合し、変更のあったセルのみ更新）
         
-        # 時系列予測値を追加
-        timeseries_data = location_data.get('env_wbgt_timeseries')
-        if timeseries_data and 'timeseries' in timeseries_data:
-            timeseries = timeseries_data['timeseries']
-            # 最初の3つの予測値を表示
-            for data_point in timeseries[:3]:
-                level, _, _ = self.env_wbgt_api.get_wbgt_level_info(data_point['wbgt_value'])
-                time_str = data_point['datetime_str']
-                value_str = f"{data_point.get('wbgt_value', 0):.1f}°C"
-                color = get_wbgt_color_func(level)
-                item = forecast_table.insert('', 'end', values=(time_str, value_str, level))
-                # 行に色を適用
-                forecast_table.tag_configure(f'level_{level}', background=color, foreground='black')
-                forecast_table.item(item, tags=(f'level_{level}',))
\ No newline at end of file
+        行の色は TreeviewManager.setup_default_tags で設定済みの警戒レベルのタグで表示するため、
+        get_wbgt_color_func は使用しない（互換性のために残している）
+        """
+        language = 'ja' if getattr(self, 'language', None) == 'ja' else 'en'
+        rows = WeatherDataProcessor.build_wbgt_forecast_rows(location_data, self.env_wbgt_api, language)
+        return TreeviewReconciler.attach(forecast_table).render(rows)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pre-parsed binary snapshots (.snap sidecars) of the data/csv fallback files
+data/csv のフォールバック用ファイルに対応する解析済みバイナリスナップショット（.snap）
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# ファイル形式: マジック + ヘッダー長(uint32) + JSONヘッダー + 境界を揃えた配列データ
+SNAPSHOT_MAGIC = b'WBGTSNP1'
+SNAPSHOT_SUFFIX = '.snap'
+# 配列データの先頭位置の境界（バイト）
+SNAPSHOT_ALIGNMENT = 64
+
+_HEADER_LENGTH = struct.Struct('<I')
+
+
+def snapshot_path(source_path):
+    """元ファイルに対応するスナップショットのパスを取得"""
+    return source_path + SNAPSHOT_SUFFIX
+
+
+def _align(offset):
+    return -(-offset // SNAPSHOT_ALIGNMENT) * SNAPSHOT_ALIGNMENT
+
+
+def write_snapshot(source_path, document):
+    """
+    解析済みドキュメントをスナップショットとして元ファイルの隣に保存
+
+    Args:
+        source_path (str): 元ファイルのパス（更新時刻とサイズをスナップショットに記録）
+        document: SNAPSHOT_KIND と to_snapshot() を持つ解析済みドキュメント
+
+    Returns:
+        str: 保存したスナップショットのパス
+    """
+    stat = os.stat(source_path)
+    header, arrays = document.to_snapshot()
+
+    layout = []
+    blobs = []
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        offset = _align(offset)
+        layout.append({'name': name, 'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset})
+        blobs.append((offset, array))
+        offset += array.nbytes
+
+    meta = json.dumps({
+        'kind': document.SNAPSHOT_KIND,
+        'source_mtime_ns': stat.st_mtime_ns,
+        'source_size': stat.st_size,
+        'header': header,
+        'arrays': layout,
+    }, ensure_ascii=False).encode('utf-8')
+    data_start = _align(len(SNAPSHOT_MAGIC) + _HEADER_LENGTH.size + len(meta))
+
+    path = snapshot_path(source_path)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(_HEADER_LENGTH.pack(len(meta)))
+        f.write(meta)
+        for array_offset, array in blobs:
+            f.seek(data_start + array_offset)
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+    # 読み込み中のプロセスが途中までのファイルを見ないよう置き換えで更新
+    os.replace(temp_path, path)
+    return path
+
+
+def load_snapshot(source_path, document_class):
+    """
+    元ファイルと一致するスナップショットをメモリマップで読み込む
+
+    配列はマップしたファイル上をそのまま参照するため（np.frombuffer）、
+    テキストの解析もコピーも行わない。
+
+    Args:
+        source_path (str): 元ファイルのパス
+        document_class: SNAPSHOT_KIND と from_snapshot() を持つドキュメントのクラス
+
+    Returns:
+        document_classのインスタンス（スナップショットがない・古い・壊れている場合はNone）
+    """
+    path = snapshot_path(source_path)
+    try:
+        stat = os.stat(source_path)
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        if buffer[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            raise ValueError("マジックが一致しません")
+        position = len(SNAPSHOT_MAGIC)
+        (meta_length,) = _HEADER_LENGTH.unpack_from(buffer, position)
+        position += _HEADER_LENGTH.size
+        meta = json.loads(buffer[position:position + meta_length].decode('utf-8'))
+
+        if (meta['kind'] != document_class.SNAPSHOT_KIND
+                or meta['source_mtime_ns'] != stat.st_mtime_ns
+                or meta['source_size'] != stat.st_size):
+            logger.debug(f"スナップショットが元ファイルと一致しないため使用しません: {path}")
+            return None
+
+        data_start = _align(position + meta_length)
+        arrays = {}
+        for entry in meta['arrays']:
+            dtype = np.dtype(entry['dtype'])
+            shape = tuple(entry['shape'])
+            count = int(np.prod(shape, dtype=np.int64))
+            arrays[entry['name']] = np.frombuffer(buffer, dtype=dtype, count=count,
+                                                  offset=data_start + entry['offset']).reshape(shape)
+        return document_class.from_snapshot(meta['header'], arrays)
+    except (ValueError, KeyError, TypeError, struct.error) as e:
+        logger.warning(f"スナップショットの読み込みに失敗: {path} - {e}")
+        return None
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Single-write, line-diffing frame renderer for the terminal kiosk
+ターミナル表示の画面全体を1回の書き込みで再描画するフレームレンダラー（前回との差分の行のみ）
+"""
+
+import atexit
+import contextlib
+import io
+import logging
+import os
+import re
+import shutil
+import sys
+import time
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+# ANSIエスケープシーケンス
+CURSOR_HOME = '\033[H'
+CLEAR_SCREEN = '\033[2J'
+CLEAR_TO_LINE_END = '\033[K'
+CLEAR_BELOW = '\033[J'
+RESET_SCROLL_REGION = '\033[r'
+RESET_ATTRIBUTES = '\033[0m'
+
+# 区切り線などの最大幅（出力先が端末でない場合もこの幅）
+MAX_FRAME_WIDTH = 120
+# 行の差分描画に必要な端末の最小の大きさ（これより小さい端末は毎回全体を書き直す）
+MIN_TERMINAL_LINES = 4
+MIN_TERMINAL_COLUMNS = 20
+# 画面の高さに収まらない行を省略したときに最終行に表示する文言
+DEFAULT_OVERFLOW_NOTICE = '…（以下{count}行は画面に収まらないため省略）'
+
+# 表示幅の計算で除く色指定などのエスケープシーケンス
+_ANSI_ESCAPE = re.compile(r'\033\[[0-9;?]*[A-Za-z]')
+_ANSI_SPLIT = re.compile(r'(\033\[[0-9;?]*[A-Za-z])')
+
+
+def _move_to(row):
+    """カーソルを指定行（1始まり）の先頭に移動するシーケンス"""
+    return f'\033[{row};1H'
+
+
+def _set_scroll_region(top, bottom):
+    """スクロール領域を指定行（1始まり、両端を含む）に限定するシーケンス"""
+    return f'\033[{top};{bottom}r'
+
+
+def _char_width(char):
+    """文字の表示幅（全角文字は2桁）"""
+    return 2 if unicodedata.east_asian_width(char) in ('W', 'F') else 1
+
+
+def _display_width(line):
+    """行の表示幅（全角文字は2桁、エスケープシーケンスは除く）"""
+    return sum(_char_width(char) for char in _ANSI_ESCAPE.sub('', line))
+
+
+def _wrap(line, width):
+    """
+    表示幅が width を超える行を複数の行に折り返す
+
+    端末の自動折り返しに任せると行の位置が定まらないため、フレームの行は自前で折り返す。
+    色指定は折り返した行の末尾で解除し、次の行の先頭で指定し直す。
+    """
+    if _display_width(line) <= width:
+        return [line]
+    rows = []
+    current = []
+    used = 0
+    active = ''
+    for part in _ANSI_SPLIT.split(line):
+        if _ANSI_ESCAPE.fullmatch(part):
+            current.append(part)
+            if part.endswith('m'):
+                active = '' if part in (RESET_ATTRIBUTES, '\033[m') else active + part
+            continue
+        for char in part:
+            char_width = _char_width(char)
+            if used + char_width > width and used > 0:
+                rows.append(''.join(current) + (RESET_ATTRIBUTES if active else ''))
+                current = [active]
+                used = 0
+            current.append(char)
+            used += char_width
+    rows.append(''.join(current))
+    return rows
+
+
+def _enable_ansi(stream):
+    """ストリームがANSIのカーソル移動を解釈できるかを確認（Windowsは仮想端末処理を有効化）"""
+    try:
+        if not stream.isatty():
+            return False
+    except (AttributeError, ValueError):
+        return False
+    if os.name != 'nt':
+        return True
+    try:
+        import ctypes
+        import msvcrt
+        kernel32 = ctypes.windll.kernel32
+        handle = msvcrt.get_osfhandle(stream.fileno())
+        mode = ctypes.c_uint32()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        # ENABLE_VIRTUAL_TERMINAL_PROCESSING（Windows 10以降のコンソール）
+        return bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004))
+    except (ImportError, AttributeError, OSError, ValueError):
+        return False
+
+
+class FrameRenderer:
+    """
+    画面全体を1つのバッファに組み立て、1回の書き込みで再描画するクラス
+
+    フレームは画面の先頭行から描画し、フレームより下の行をスクロール領域にする。
+    フレーム間のメッセージやログはスクロール領域の中だけで流れるため、フレームの行の位置は変わらず、
+    次のフレームでは変更のあった行だけを書き込む（スクロール領域は次のフレームの描画時に消去する）。
+    端末の幅を超える行は自前で折り返し、画面の高さ（スクロール領域の1行を除く）を超える行は省略して
+    最終行に省略した行数を表示するため、80桁・24行の端末でも差分描画になる。
+    差分描画にならないのは次の場合のみ:
+      - 端末が MIN_TERMINAL_LINES 行・MIN_TERMINAL_COLUMNS 桁より小さい場合
+        （カーソルを先頭に戻して毎回全体を書き直す）
+      - ANSIのカーソル移動が使えない出力先（ファイル・パイプ・従来のコンソール）
+        （フレームを折り返さずにそのまま追記する）
+    フレームの組み立てから書き込みまでの時間を計測する。
+    """
+
+    def __init__(self, stream=None, overflow_notice=DEFAULT_OVERFLOW_NOTICE):
+        """
+        Args:
+            stream: 出力先（省略時は sys.stdout）
+            overflow_notice (str): 画面に収まらない行を省略したときの文言（{count} に省略した行数）
+        """
+        self.stream = stream if stream is not None else sys.stdout
+        self.use_ansi = _enable_ansi(self.stream)
+        self.overflow_notice = overflow_notice
+        self._previous = None
+        self._size = None
+        self._region_set = False
+        self._atexit_registered = False
+        self.frame_count = 0
+        self.last_frame_ms = None
+        self.max_frame_ms = 0.0
+        self.last_changed_lines = 0
+        self.last_omitted_lines = 0
+
+    @property
+    def width(self):
+        """区切り線などに使うフレームの幅（端末の幅から最終桁を除き、MAX_FRAME_WIDTH 以下）"""
+        if not self.use_ansi:
+            return MAX_FRAME_WIDTH
+        return max(1, min(MAX_FRAME_WIDTH, shutil.get_terminal_size().columns - 1))
+
+    def invalidate(self):
+        """次のフレームは画面全体を書き直す"""
+        self._previous = None
+
+    @contextlib.contextmanager
+    def frame(self):
+        """
+        ブロック内の print 出力を1つのフレームとして組み立て、終了時に描画する
+
+        Example:
+            with renderer.frame():
+                kiosk.display_header()
+        """
+        start = time.perf_counter()
+        buffer = io.StringIO()
+        with contextlib.redirect_stdout(buffer):
+            yield buffer
+        self.render(buffer.getvalue(), start)
+
+    def render(self, text, start=None):
+        """
+        フレームを描画
+
+        Args:
+            text (str): 画面全体の内容
+            start (float): 計測の開始時刻（perf_counter、省略時は描画の開始時）
+        """
+        start = start if start is not None else time.perf_counter()
+        lines = text.rstrip('\n').split('\n')
+
+        if self.use_ansi:
+            output, changed, total = self._compose(lines)
+        else:
+            # カーソル移動が使えない場合はフレームをそのまま追記する
+            output, changed, total = text, len(lines), len(lines)
+
+        self.stream.write(output)
+        self.stream.flush()
+
+        self.last_frame_ms = (time.perf_counter() - start) * 1000
+        self.max_frame_ms = max(self.max_frame_ms, self.last_frame_ms)
+        self.last_changed_lines = changed
+        self.frame_count += 1
+        logger.debug(f"フレーム描画: {self.last_frame_ms:.1f} ms（{changed}/{total}行を更新）")
+
+    def close(self):
+        """スクロール領域を画面全体に戻し、カーソルを最終行に置く（終了時に呼ぶ）"""
+        if not self._region_set:
+            return
+        self._region_set = False
+        self._previous = None
+        rows = shutil.get_terminal_size().lines
+        try:
+            self.stream.write(RESET_SCROLL_REGION + _move_to(rows) + '\n')
+            self.stream.flush()
+        except (OSError, ValueError):
+            pass
+
+    def _fit(self, lines, size):
+        """フレームの行を端末の幅で折り返し、画面の高さを超える行を省略"""
+        rows = [row for line in lines for row in _wrap(line, size.columns - 1)]
+        # フレームの下に1行以上のスクロール領域を残す
+        limit = size.lines - 2
+        omitted = len(rows) - limit
+        if omitted > 0:
+            # 省略の表示に使う最終行の分も省略する
+            omitted += 1
+            notice = _wrap(self.overflow_notice.format(count=omitted), size.columns - 1)[0]
+            rows = rows[:limit - 1] + [notice]
+        omitted = max(omitted, 0)
+        if omitted and not self.last_omitted_lines:
+            logger.warning(f"フレームが端末の高さ（{size.lines}行）に収まらないため{omitted}行を省略します")
+        self.last_omitted_lines = omitted
+        return rows
+
+    def _compose(self, lines):
+        """書き込む文字列・更新した行数・フレームの行数を作成"""
+        size = shutil.get_terminal_size()
+        resized = size != self._size
+        self._size = size
+
+        if size.lines < MIN_TERMINAL_LINES or size.columns < MIN_TERMINAL_COLUMNS:
+            # フレームを収められないほど小さい端末では先頭から全体を書き直す
+            parts = [RESET_SCROLL_REGION, CURSOR_HOME]
+            if resized:
+                parts.append(CLEAR_SCREEN)
+            parts.extend(line + CLEAR_TO_LINE_END + '\n' for line in lines)
+            parts.append(CLEAR_BELOW)
+            self._previous = None
+            self._region_set = False
+            return ''.join(parts), len(lines), len(lines)
+
+        # 端末の大きさが変わった場合は画面全体を書き直す
+        previous = None if resized else self._previous
+        first = previous is None
+        rows = self._fit(lines, size)
+
+        parts = [CLEAR_SCREEN] if first else []
+        changed = 0
+        for row, line in enumerate(rows, 1):
+            if first or row > len(previous) or previous[row - 1] != line:
+                parts.append(_move_to(row) + line + CLEAR_TO_LINE_END)
+                changed += 1
+        # フレームより下をスクロール領域にし、前回の余分な行やフレーム間のメッセージを消去して
+        # カーソルをスクロール領域の先頭に置く
+        below = len(rows) + 1
+        parts.append(_set_scroll_region(below, size.lines) + _move_to(below) + CLEAR_BELOW)
+        self._previous = rows
+        if not self._region_set:
+            self._region_set = True
+            if not self._atexit_registered:
+                # 例外などで終了した場合もスクロール領域を元に戻す
+                atexit.register(self.close)
+                self._atexit_registered = True
+        return ''.join(parts), changed, len(rows)
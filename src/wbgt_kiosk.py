@@ -50,6 +50,7 @@ try:
             self.FONT_SIZE_SMALL = config_dict.get('font_sizes', {}).get('small', 14)
             self.LOG_LEVEL = config_dict.get('logging', {}).get('level', 'INFO')
             self.LOG_FILE = config_dict.get('logging', {}).get('file', 'wbgt_kiosk.log')
+            self.FETCH_MAX_WORKERS = config_dict.get('fetch', {}).get('max_workers', 4)
             
             # 旧形式で最初の地点を使用（後方互換性）
             if self.LOCATIONS:
@@ -72,9 +73,13 @@ except Exception as e:
 from jma_api import JMAWeatherAPI
 from heatstroke_alert import HeatstrokeAlert
 from env_wbgt_api import EnvWBGTAPI
+from fetch_engine import FetchEngine, RefreshWorker
+from http_client import get_shared_cache
+from kiosk_base import FetchScheduler, RefreshWaiter, TASK_SOURCES
+from terminal_frame import FrameRenderer
 from gui_components import (
     PlatformUtils, ColorManager, WeatherIconManager, 
-    TreeviewManager, GUIComponentFactory, WeatherDataProcessor
+    TreeviewManager, TreeviewReconciler, GUIComponentFactory, WeatherDataProcessor, ClockTicker
 )
 
 class WBGTKiosk:
@@ -84,12 +89,21 @@ class WBGTKiosk:
         self.demo_mode = demo_mode
         self.gui_mode = gui_mode
         self.locations = config.LOCATIONS
-        self.weather_apis = [JMAWeatherAPI(area_code=loc['area_code']) for loc in self.locations]
-        self.heatstroke_alert = HeatstrokeAlert()
+        self.weather_apis = [JMAWeatherAPI(area_code=loc['area_code'], location=loc) for loc in self.locations]
         self.env_wbgt_api = EnvWBGTAPI()
+        self.heatstroke_alert = HeatstrokeAlert(env_wbgt_api=self.env_wbgt_api)
+        self.fetch_engine = FetchEngine(max_workers=config.FETCH_MAX_WORKERS)
+        self.fetch_scheduler = FetchScheduler()
+        self.fetch_results = {}
+        self.amedas_stations_watched = False
         self.locations_data = []
         self.running = True
         self.demo_count = 0
+        # ターミナル表示のフレームレンダラー（フレーム間の出力はフレームより下の行だけで流れる、
+        # フレームは端末の大きさに合わせて折り返し・省略する）
+        self.frame_renderer = FrameRenderer()
+        # 次の再取得時刻またはシグナルまでの待機
+        self.refresh_waiter = RefreshWaiter()
         
         # ログ設定
         self.setup_logging()
@@ -158,30 +172,77 @@ class WBGTKiosk:
             if not self.demo_mode:
                 print("📡 データ取得中...")
             
+            if self.demo_mode:
+                # デモモードは公開スケジュールに関係なく毎回すべてのデータ源を取得し直す
+                due_sources = set(self.fetch_scheduler.policies)
+            else:
+                # 公開スケジュール上、更新が見込まれるデータ源だけを再取得する
+                due_sources = self.fetch_scheduler.due_sources()
+            self.logger.info(f"再取得対象のデータ源: {sorted(due_sources)}")
+            if 'env_wbgt' in due_sources:
+                # 前サイクルの取得結果を破棄
+                self.env_wbgt_api.begin_cycle()
+            service_available = self.env_wbgt_api.is_service_available()
+            
+            def is_due(task_name):
+                return any(source in due_sources for source in TASK_SOURCES[task_name])
+            
+            if is_due('weather_data') and not self.amedas_stations_watched:
+                # 同じ時刻のアメダス実況データを拠点ごとに取り直さないよう、最初の取得より前に全拠点の観測点を登録
+                # （観測所一覧の取得は通信を伴うため、GUI版でもメインスレッドではなくこの取得処理の中で行う）
+                self.fetch_engine.run({i: (api.watch_amedas_stations,) for i, api in enumerate(self.weather_apis)})
+                self.amedas_stations_watched = True
+            
+            # 全拠点の独立したリクエストをまとめて並行実行
+            tasks = {}
+            for i, location in enumerate(self.locations):
+                # 気象庁APIからデータ取得
+                if is_due('weather_data'):
+                    tasks[(i, 'weather_data')] = (self.weather_apis[i].get_weather_data,)
+                if is_due('alert_data'):
+                    tasks[(i, 'alert_data')] = (self.heatstroke_alert.get_alert_data, location.get('prefecture'))
+                
+                # 環境省WBGTサービスからデータ取得（サービス期間内の場合）
+                if service_available and is_due('env_wbgt_current'):
+                    # 実況値と予測値の両方を取得
+                    tasks[(i, 'env_wbgt_current')] = (self.env_wbgt_api.get_wbgt_current_data, location)
+                    tasks[(i, 'env_wbgt_forecast')] = (self.env_wbgt_api.get_wbgt_forecast_data, location)
+                    
+                    # GUI版の場合は時系列データも取得
+                    if self.gui_mode:
+                        tasks[(i, 'env_wbgt_timeseries')] = (self.env_wbgt_api.get_wbgt_forecast_timeseries, location)
+            
+            results = self.fetch_engine.run(tasks)
+            # 今回取得しなかったデータは前回の結果を引き続き使用する
+            self.fetch_results.update(results)
+            for source in due_sources:
+                if source == 'env_wbgt':
+                    # 地点にデータがないだけ（結果がNone）の場合は成功とし、CSVの取得に失敗した場合のみ再試行する
+                    self.fetch_scheduler.mark_fetched(source, not self.env_wbgt_api.cycle_failed)
+                    continue
+                source_keys = [key for key in tasks if source in TASK_SOURCES[key[1]]]
+                self.fetch_scheduler.mark_fetched(source, all(results.get(key) is not None for key in source_keys))
+            results = self.fetch_results
+            
+            # 設定ファイルの順序で拠点データを組み立てる
             self.locations_data = []
             
             for i, location in enumerate(self.locations):
+                # 取得結果は次のサイクルでも使うため、環境省データの統合はサイクルごとの複製に対して行う
+                weather_data = results.get((i, 'weather_data'))
                 location_data = {
                     'location': location,
-                    'weather_data': None,
-                    'alert_data': None,
+                    'weather_data': dict(weather_data) if weather_data else weather_data,
+                    'alert_data': results.get((i, 'alert_data')),
                     'env_wbgt_data': None
                 }
                 
-                # 気象庁APIからデータ取得
-                location_data['weather_data'] = self.weather_apis[i].get_weather_data()
-                location_data['alert_data'] = self.heatstroke_alert.get_alert_data(location.get('prefecture'))
-                
-                # 環境省WBGTサービスからデータ取得（サービス期間内の場合）
-                if self.env_wbgt_api.is_service_available():
-                    # 実況値と予測値の両方を取得
-                    current_data = self.env_wbgt_api.get_wbgt_current_data(location)
-                    forecast_data = self.env_wbgt_api.get_wbgt_forecast_data(location)
+                if service_available:
+                    current_data = results.get((i, 'env_wbgt_current'))
+                    forecast_data = results.get((i, 'env_wbgt_forecast'))
                     
-                    # GUI版の場合は時系列データも取得
                     if self.gui_mode:
-                        forecast_timeseries = self.env_wbgt_api.get_wbgt_forecast_timeseries(location)
-                        location_data['env_wbgt_timeseries'] = forecast_timeseries
+                        location_data['env_wbgt_timeseries'] = results.get((i, 'env_wbgt_timeseries'))
                     
                     # 両方のデータを保持
                     location_data['env_wbgt_current'] = current_data
@@ -210,6 +271,7 @@ class WBGTKiosk:
                 print(self.colored_text("✅ 全拠点データ取得完了", 'green'))
             
             self.logger.info("データ更新完了")
+            self.logger.info(f"HTTPキャッシュ ヒット/ミス: {get_shared_cache().format_stats()}")
             return True
             
         except Exception as e:
@@ -242,15 +304,15 @@ class WBGTKiosk:
         current_time = datetime.now().strftime('%Y年%m月%d日 %H:%M:%S')
         mode_text = "デモモード" if self.demo_mode else "運用モード"
         
-        print("=" * 120)
+        print("=" * self.frame_renderer.width)
         print(self.colored_text("           🌡️  WBGT熱中症警戒キオスク（複数拠点対応）  🌡️", 'cyan'))
-        print("=" * 120)
+        print("=" * self.frame_renderer.width)
         print(f"現在時刻: {self.colored_text(current_time, 'white')}")
         location_names = [loc['name'] for loc in self.locations]
         print(f"監視拠点: {self.colored_text(' / '.join(location_names), 'cyan')}")
         if self.demo_mode:
             print(f"モード: {self.colored_text(mode_text, 'yellow')} ({self.demo_count + 1}/3)")
-        print("-" * 120)
+        print("-" * self.frame_renderer.width)
     
     def display_weather(self, location_data):
         """天気情報を表示"""
@@ -307,6 +369,9 @@ class WBGTKiosk:
                       f"({self.colored_text(current_level, current_color)})")
                 if 'datetime' in current_data:
                     print(f"   更新時刻: {current_data.get('datetime', 'Unknown')}")
+                if current_data.get('daily_max') is not None:
+                    print(f"   日最高値: {current_data['daily_max']}°C"
+                          f"（{current_data['threshold']:.0f}°C以上: {current_data['hours_above_threshold']}時間）")
             if forecast_data:
                 forecast_level, forecast_color, _ = self.env_wbgt_api.get_wbgt_level_info(forecast_data['wbgt_value'])
                 forecast_val = forecast_data.get('wbgt_value', 'N/A')
@@ -446,24 +511,24 @@ class WBGTKiosk:
             interval = config.UPDATE_INTERVAL_MINUTES
             print(self.colored_text(f"Ctrl+C で終了 | {interval}分ごとに自動更新", 'gray'))
         
-        print("=" * 120)
+        print("=" * self.frame_renderer.width)
     
     def display_all(self):
-        """全体表示"""
-        self.clear_screen()
-        self.display_header()
-        
-        # 各拠点の情報を横並びで表示
-        for i, location_data in enumerate(self.locations_data):
-            if i > 0:
-                print("\n" + "=" * 120 + "\n")
+        """全体表示（画面全体を1つのフレームに組み立て、1回の書き込みで再描画）"""
+        with self.frame_renderer.frame():
+            self.display_header()
             
-            self.display_weather(location_data)
-            self.display_wbgt(location_data)
-            self.display_alerts(location_data)
-            self.display_weekly_forecast(location_data)
-        
-        self.display_footer()
+            # 各拠点の情報を横並びで表示
+            for i, location_data in enumerate(self.locations_data):
+                if i > 0:
+                    print("\n" + "=" * self.frame_renderer.width + "\n")
+                
+                self.display_weather(location_data)
+                self.display_wbgt(location_data)
+                self.display_alerts(location_data)
+                self.display_weekly_forecast(location_data)
+            
+            self.display_footer()
     
     def run_demo_mode(self):
         """デモモード実行"""
@@ -499,6 +564,8 @@ class WBGTKiosk:
                         time.sleep(1)
                     print()
             
+            # スクロール領域を元に戻してから終了メッセージを表示
+            self.frame_renderer.close()
             print("\n" + "=" * 80)
             print(self.colored_text("🎉 デモ完了！WBGTキオスクが正常に動作しています。", 'green'))
             print()
@@ -523,6 +590,7 @@ class WBGTKiosk:
             print(self.colored_text("⚠️ 初期データ取得に問題がありますが、継続します", 'yellow'))
         
         time.sleep(1)
+        self.refresh_waiter.install()
         
         try:
             while self.running:
@@ -530,16 +598,17 @@ class WBGTKiosk:
                 self.update_data()
                 self.display_all()
                 
-                # 更新間隔まで待機
-                interval_seconds = config.UPDATE_INTERVAL_MINUTES * 60
-                for i in range(interval_seconds):
-                    if not self.running:
-                        break
-                    time.sleep(1)
+                # 次のデータ公開まで眠る（表示は更新間隔ごとに更新、SIGUSR1で即時更新）
+                interval_seconds = self.fetch_scheduler.seconds_until_next_due(config.UPDATE_INTERVAL_MINUTES * 60)
+                if self.refresh_waiter.wait(interval_seconds):
+                    self.logger.info("更新要求のシグナルを受信")
+                self.logger.info(f"起床回数: {self.refresh_waiter.wakeups_per_hour():.1f}回/時")
                     
         except KeyboardInterrupt:
             pass
         finally:
+            self.refresh_waiter.close()
+            self.frame_renderer.close()
             self.clear_screen()
             print(self.colored_text("WBGT熱中症警戒キオスクを終了しました", 'cyan'))
             self.logger.info("ターミナルキオスクアプリケーション終了")
@@ -549,7 +618,6 @@ class WBGTKiosk:
         try:
             import tkinter as tk
             from tkinter import ttk
-            from datetime import datetime
             import os
             
             # プラットフォーム検出と初期化メッセージ
@@ -686,12 +754,8 @@ class WBGTKiosk:
                 
                 location_forecast_table.pack(fill=tk.BOTH, expand=True)
                 
-                # デフォルトタグを設定（Windows互換性のため）
-                try:
-                    location_forecast_table.tag_configure('default', background='#2a2a2a', foreground='white')
-                    weekly_forecast_table.tag_configure('default', background='#2a2a2a', foreground='white')
-                except Exception as e:
-                    self.logger.debug(f"デフォルトタグの設定に失敗: {e}")
+                # デフォルトタグと警戒レベルのタグを設定（行の色は更新時にタグで指定）
+                TreeviewManager.setup_default_tags(location_forecast_table, is_windows)
                 
                 # アラート情報フレーム
                 alert_frame = tk.LabelFrame(location_frame, text="🚨 熱中症警戒アラート", 
@@ -730,6 +794,7 @@ class WBGTKiosk:
                 weekly_forecast_table.column('temp', width=80, anchor='center')
                 
                 weekly_forecast_table.pack(fill=tk.X)
+                TreeviewManager.setup_default_tags(weekly_forecast_table, is_windows)
                 
                 location_frames.append({
                     'forecast_low': forecast_low_label,
@@ -753,27 +818,22 @@ class WBGTKiosk:
             status_label.pack()
             
             # 色管理は共通モジュールを使用
-            def get_wbgt_color(level):
-                return ColorManager.get_wbgt_color(level, is_windows)
-            
             def get_alert_color(level):
                 return ColorManager.get_alert_color(level, is_windows)
             
 
-            def update_gui():
-                """GUI表示を更新"""
+            def render_snapshot(snapshot):
+                """取得結果のスナップショットをGUIに表示（メインスレッドで実行し、通信は行わない）"""
                 try:
-                    # 時刻更新
-                    current_time = datetime.now().strftime('%Y年%m月%d日 %H:%M:%S')
-                    time_label.config(text=f"現在時刻: {current_time}")
-                    
                     location_names = [loc['name'] for loc in self.locations]
                     locations_label.config(text=f"監視拠点: {' / '.join(location_names)}")
                     
-                    # データ更新
-                    if self.update_data():
+                    # データ更新はバックグラウンドのワーカーが行う
+                    if snapshot.success:
+                        # 前回のエラー表示を元に戻す
+                        status_label.config(text="ESC キーで終了", fg='#888888')
                         # 各拠点のデータを表示
-                        for i, location_data in enumerate(self.locations_data):
+                        for i, location_data in enumerate(snapshot.locations_data):
                             if i < len(location_frames):
                                 frames = location_frames[i]
                                 weather_data = location_data.get('weather_data')
@@ -791,60 +851,15 @@ class WBGTKiosk:
                                     frames['weather_icon'].config(text=weather_emoji)
                                     frames['weather_desc'].config(text=f"天気: {weather_data.get('weather_description', 'Unknown')}")
                                     
-                                    # WBGT予測値表を更新
-                                    forecast_table = frames['forecast_table']
-                                    
-                                    # 既存の行をクリア
-                                    for item in forecast_table.get_children():
-                                        forecast_table.delete(item)
-                                    
-                                    # 現在値を追加
-                                    current_data = location_data.get('env_wbgt_current')
-                                    if current_data:
-                                        level, _, _ = self.env_wbgt_api.get_wbgt_level_info(current_data['wbgt_value'])
-                                        color = get_wbgt_color(level)
-                                        item = forecast_table.insert('', 'end', values=('現在', f"{current_data.get('wbgt_value', 0):.1f}°C", level))
-                                        forecast_table.set(item, 'level', level)
-                                        # 行に色を適用
-                                        forecast_table.tag_configure(f'level_{level}', background=color, foreground='black')
-                                        forecast_table.item(item, tags=(f'level_{level}',))
-                                    
-                                    # 時系列予測値を追加
-                                    timeseries_data = location_data.get('env_wbgt_timeseries')
-                                    if timeseries_data and 'timeseries' in timeseries_data:
-                                        timeseries = timeseries_data['timeseries']
-                                        # 最初の3つの予測値を表示
-                                        for data_point in timeseries[:3]:
-                                            level, _, _ = self.env_wbgt_api.get_wbgt_level_info(data_point['wbgt_value'])
-                                            time_str = data_point['datetime_str']
-                                            value_str = f"{data_point.get('wbgt_value', 0):.1f}°C"
-                                            color = get_wbgt_color(level)
-                                            item = forecast_table.insert('', 'end', values=(time_str, value_str, level))
-                                            # 行に色を適用
-                                            forecast_table.tag_configure(f'level_{level}', background=color, foreground='black')
-                                            forecast_table.item(item, tags=(f'level_{level}',))
+                                    # WBGT予測値表を更新（時間帯ごとに前回と照合し、変更のあったセルのみ更新）
+                                    forecast_rows = WeatherDataProcessor.build_wbgt_forecast_rows(
+                                        location_data, self.env_wbgt_api, 'ja')
+                                    TreeviewReconciler.attach(frames['forecast_table']).render(forecast_rows)
                                     
-                                    # 週間予報表を更新
-                                    weekly_forecast_table = frames['weekly_forecast_table']
-                                    
-                                    # 既存の行をクリア
-                                    for item in weekly_forecast_table.get_children():
-                                        weekly_forecast_table.delete(item)
-                                    
-                                    # 週間予報データを表に追加
-                                    if 'weekly_forecast' in weather_data and weather_data['weekly_forecast']:
-                                        weather_api = self.weather_apis[0]
-                                        processed_data = WeatherDataProcessor.process_weekly_forecast_data(
-                                            weather_data['weekly_forecast'], weather_api, 'ja')
-                                        
-                                        for data in processed_data:
-                                            weekly_forecast_table.insert('', 'end', 
-                                                values=(data['date'], data['weather'], 
-                                                       data['pop'], data['temp']))
-                                    else:
-                                        # データがない場合
-                                        weekly_forecast_table.insert('', 'end', 
-                                            values=('--', 'データなし', '--', '--'))
+                                    # 週間予報表を更新（日付ごとに前回と照合）
+                                    weekly_rows = WeatherDataProcessor.build_weekly_forecast_rows(
+                                        weather_data.get('weekly_forecast'), self.weather_apis[0], 'ja')
+                                    TreeviewReconciler.attach(frames['weekly_forecast_table']).render(weekly_rows)
                                 
                                 if alert_data and 'alerts' in alert_data:
                                     # アラート情報
@@ -858,9 +873,9 @@ class WBGTKiosk:
                                     frames['tomorrow_alert'].config(text=f"明日: {tomorrow_alert.get('status', 'Unknown')}", fg=tomorrow_color)
                         
                         # 更新時刻表示
-                        if self.locations_data and self.locations_data[0].get('weather_data'):
-                            update_time = self.locations_data[0]['weather_data']['timestamp']
-                            update_time_label.config(text=f"最終更新: {update_time}")
+                        if snapshot.locations_data and snapshot.locations_data[0].get('weather_data'):
+                            update_time = snapshot.locations_data[0]['weather_data']['timestamp']
+                            clock_ticker.set_last_update(update_time)
                     
                     else:
                         status_label.config(text="データ取得エラー - ESC キーで終了", fg='#ff0000')
@@ -868,16 +883,30 @@ class WBGTKiosk:
                 except Exception as e:
                     self.logger.error(f"GUI更新エラー: {e}")
                     status_label.config(text=f"表示エラー: {e} - ESC キーで終了", fg='#ff0000')
-                
-                # 次回更新をスケジュール
-                root.after(config.UPDATE_INTERVAL_MINUTES * 60 * 1000, update_gui)
             
-            # 初回更新
-            update_gui()
+            # 時計と最終更新からの経過時間は1秒ごとに更新（データ取得・表の描画とは独立）
+            clock_ticker = ClockTicker(
+                root,
+                clock_label=time_label,
+                format_clock=lambda now: f"現在時刻: {now.strftime('%Y年%m月%d日 %H:%M:%S')}",
+                age_label=update_time_label,
+                format_age=lambda text, minutes: f"最終更新: {text}（{minutes}分前）")
+            clock_ticker.start()
+            
+            # データ取得はバックグラウンドで行い、結果はキュー経由でメインスレッドに渡す
+            # （次回の取得は次のデータ公開時刻または更新間隔の早い方）
+            refresh_worker = RefreshWorker(
+                self.update_data, lambda: self.locations_data,
+                lambda: self.fetch_scheduler.seconds_until_next_due(config.UPDATE_INTERVAL_MINUTES * 60))
+            refresh_worker.attach(root, render_snapshot)
+            refresh_worker.start()
             
             # メインループ開始
             self.logger.info("GUI版キオスクアプリケーション開始")
-            root.mainloop()
+            try:
+                root.mainloop()
+            finally:
+                refresh_worker.stop()
             
         except ImportError as e:
             print(f"❌ 必要なライブラリが利用できません: {e}")
@@ -50,6 +50,7 @@ try:
             self.FONT_SIZE_SMALL = config_dict.get('font_sizes', {}).get('small', 14)
             self.LOG_LEVEL = config_dict.get('logging', {}).get('level', 'INFO')
             self.LOG_FILE = config_dict.get('logging', {}).get('file', 'wbgt_kiosk_en.log')
+            self.FETCH_MAX_WORKERS = config_dict.get('fetch', {}).get('max_workers', 4)
             
             # Use first location for backward compatibility
             if self.LOCATIONS:
@@ -70,9 +71,13 @@ except Exception as e:
 from jma_api_en import JMAWeatherAPIEN
 from heatstroke_alert_en import HeatstrokeAlertEN
 from env_wbgt_api_en import EnvWBGTAPIEN
+from fetch_engine import FetchEngine, RefreshWorker
+from http_client import get_shared_cache
+from kiosk_base import FetchScheduler, RefreshWaiter, TASK_SOURCES
+from terminal_frame import FrameRenderer
 from gui_components import (
     PlatformUtils, ColorManager, WeatherIconManager, 
-    TreeviewManager, GUIComponentFactory, WeatherDataProcessor
+    TreeviewManager, TreeviewReconciler, GUIComponentFactory, WeatherDataProcessor, ClockTicker
 )
 
 class WBGTKioskEN:
@@ -83,6 +88,11 @@ class WBGTKioskEN:
         self.gui_mode = gui_mode
         self.demo_count = 0
         self.running = True
+        # Terminal frame renderer (output between frames scrolls only in the rows below the frame,
+        # the frame is wrapped and cropped to the terminal size)
+        self.frame_renderer = FrameRenderer(overflow_notice="... ({count} more lines do not fit the screen)")
+        # Sleeps until the next scheduled refresh or a signal
+        self.refresh_waiter = RefreshWaiter()
         
         # Setup logging
         logging.basicConfig(
@@ -103,10 +113,14 @@ class WBGTKioskEN:
         self.weather_apis = []
         for location in self.locations:
             area_code = location.get('area_code', '130000')  # Default to Tokyo
-            self.weather_apis.append(JMAWeatherAPIEN(area_code))
+            self.weather_apis.append(JMAWeatherAPIEN(area_code, location=location))
         
-        self.heatstroke_alert = HeatstrokeAlertEN()
         self.env_wbgt_api = EnvWBGTAPIEN()
+        self.heatstroke_alert = HeatstrokeAlertEN(env_wbgt_api=self.env_wbgt_api)
+        self.fetch_engine = FetchEngine(max_workers=config_en.FETCH_MAX_WORKERS)
+        self.fetch_scheduler = FetchScheduler()
+        self.fetch_results = {}
+        self.amedas_stations_watched = False
         
         # Data storage
         self.locations_data = []
@@ -155,30 +169,77 @@ class WBGTKioskEN:
             if not self.demo_mode:
                 print("📡 Fetching data...")
             
+            if self.demo_mode:
+                # Demo mode refetches every source on each update regardless of the publication schedule
+                due_sources = set(self.fetch_scheduler.policies)
+            else:
+                # Only refetch sources expected to have changed according to their publication schedule
+                due_sources = self.fetch_scheduler.due_sources()
+            self.logger.info(f"Sources due for refresh: {sorted(due_sources)}")
+            if 'env_wbgt' in due_sources:
+                # Discard documents fetched in the previous cycle
+                self.env_wbgt_api.begin_cycle()
+            service_available = self.env_wbgt_api.is_service_available()
+            
+            def is_due(task_name):
+                return any(source in due_sources for source in TASK_SOURCES[task_name])
+            
+            if is_due('weather_data') and not self.amedas_stations_watched:
+                # Register every location's AMeDAS stations before the first fetch so the hourly map is fetched once
+                # (loading the station table may hit the network, so it runs here rather than on the GUI thread)
+                self.fetch_engine.run({i: (api.watch_amedas_stations,) for i, api in enumerate(self.weather_apis)})
+                self.amedas_stations_watched = True
+            
+            # Run the independent requests of all locations concurrently
+            tasks = {}
+            for i, location in enumerate(self.locations):
+                # Get data from JMA API
+                if is_due('weather_data'):
+                    tasks[(i, 'weather_data')] = (self.weather_apis[i].get_weather_data,)
+                if is_due('alert_data'):
+                    tasks[(i, 'alert_data')] = (self.heatstroke_alert.get_alert_data, location.get('prefecture'))
+                
+                # Get data from Environment Ministry WBGT service (if available)
+                if service_available and is_due('env_wbgt_current'):
+                    # Get both current and forecast data
+                    tasks[(i, 'env_wbgt_current')] = (self.env_wbgt_api.get_wbgt_current_data, location)
+                    tasks[(i, 'env_wbgt_forecast')] = (self.env_wbgt_api.get_wbgt_forecast_data, location)
+                    
+                    # For GUI mode, also get timeseries data
+                    if self.gui_mode:
+                        tasks[(i, 'env_wbgt_timeseries')] = (self.env_wbgt_api.get_wbgt_forecast_timeseries, location)
+            
+            results = self.fetch_engine.run(tasks)
+            # Data not fetched this time keeps using the previous result
+            self.fetch_results.update(results)
+            for source in due_sources:
+                if source == 'env_wbgt':
+                    # A station without data (None result) counts as success; only a failed CSV download is retried
+                    self.fetch_scheduler.mark_fetched(source, not self.env_wbgt_api.cycle_failed)
+                    continue
+                source_keys = [key for key in tasks if source in TASK_SOURCES[key[1]]]
+                self.fetch_scheduler.mark_fetched(source, all(results.get(key) is not None for key in source_keys))
+            results = self.fetch_results
+            
+            # Assemble location data in configuration order
             self.locations_data = []
             
             for i, location in enumerate(self.locations):
+                # Cached results are reused next cycle, so official WBGT is merged into a per-cycle copy
+                weather_data = results.get((i, 'weather_data'))
                 location_data = {
                     'location': location,
-                    'weather_data': None,
-                    'alert_data': None,
+                    'weather_data': dict(weather_data) if weather_data else weather_data,
+                    'alert_data': results.get((i, 'alert_data')),
                     'env_wbgt_data': None
                 }
                 
-                # Get data from JMA API
-                location_data['weather_data'] = self.weather_apis[i].get_weather_data()
-                location_data['alert_data'] = self.heatstroke_alert.get_alert_data(location.get('prefecture'))
-                
-                # Get data from Environment Ministry WBGT service (if available)
-                if self.env_wbgt_api.is_service_available():
-                    # Get both current and forecast data
-                    current_data = self.env_wbgt_api.get_wbgt_current_data(location)
-                    forecast_data = self.env_wbgt_api.get_wbgt_forecast_data(location)
+                if service_available:
+                    current_data = results.get((i, 'env_wbgt_current'))
+                    forecast_data = results.get((i, 'env_wbgt_forecast'))
                     
-                    # For GUI mode, also get timeseries data
                     if self.gui_mode:
-                        forecast_timeseries = self.env_wbgt_api.get_wbgt_forecast_timeseries(location)
-                        location_data['env_wbgt_timeseries'] = forecast_timeseries
+                        location_data['env_wbgt_timeseries'] = results.get((i, 'env_wbgt_timeseries'))
                     
                     # Store both data types
                     location_data['env_wbgt_current'] = current_data
@@ -216,6 +277,7 @@ class WBGTKioskEN:
                 self.locations_data.append(location_data)
             
             self.logger.info("Data update completed")
+            self.logger.info(f"HTTP cache hits/misses: {get_shared_cache().format_stats()}")
             return True
             
         except Exception as e:
@@ -227,16 +289,16 @@ class WBGTKioskEN:
         current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         location_names = " / ".join([loc['name'] for loc in self.locations])
         
-        print("=" * 120)
+        print("=" * self.frame_renderer.width)
         print(self.colored_text("           🌡️  WBGT Heat Stroke Warning Kiosk (Multi-Location)  🌡️", 'cyan'))
-        print("=" * 120)
+        print("=" * self.frame_renderer.width)
         print(f"Current Time: {self.colored_text(current_time, 'white')}")
         print(f"Monitoring Locations: {self.colored_text(location_names, 'cyan')}")
         
         if self.demo_mode:
             mode_text = "Demo Mode"
             print(f"Mode: {self.colored_text(mode_text, 'yellow')} ({self.demo_count + 1}/3)")
-        print("-" * 120)
+        print("-" * self.frame_renderer.width)
     
     def display_weather(self, location_data):
         """Display weather information"""
@@ -293,6 +355,9 @@ class WBGTKioskEN:
                       f"({self.colored_text(current_level, current_color)})")
                 if 'datetime' in current_data:
                     print(f"   Update Time: {current_data.get('datetime', 'Unknown')}")
+                if current_data.get('daily_max') is not None:
+                    print(f"   Daily Max: {current_data['daily_max']}°C "
+                          f"({current_data['hours_above_threshold']} h at or above {current_data['threshold']:.0f}°C)")
             if forecast_data:
                 forecast_level, forecast_color, _ = self.env_wbgt_api.get_wbgt_level_info(forecast_data['wbgt_value'])
                 forecast_val = forecast_data.get('wbgt_value', 'N/A')
@@ -424,7 +489,7 @@ class WBGTKioskEN:
         
         if not self.demo_mode:
             print(self.colored_text(f"Next update in {self.update_interval} minutes...", 'gray'))
-        print("=" * 120)
+        print("=" * self.frame_renderer.width)
     
     def run_demo_mode(self):
         """Run in demo mode"""
@@ -452,18 +517,19 @@ class WBGTKioskEN:
             print(f"=== Demo {demo_round + 1}/3 ===")
             
             if self.update_data():
-                self.clear_screen()
-                self.display_header()
-                
-                for location_data in self.locations_data:
-                    self.display_weather(location_data)
-                    self.display_wbgt(location_data)
-                    self.display_alerts(location_data)
-                    self.display_weekly_forecast(location_data)
-                    print("=" * 120)
-                    print()
-                
-                self.display_footer()
+                # Build the whole screen as one frame and repaint it in a single write
+                with self.frame_renderer.frame():
+                    self.display_header()
+                    
+                    for location_data in self.locations_data:
+                        self.display_weather(location_data)
+                        self.display_wbgt(location_data)
+                        self.display_alerts(location_data)
+                        self.display_weekly_forecast(location_data)
+                        print("=" * self.frame_renderer.width)
+                        print()
+                    
+                    self.display_footer()
                 
                 if demo_round < 2:
                     for countdown in range(5, 0, -1):
@@ -475,6 +541,8 @@ class WBGTKioskEN:
             
             print()
         
+        # Restore the scroll region before the closing message
+        self.frame_renderer.close()
         print("=" * 80)
         print(self.colored_text("🎉 Demo completed! WBGT Kiosk is working properly.", 'green'))
         print()
@@ -487,33 +555,37 @@ class WBGTKioskEN:
         print(self.colored_text("🚀 WBGT Heat Stroke Warning Kiosk Terminal Mode", 'cyan'))
         print("Press Ctrl+C to exit")
         print()
+        self.refresh_waiter.install()
         
         while self.running:
             try:
                 if self.update_data():
-                    self.clear_screen()
-                    self.display_header()
-                    
-                    for location_data in self.locations_data:
-                        self.display_weather(location_data)
-                        self.display_wbgt(location_data)
-                        self.display_alerts(location_data)
-                        print("=" * 120)
-                        print()
-                    
-                    self.display_footer()
+                    # Build the whole screen as one frame and repaint it in a single write
+                    with self.frame_renderer.frame():
+                        self.display_header()
+                        
+                        for location_data in self.locations_data:
+                            self.display_weather(location_data)
+                            self.display_wbgt(location_data)
+                            self.display_alerts(location_data)
+                            print("=" * self.frame_renderer.width)
+                            print()
+                        
+                        self.display_footer()
                 else:
                     print("❌ Failed to fetch data. Retrying in 1 minute...")
                 
-                # Wait for next update
-                for _ in range(self.update_interval * 60, 0, -1):
-                    if not self.running:
-                        break
-                    time.sleep(1)
+                # Sleep until the next data publication (the display refreshes every update interval,
+                # SIGUSR1 refreshes immediately)
+                if self.refresh_waiter.wait(self.fetch_scheduler.seconds_until_next_due(self.update_interval * 60)):
+                    self.logger.info("Refresh requested by signal")
+                self.logger.info(f"Wakeups: {self.refresh_waiter.wakeups_per_hour():.1f}/hour")
                 
             except KeyboardInterrupt:
                 break
         
+        self.refresh_waiter.close()
+        self.frame_renderer.close()
         self.logger.info("Terminal mode kiosk application ended")
     
     def run_gui_mode(self):
@@ -667,12 +739,8 @@ class WBGTKioskEN:
                 
                 location_forecast_table.pack(fill='both', expand=True)
                 
-                # Set default tags (Windows compatibility)
-                try:
-                    location_forecast_table.tag_configure('default', background='#2a2a2a', foreground='white')
-                    weekly_forecast_table.tag_configure('default', background='#2a2a2a', foreground='white')
-                except Exception as e:
-                    self.logger.debug(f"Failed to set default tags: {e}")
+                # Set the default and alert level tags (rows pick their color by tag on update)
+                TreeviewManager.setup_default_tags(location_forecast_table, is_windows)
                 
                 # Alert info frame
                 alert_frame = tk.LabelFrame(location_frame, text="🚨 Heat Stroke Alert", 
@@ -711,6 +779,7 @@ class WBGTKioskEN:
                 weekly_forecast_table.column('temp', width=80, anchor='center')
                 
                 weekly_forecast_table.pack(fill=tk.X)
+                TreeviewManager.setup_default_tags(weekly_forecast_table, is_windows)
                 
                 frames['forecast_table'] = location_forecast_table
                 frames['weekly_forecast_table'] = weekly_forecast_table
@@ -728,23 +797,17 @@ class WBGTKioskEN:
             update_time_label.pack(side='bottom', pady=10)
             
             # Color management using common module
-            def get_wbgt_color(level):
-                return ColorManager.get_wbgt_color(level, is_windows)
-            
             def get_alert_color(level):
                 return ColorManager.get_alert_color(level, is_windows)
             
-            # Data update function
-            def update_gui():
+            # Render a fetched snapshot (runs on the main thread and does no network I/O)
+            def render_snapshot(snapshot):
                 try:
-                    status_label.config(text="Updating data...", fg='yellow')
-                    root.update()
-                    
-                    if self.update_data() and self.locations_data:
+                    if snapshot.success and snapshot.locations_data:
                         status_label.config(text="✅ Data updated successfully - Press ESC to exit", fg='green')
                         
                         # Update each location
-                        for i, location_data in enumerate(self.locations_data):
+                        for i, location_data in enumerate(snapshot.locations_data):
                             if i < len(location_frames):
                                 frames = location_frames[i]
                                 weather_data = location_data.get('weather_data')
@@ -761,60 +824,15 @@ class WBGTKioskEN:
                                     frames['weather_icon'].config(text=weather_emoji)
                                     frames['weather_desc'].config(text=f"Weather: {weather_data.get('weather_description', 'Unknown')}")
                                     
-                                    # Update WBGT forecast table
-                                    forecast_table = frames['forecast_table']
-                                    
-                                    # Clear existing rows
-                                    for item in forecast_table.get_children():
-                                        forecast_table.delete(item)
-                                    
-                                    # Add current value
-                                    current_data = location_data.get('env_wbgt_current')
-                                    if current_data:
-                                        level, _, _ = self.env_wbgt_api.get_wbgt_level_info(current_data['wbgt_value'])
-                                        color = get_wbgt_color(level)
-                                        item = forecast_table.insert('', 'end', values=('Current', f"{current_data.get('wbgt_value', 0):.1f}°C", level))
-                                        forecast_table.set(item, 'level', level)
-                                        # Apply color to row
-                                        forecast_table.tag_configure(f'level_{level}', background=color, foreground='black')
-                                        forecast_table.item(item, tags=(f'level_{level}',))
+                                    # Update WBGT forecast table (rows keyed by time slot, only changed cells are updated)
+                                    forecast_rows = WeatherDataProcessor.build_wbgt_forecast_rows(
+                                        location_data, self.env_wbgt_api, 'en')
+                                    TreeviewReconciler.attach(frames['forecast_table']).render(forecast_rows)
                                     
-                                    # Add time series forecast values
-                                    timeseries_data = location_data.get('env_wbgt_timeseries')
-                                    if timeseries_data and 'timeseries' in timeseries_data:
-                                        timeseries = timeseries_data['timeseries']
-                                        # Show first 3 forecast values
-                                        for data_point in timeseries[:3]:
-                                            level, _, _ = self.env_wbgt_api.get_wbgt_level_info(data_point['wbgt_value'])
-                                            time_str = data_point['datetime_str']
-                                            value_str = f"{data_point.get('wbgt_value', 0):.1f}°C"
-                                            color = get_wbgt_color(level)
-                                            item = forecast_table.insert('', 'end', values=(time_str, value_str, level))
-                                            # Apply color to row
-                                            forecast_table.tag_configure(f'level_{level}', background=color, foreground='black')
-                                            forecast_table.item(item, tags=(f'level_{level}',))
-                                    
-                                    # Update weekly forecast table
-                                    weekly_forecast_table = frames['weekly_forecast_table']
-                                    
-                                    # Clear existing rows
-                                    for item in weekly_forecast_table.get_children():
-                                        weekly_forecast_table.delete(item)
-                                    
-                                    # Add weekly forecast data to table
-                                    if 'weekly_forecast' in weather_data and weather_data['weekly_forecast']:
-                                        weather_api = self.weather_apis[0]
-                                        processed_data = WeatherDataProcessor.process_weekly_forecast_data(
-                                            weather_data['weekly_forecast'], weather_api, 'en')
-                                        
-                                        for data in processed_data:
-                                            weekly_forecast_table.insert('', 'end', 
-                                                values=(data['date'], data['weather'], 
-                                                       data['pop'], data['temp']))
-                                    else:
-                                        # No data available
-                                        weekly_forecast_table.insert('', 'end', 
-                                            values=('--', 'No data', '--', '--'))
+                                    # Update weekly forecast table (rows keyed by date)
+                                    weekly_rows = WeatherDataProcessor.build_weekly_forecast_rows(
+                                        weather_data.get('weekly_forecast'), self.weather_apis[0], 'en')
+                                    TreeviewReconciler.attach(frames['weekly_forecast_table']).render(weekly_rows)
                                 
                                 if alert_data and 'alerts' in alert_data:
                                     today_alert = alert_data['alerts']['today']
@@ -827,9 +845,9 @@ class WBGTKioskEN:
                                     frames['tomorrow_alert'].config(text=f"Tomorrow: {tomorrow_alert.get('status', 'Unknown')}", fg=tomorrow_color)
                         
                         # Update time display
-                        if self.locations_data and self.locations_data[0].get('weather_data'):
-                            update_time = self.locations_data[0]['weather_data']['timestamp']
-                            update_time_label.config(text=f"Last Updated: {update_time}")
+                        if snapshot.locations_data[0].get('weather_data'):
+                            update_time = snapshot.locations_data[0]['weather_data']['timestamp']
+                            clock_ticker.set_last_update(update_time)
                     
                     else:
                         status_label.config(text="Data fetch error - Press ESC to exit", fg='red')
@@ -837,16 +855,29 @@ class WBGTKioskEN:
                 except Exception as e:
                     self.logger.error(f"GUI update error: {e}")
                     status_label.config(text=f"Display error: {e} - Press ESC to exit", fg='red')
-                
-                # Schedule next update
-                root.after(config_en.UPDATE_INTERVAL_MINUTES * 60 * 1000, update_gui)
             
-            # Initial update
-            update_gui()
+            # Refresh the data age ("updated N min ago") every second, independent of fetching and table rendering
+            clock_ticker = ClockTicker(
+                root,
+                age_label=update_time_label,
+                format_age=lambda text, minutes: f"Last Updated: {text} ({minutes} min ago)")
+            clock_ticker.start()
+            
+            # Fetch data on a background worker and hand the results to the main thread through a queue
+            # (next fetch at the next data publication or update interval, whichever is earlier)
+            status_label.config(text="Updating data...", fg='yellow')
+            refresh_worker = RefreshWorker(
+                self.update_data, lambda: self.locations_data,
+                lambda: self.fetch_scheduler.seconds_until_next_due(config_en.UPDATE_INTERVAL_MINUTES * 60))
+            refresh_worker.attach(root, render_snapshot)
+            refresh_worker.start()
             
             # Start main loop
             self.logger.info("GUI mode kiosk application started")
-            root.mainloop()
+            try:
+                root.mainloop()
+            finally:
+                refresh_worker.stop()
             
         except ImportError:
             print("❌ tkinter not available. Starting terminal mode.")